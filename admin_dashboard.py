@@ -1,27 +1,49 @@
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-                             QHeaderView, QMessageBox, QFrame, QFileDialog, QTabWidget)
-from PyQt6.QtCore import Qt, pyqtSignal
+                             QLabel, QLineEdit, QPushButton, QTableView,
+                             QHeaderView, QMessageBox, QFrame, QFileDialog, QTabWidget,
+                             QProgressDialog)
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QColor
 import sys
 from datetime import datetime
-import pandas as pd
-from database_manager import DatabaseManager
+from storage_backend import get_database_manager
+from admin_table_models import UsersTableModel, AdminReportsTableModel
+from admin_reports_sync import AdminReportsSync
+from streaming_export import EXPORT_FILTERS, ExportJob, export_path, table_rows
+
+# Milliseconds of typing pause before a search query is sent
+SEARCH_DELAY_MS = 250
+
+ACCESS_LOG_COLUMNS = [
+    ('log_id', "Log ID"), ('user_id', "User ID"), ('admin_id', "Admin ID"),
+    ('action_type', "Action"), ('timestamp', "Timestamp"), ('ip_address', "IP Address"),
+    ('status', "Status"), ('details', "Details"),
+]
 
 
 class AdminDashboard(QMainWindow):
     # Signal to send logout event to login window
     logout_signal = pyqtSignal()
+    # Emitted from the sync thread when new users were added to admin_reports
+    reports_synced = pyqtSignal(int)
 
     def __init__(self):
         super().__init__()
         # Initialize database connection
-        self.db_manager = DatabaseManager.get_instance()
+        self.db_manager = get_database_manager()
+        self.export_job = None
+        self.export_progress = None
 
         self.init_ui()
         self.populate_user_table()
         self.populate_admin_reports_table()
 
+        # Copy new users into admin_reports in the background
+        self.reports_synced.connect(self.on_reports_synced)
+        self.reports_sync = AdminReportsSync.get_instance()
+        self.reports_sync.add_listener(self.reports_synced.emit)
+        self.reports_sync.start()
+
     def init_ui(self):
         # Set window properties
         self.setWindowTitle('SARASFINTECH - Admin Dashboard')
@@ -96,7 +118,11 @@ class AdminDashboard(QMainWindow):
         # Add search input
         self.user_search = QLineEdit()
         self.user_search.setPlaceholderText("Search users...")
-        self.user_search.textChanged.connect(self.filter_users)
+        self.user_search_timer = QTimer(self)
+        self.user_search_timer.setSingleShot(True)
+        self.user_search_timer.setInterval(SEARCH_DELAY_MS)
+        self.user_search_timer.timeout.connect(self.filter_users)
+        self.user_search.textChanged.connect(self.user_search_timer.start)
 
         # Add refresh button
         user_refresh_button = QPushButton("Refresh")
@@ -114,16 +140,18 @@ class AdminDashboard(QMainWindow):
         user_controls_layout.addWidget(user_refresh_button)
         user_controls_layout.addWidget(user_export_button)
 
-        # Create users table
-        self.users_table = QTableWidget()
-        self.users_table.setColumnCount(3)  # Only show ID, username, email
-        self.users_table.setHorizontalHeaderLabels([
-            "User ID", "Username", "Email"
-        ])
+        # Create users table (ID, username, email), loaded page by page as it scrolls
+        self.users_model = UsersTableModel(self.db_manager, self)
+        self.users_table = QTableView()
+        self.users_table.setModel(self.users_model)
         self.users_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.users_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.users_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.users_table.setAlternatingRowColors(True)
-        self.users_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.users_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        # Indicator first: enabling sorting sorts by it (the model's default
+        # order, so no query); populate_*_table() loads the first page
+        self.users_table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.users_table.setSortingEnabled(True)
 
         # Add widgets to user tab layout
         user_layout.addLayout(user_controls_layout)
@@ -139,7 +167,11 @@ class AdminDashboard(QMainWindow):
         # Add search input for reports
         self.reports_search = QLineEdit()
         self.reports_search.setPlaceholderText("Search reports...")
-        self.reports_search.textChanged.connect(self.filter_admin_reports)
+        self.reports_search_timer = QTimer(self)
+        self.reports_search_timer.setSingleShot(True)
+        self.reports_search_timer.setInterval(SEARCH_DELAY_MS)
+        self.reports_search_timer.timeout.connect(self.filter_admin_reports)
+        self.reports_search.textChanged.connect(self.reports_search_timer.start)
 
         # Add refresh button for reports
         reports_refresh_button = QPushButton("Refresh")
@@ -152,21 +184,30 @@ class AdminDashboard(QMainWindow):
         reports_export_button.clicked.connect(self.export_admin_reports_to_excel)
         reports_export_button.setFixedWidth(120)
 
+        # Add export button for the access log
+        access_logs_export_button = QPushButton("Export Logs")
+        access_logs_export_button.setObjectName('exportBtn')
+        access_logs_export_button.clicked.connect(self.export_access_logs)
+        access_logs_export_button.setFixedWidth(120)
+
         # Add controls to reports layout
         reports_controls_layout.addWidget(self.reports_search)
         reports_controls_layout.addWidget(reports_refresh_button)
         reports_controls_layout.addWidget(reports_export_button)
+        reports_controls_layout.addWidget(access_logs_export_button)
 
-        # Create admin reports table
-        self.admin_reports_table = QTableWidget()
-        self.admin_reports_table.setColumnCount(5)  # report_id, user_id, username, email, report_date
-        self.admin_reports_table.setHorizontalHeaderLabels([
-            "Report ID", "User ID", "Username", "Email", "Report Date"
-        ])
+        # Create admin reports table (report_id, user_id, username, email, report_date)
+        self.admin_reports_model = AdminReportsTableModel(self.db_manager, self)
+        self.admin_reports_table = QTableView()
+        self.admin_reports_table.setModel(self.admin_reports_model)
         self.admin_reports_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.admin_reports_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.admin_reports_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.admin_reports_table.setAlternatingRowColors(True)
-        self.admin_reports_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.admin_reports_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        # Indicator first: enabling sorting sorts by it (the model's default
+        # order, so no query); populate_*_table() loads the first page
+        self.admin_reports_table.horizontalHeader().setSortIndicator(4, Qt.SortOrder.DescendingOrder)
+        self.admin_reports_table.setSortingEnabled(True)
 
         # Add widgets to reports tab layout
         reports_layout.addLayout(reports_controls_layout)
@@ -194,6 +235,9 @@ class AdminDashboard(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
+            self.reports_sync.remove_listener(self.reports_synced.emit)
+            self.reports_sync.stop()
+
             # Close database connection
             if hasattr(self, 'db_manager'):
                 self.db_manager.close()
@@ -203,41 +247,20 @@ class AdminDashboard(QMainWindow):
             self.close()
 
     def populate_user_table(self):
-        """Fetch and display user data from the database"""
+        """Reload the first page of users from the database"""
         try:
-            # Clear the table
-            self.users_table.setRowCount(0)
-
-            # Fetch data from database
-            query = "SELECT user_id, user_name, email FROM user"
-            success, error = self.db_manager.execute_query(query)
+            self.users_model.reload()
 
-            if not success:
-                QMessageBox.warning(self, "Database Error", f"Failed to fetch user data: {error}")
+            if self.users_model.last_error:
+                QMessageBox.warning(self, "Database Error",
+                                    f"Failed to fetch user data: {self.users_model.last_error}")
                 return
 
-            # Get user data
-            users = self.db_manager.fetchall()
-
-            # Populate table
-            for i, user in enumerate(users):
-                self.users_table.insertRow(i)
-
-                # Add user ID
-                id_item = QTableWidgetItem(str(user['user_id']))
-                self.users_table.setItem(i, 0, id_item)
-
-                # Add username
-                username_item = QTableWidgetItem(user['user_name'])
-                self.users_table.setItem(i, 1, username_item)
-
-                # Add email
-                email_item = QTableWidgetItem(user['email'])
-                self.users_table.setItem(i, 2, email_item)
-
             # Show success message
-            if len(users) > 0:
-                self.statusBar().showMessage(f"Loaded {len(users)} users", 3000)
+            count = self.users_model.rowCount()
+            if count > 0:
+                more = " (more load as you scroll)" if self.users_model.canFetchMore() else ""
+                self.statusBar().showMessage(f"Loaded {count} users{more}", 3000)
             else:
                 self.statusBar().showMessage("No users found", 3000)
 
@@ -245,220 +268,119 @@ class AdminDashboard(QMainWindow):
             QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
 
     def filter_users(self):
-        """Filter users based on search input"""
-        search_text = self.user_search.text().lower()
-
-        # Show/hide rows based on search
-        for row in range(self.users_table.rowCount()):
-            match_found = False
-
-            # Check username and email
-            username = self.users_table.item(row, 1).text().lower()
-            email = self.users_table.item(row, 2).text().lower()
-
-            if search_text in username or search_text in email:
-                match_found = True
-
-            # Show/hide row
-            self.users_table.setRowHidden(row, not match_found)
+        """Filter users by username/email prefix (searched in the database)"""
+        self.users_model.set_search(self.user_search.text())
 
     def export_to_excel(self):
-        """Export user data to Excel file"""
-        try:
-            # Get data from the table
-            data = []
-            headers = []
-
-            # Get headers
-            for col in range(self.users_table.columnCount()):
-                headers.append(self.users_table.horizontalHeaderItem(col).text())
-
-            # Get data from all visible rows
-            for row in range(self.users_table.rowCount()):
-                if not self.users_table.isRowHidden(row):
-                    row_data = []
-                    for col in range(self.users_table.columnCount()):
-                        item = self.users_table.item(row, col)
-                        if item:
-                            row_data.append(item.text())
-                        else:
-                            row_data.append("")
-                    data.append(row_data)
-
-            # Create DataFrame
-            df = pd.DataFrame(data, columns=headers)
-
-            # Ask user for save location - modified to work with PyQt6
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Save Excel File",
-                "user_data.xlsx",
-                "Excel Files (*.xlsx);;All Files (*)"
-            )
-
-            if file_path:
-                # Make sure it has the correct extension
-                if not file_path.endswith('.xlsx'):
-                    file_path += '.xlsx'
-
-                # Export to Excel
-                df.to_excel(file_path, index=False)
-
-                # Show success message
-                QMessageBox.information(
-                    self,
-                    "Export Successful",
-                    f"Data successfully exported to {file_path}"
-                )
-
-                # Show in status bar
-                self.statusBar().showMessage(f"Data exported to {file_path}", 5000)
-
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Export Error",
-                f"An error occurred during export: {str(e)}"
-            )
+        """Export user data to Excel/CSV file"""
+        # Every user matching the search, not only the pages loaded so far
+        self.start_export("user_data.xlsx", self.users_model.headers(), self.users_model.export_rows)
 
     def populate_admin_reports_table(self):
         """Fetch and display admin reports data from the database"""
         try:
-            # First, insert all current user data into admin_reports
-            insert_query = """
-            INSERT INTO admin_reports (user_id, user_name, email)
-            SELECT user_id, user_name, email FROM user
-            WHERE NOT EXISTS (
-                SELECT 1 FROM admin_reports ar 
-                WHERE ar.user_id = user.user_id
-            )
-            """
-            success, error = self.db_manager.execute_query(insert_query, commit=True)
+            # New users are copied in by AdminReportsSync; ask it for a pass
+            # now, the table reloads again if that adds anything
+            if hasattr(self, 'reports_sync'):
+                self.reports_sync.request_sync()
 
-            if not success:
-                QMessageBox.warning(self, "Database Error", f"Failed to generate reports: {error}")
-                return
-
-            # Clear the table
-            self.admin_reports_table.setRowCount(0)
+            self.admin_reports_model.reload()
 
-            # Fetch data from database
-            query = "SELECT report_id, user_id, user_name, email, report_date FROM admin_reports ORDER BY report_date DESC"
-            success, error = self.db_manager.execute_query(query)
-
-            if not success:
-                QMessageBox.warning(self, "Database Error", f"Failed to fetch admin reports: {error}")
+            if self.admin_reports_model.last_error:
+                QMessageBox.warning(self, "Database Error",
+                                    f"Failed to fetch admin reports: {self.admin_reports_model.last_error}")
                 return
 
-            # Get admin reports data
-            reports = self.db_manager.fetchall()
-
-            # Populate table
-            for i, report in enumerate(reports):
-                self.admin_reports_table.insertRow(i)
-
-                # Add report ID
-                report_id_item = QTableWidgetItem(str(report['report_id']))
-                self.admin_reports_table.setItem(i, 0, report_id_item)
-
-                # Add user ID
-                user_id_item = QTableWidgetItem(str(report['user_id']))
-                self.admin_reports_table.setItem(i, 1, user_id_item)
-
-                # Add username
-                username_item = QTableWidgetItem(report['user_name'])
-                self.admin_reports_table.setItem(i, 2, username_item)
-
-                # Add email
-                email_item = QTableWidgetItem(report['email'])
-                self.admin_reports_table.setItem(i, 3, email_item)
-
-                # Add report date
-                date_item = QTableWidgetItem(report['report_date'].strftime('%Y-%m-%d %H:%M:%S'))
-                self.admin_reports_table.setItem(i, 4, date_item)
-
             # Show success message
-            if len(reports) > 0:
-                self.statusBar().showMessage(f"Loaded {len(reports)} admin reports", 3000)
+            count = self.admin_reports_model.rowCount()
+            if count > 0:
+                more = " (more load as you scroll)" if self.admin_reports_model.canFetchMore() else ""
+                self.statusBar().showMessage(f"Loaded {count} admin reports{more}", 3000)
             else:
                 self.statusBar().showMessage("No admin reports found", 3000)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
 
-    def filter_admin_reports(self):
-        """Filter admin reports based on search input"""
-        search_text = self.reports_search.text().lower()
-
-        # Show/hide rows based on search
-        for row in range(self.admin_reports_table.rowCount()):
-            match_found = False
-
-            # Check username and email
-            username = self.admin_reports_table.item(row, 2).text().lower()
-            email = self.admin_reports_table.item(row, 3).text().lower()
-
-            if search_text in username or search_text in email:
-                match_found = True
+    def on_reports_synced(self, count):
+        """Show users the background sync just added to admin_reports"""
+        self.admin_reports_model.reload()
+        self.statusBar().showMessage(f"Added {count} new admin reports", 3000)
 
-            # Show/hide row
-            self.admin_reports_table.setRowHidden(row, not match_found)
+    def filter_admin_reports(self):
+        """Filter admin reports by username/email prefix (searched in the database)"""
+        self.admin_reports_model.set_search(self.reports_search.text())
 
     def export_admin_reports_to_excel(self):
-        """Export admin reports to Excel file"""
-        try:
-            # Get data from the table
-            data = []
-            headers = []
-
-            # Get headers
-            for col in range(self.admin_reports_table.columnCount()):
-                headers.append(self.admin_reports_table.horizontalHeaderItem(col).text())
-
-            # Get data from all visible rows
-            for row in range(self.admin_reports_table.rowCount()):
-                if not self.admin_reports_table.isRowHidden(row):
-                    row_data = []
-                    for col in range(self.admin_reports_table.columnCount()):
-                        item = self.admin_reports_table.item(row, col)
-                        if item:
-                            row_data.append(item.text())
-                        else:
-                            row_data.append("")
-                    data.append(row_data)
-
-            # Create DataFrame
-            df = pd.DataFrame(data, columns=headers)
-
-            # Ask user for save location
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Save Excel File",
-                "admin_reports.xlsx",
-                "Excel Files (*.xlsx);;All Files (*)"
-            )
-
-            if file_path:
-                # Make sure it has the correct extension
-                if not file_path.endswith('.xlsx'):
-                    file_path += '.xlsx'
-
-                # Export to Excel
-                df.to_excel(file_path, index=False)
-
-                # Show success message
-                QMessageBox.information(
-                    self,
-                    "Export Successful",
-                    f"Data successfully exported to {file_path}"
-                )
-
-                # Show in status bar
-                self.statusBar().showMessage(f"Admin reports exported to {file_path}", 5000)
+        """Export admin reports to Excel/CSV file"""
+        self.start_export("admin_reports.xlsx", self.admin_reports_model.headers(),
+                          self.admin_reports_model.export_rows)
+
+    def export_access_logs(self):
+        """Export the whole access log (can be millions of rows) to Excel/CSV file"""
+        fields = [field for field, header in ACCESS_LOG_COLUMNS]
+        headers = [header for field, header in ACCESS_LOG_COLUMNS]
+        self.start_export("access_logs.csv.gz", headers,
+                          lambda: table_rows(self.db_manager, 'access_logs', fields, 'log_id'))
+
+    def start_export(self, default_name, headers, make_rows):
+        """Ask for a file and stream make_rows() into it on a background thread"""
+        if self.export_job is not None and self.export_job.is_running():
+            QMessageBox.information(self, "Export Running", "Please wait for the current export to finish.")
+            return
+
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Export Data",
+            default_name,
+            EXPORT_FILTERS
+        )
+        if not file_path:
+            return
+        file_path = export_path(file_path, selected_filter)
 
+        try:
+            rows = make_rows()
         except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"An error occurred during export: {str(e)}")
+            return
+
+        # Row count is not known up front, so the dialog shows a busy bar
+        self.export_progress = QProgressDialog("Exporting...", "Cancel", 0, 0, self)
+        self.export_progress.setWindowTitle("Export Data")
+        self.export_progress.setWindowModality(Qt.WindowModality.NonModal)
+        self.export_progress.setMinimumDuration(500)
+
+        self.export_job = ExportJob(file_path, headers, rows)
+        self.export_job.progress.connect(self.on_export_progress)
+        self.export_job.finished.connect(self.on_export_finished)
+        self.export_progress.canceled.connect(self.export_job.cancel)
+        self.export_job.start()
+        self.statusBar().showMessage(f"Exporting to {file_path}...")
+
+    def on_export_progress(self, rows):
+        if self.export_progress is not None:
+            self.export_progress.setLabelText(f"Exported {rows:,} rows...")
+
+    def on_export_finished(self, file_path, rows, cancelled, error):
+        if self.export_progress is not None:
+            self.export_progress.reset()
+            self.export_progress = None
+
+        if error:
             QMessageBox.critical(
                 self,
                 "Export Error",
-                f"An error occurred during export: {str(e)}"
-            )
\ No newline at end of file
+                f"An error occurred during export: {error}"
+            )
+            self.statusBar().clearMessage()
+        elif cancelled:
+            self.statusBar().showMessage("Export cancelled", 5000)
+        else:
+            # Show success message
+            QMessageBox.information(
+                self,
+                "Export Successful",
+                f"{rows:,} rows successfully exported to {file_path}"
+            )
+            self.statusBar().showMessage(f"Data exported to {file_path}", 5000)
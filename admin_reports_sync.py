@@ -0,0 +1,207 @@
+# admin_reports_sync.py
+import threading
+import time
+
+from storage_backend import get_database_manager
+
+# Seconds between background syncs
+DEFAULT_SYNC_INTERVAL = 60.0
+
+# New users copied per statement
+DEFAULT_BATCH_SIZE = 1000
+
+
+class AdminReportsSync:
+    """
+    Keeps admin_reports holding one row per user. Users are only ever
+    appended (user_id is AUTO_INCREMENT), so the sync remembers the highest
+    user_id already copied and each pass reads just the users above it - a
+    primary key range - instead of anti-joining the whole user table.
+    create_user also queues its own row right away; the unique key on
+    admin_reports.user_id makes the two paths safe to overlap. Those rows
+    are fire-and-forget, so the mark comes from the user table, and the
+    first pass of each process anti-joins once to fill any that were lost.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every admin window shares one sync thread"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = AdminReportsSync()
+            return cls._instance
+
+    def __init__(self, manager=None, interval=DEFAULT_SYNC_INTERVAL, batch_size=DEFAULT_BATCH_SIZE):
+        self.manager = manager
+        self.interval = interval
+        self.batch_size = batch_size
+        self._high_water_mark = None
+        self._listeners = []
+        self._sync_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._requested = False
+        self._running = False
+        self._thread = None
+        self._stats = {
+            'passes': 0,
+            'rows_added': 0,
+            'failed_passes': 0,
+            'sync_seconds': 0.0,
+        }
+
+    def _get_manager(self):
+        if self.manager is None:
+            self.manager = get_database_manager()
+        return self.manager
+
+    @property
+    def high_water_mark(self):
+        """Highest user_id known to be in admin_reports (None before the first pass)"""
+        return self._high_water_mark
+
+    def add_listener(self, callback):
+        """callback(count) is called from the sync thread after rows were added"""
+        with self._condition:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._condition:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def sync(self):
+        """
+        Copy users added since the last pass into admin_reports.
+        Returns the number of rows added, or None on a database error.
+        """
+        with self._sync_lock:
+            started = time.perf_counter()
+            manager = self._get_manager()
+            added = 0
+            try:
+                if self._high_water_mark is None:
+                    # MAX over the primary key: read from the index, not the table
+                    result = manager.run("SELECT COALESCE(MAX(user_id), 0) AS hwm FROM user", fetch='one')
+                    if not result.success:
+                        print(f"❌ Error reading admin reports high-water mark: {result.error}")
+                        return None
+                    hwm = result.row['hwm']
+                    # Users up to the mark whose row create_user never wrote
+                    backfill = manager.run(
+                        """
+                        INSERT IGNORE INTO admin_reports (user_id, user_name, email)
+                        SELECT u.user_id, u.user_name, u.email
+                        FROM user u
+                        LEFT JOIN admin_reports a ON a.user_id = u.user_id
+                        WHERE a.user_id IS NULL AND u.user_id <= %s
+                        """,
+                        (hwm,),
+                        commit=True
+                    )
+                    if not backfill.success:
+                        print(f"❌ Error backfilling admin reports: {backfill.error}")
+                        return None
+                    added += max(backfill.rowcount, 0)
+                    self._high_water_mark = hwm
+
+                while True:
+                    result = manager.run(
+                        "SELECT user_id, user_name, email FROM user WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                        (self._high_water_mark, self.batch_size),
+                        fetch='all'
+                    )
+                    if not result.success:
+                        print(f"❌ Error reading new users: {result.error}")
+                        return None
+                    users = result.rows
+                    if not users:
+                        break
+
+                    insert = manager.run_many(
+                        "INSERT IGNORE INTO admin_reports (user_id, user_name, email) VALUES (%s, %s, %s)",
+                        [(user['user_id'], user['user_name'], user['email']) for user in users]
+                    )
+                    if not insert.success:
+                        print(f"❌ Error adding admin reports: {insert.error}")
+                        return None
+                    self._high_water_mark = users[-1]['user_id']
+                    # Rows create_user already queued are ignored, not counted
+                    added += max(insert.rowcount, 0)
+                    if len(users) < self.batch_size:
+                        break
+            finally:
+                with self._condition:
+                    self._stats['passes'] += 1
+                    self._stats['sync_seconds'] += time.perf_counter() - started
+                    self._stats['rows_added'] += added
+
+        if added:
+            self._notify(added)
+        return added
+
+    def resync(self):
+        """Forget the high-water mark and rescan; use after editing admin_reports by hand"""
+        with self._sync_lock:
+            self._high_water_mark = 0
+        return self.sync()
+
+    def _notify(self, count):
+        with self._condition:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(count)
+            except Exception as e:
+                print(f"Admin reports listener failed: {e}")
+
+    def start(self):
+        """Start syncing in the background every interval (no-op if running)"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._requested = True
+            self._thread = threading.Thread(target=self._run, name="admin-reports-sync", daemon=True)
+            self._thread.start()
+
+    def request_sync(self):
+        """Wake the background thread for a pass now"""
+        with self._condition:
+            self._requested = True
+            self._condition.notify_all()
+
+    def stop(self, timeout=5):
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+            thread = self._thread
+        thread.join(timeout)
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+        stats['high_water_mark'] = self._high_water_mark
+        return stats
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.interval
+                while self._running and not self._requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._running:
+                    return
+                self._requested = False
+
+            if self.sync() is None:
+                with self._condition:
+                    self._stats['failed_passes'] += 1
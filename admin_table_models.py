@@ -0,0 +1,242 @@
+# admin_table_models.py
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# Rows fetched per page (the view asks for more as it scrolls)
+DEFAULT_PAGE_SIZE = 200
+
+
+def format_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+# '!' rather than backslash: the same ESCAPE clause works on MySQL and SQLite
+LIKE_ESCAPE = '!'
+
+
+def escape_like(text):
+    for char in (LIKE_ESCAPE, '%', '_'):
+        text = text.replace(char, LIKE_ESCAPE + char)
+    return text
+
+
+class KeysetTableModel(QAbstractTableModel):
+    """
+    Read-only table over one database table, loaded a page at a time with
+    keyset pagination: each page continues after the last (sort value, key)
+    seen instead of using OFFSET, so page N costs the same as page 1.
+    Sorting and searching run in SQL and are limited to indexed columns;
+    search is a case-insensitive prefix match so it can use those indexes.
+    """
+
+    def __init__(self, manager, table, columns, key, sortable=(), search_fields=(),
+                 default_sort=None, default_order=Qt.SortOrder.AscendingOrder,
+                 page_size=DEFAULT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.table = table
+        # [(field, header)]
+        self.columns = list(columns)
+        self.fields = [field for field, header in self.columns]
+        self.key = key
+        self.sortable = set(sortable) | {key}
+        self.search_fields = list(search_fields)
+        self.page_size = page_size
+        self.sort_field = default_sort or key
+        self.sort_order = default_order
+        self.search_text = ""
+        self.rows = []
+        self.last_error = None
+        self._after = None
+        self._exhausted = False
+
+    # --- Qt model interface -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][1]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return format_cell(self.rows[index.row()][self.fields[index.column()]])
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        rows = self.fetch_page(self._after, self.page_size)
+        if rows is None:
+            # Stop asking until the next reload
+            self._exhausted = True
+            return
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if rows:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+            self._after = self._position(rows[-1])
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        field = self.fields[column]
+        if field not in self.sortable:
+            # Unindexed column: sorting it would scan the whole table
+            return
+        if field == self.sort_field and order == self.sort_order:
+            # Already in this order (e.g. the view applying its initial indicator)
+            return
+        self.sort_field = field
+        self.sort_order = order
+        self.reload()
+
+    # --- Loading ------------------------------------------------------------
+
+    def set_search(self, text):
+        text = text.strip()
+        if text != self.search_text:
+            self.search_text = text
+            self.reload()
+
+    def reload(self):
+        """Drop the loaded rows and fetch the first page again"""
+        self.beginResetModel()
+        self.rows = []
+        self._after = None
+        self._exhausted = False
+        self.last_error = None
+        self.endResetModel()
+        self.fetchMore()
+
+    def _view(self):
+        # What a page query depends on; export threads keep their own copy
+        return self.sort_field, self.sort_order, self.search_text
+
+    def _position(self, row, view=None):
+        sort_field = (view or self._view())[0]
+        if sort_field == self.key:
+            return (row[self.key],)
+        return (row[sort_field], row[self.key])
+
+    def _page_query(self, after, limit, view=None):
+        sort_field, sort_order, search_text = view or self._view()
+        descending = sort_order == Qt.SortOrder.DescendingOrder
+        direction = "DESC" if descending else "ASC"
+        compare = "<" if descending else ">"
+        conditions = []
+        params = []
+
+        if search_text and self.search_fields:
+            pattern = escape_like(search_text) + '%'
+            conditions.append("(" + " OR ".join(f"{field} LIKE %s ESCAPE '{LIKE_ESCAPE}'"
+                                                for field in self.search_fields) + ")")
+            params.extend([pattern] * len(self.search_fields))
+
+        if after is not None:
+            if sort_field == self.key:
+                conditions.append(f"{self.key} {compare} %s")
+                params.append(after[0])
+            else:
+                # Expanded row comparison; (a, b) > (x, y) does not use the index on MySQL
+                conditions.append(f"({sort_field} {compare} %s OR "
+                                  f"({sort_field} = %s AND {self.key} {compare} %s))")
+                params.extend([after[0], after[0], after[1]])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = f"{sort_field} {direction}"
+        if sort_field != self.key:
+            order += f", {self.key} {direction}"
+        query = f"SELECT {', '.join(self.fields)} FROM {self.table} {where} ORDER BY {order} LIMIT %s"
+        params.append(limit)
+        return query, params
+
+    def fetch_page(self, after, limit, view=None):
+        """Rows after the given position (None = from the start), or None on error"""
+        query, params = self._page_query(after, limit, view)
+        result = self.manager.run(query, params, fetch='all')
+        if not result.success:
+            if view is None:
+                self.last_error = result.error
+            print(f"❌ Error loading {self.table}: {result.error}")
+            return None
+        return result.rows
+
+    def iter_rows(self, batch_size=5000):
+        """
+        Every row matching the search and sort in effect now, page by page.
+        Safe to consume on another thread: later sort/search changes in the
+        view do not affect it.
+        """
+        view = self._view()
+
+        def rows():
+            after = None
+            while True:
+                page = self.fetch_page(after, batch_size, view)
+                if page is None:
+                    raise RuntimeError(f"Error reading {self.table}")
+                if not page:
+                    return
+                yield from page
+                if len(page) < batch_size:
+                    return
+                after = self._position(page[-1], view)
+
+        return rows()
+
+    def export_rows(self, batch_size=5000):
+        """iter_rows() as value lists in column order, for streaming_export"""
+        fields = list(self.fields)
+        return ([row[field] for field in fields] for row in self.iter_rows(batch_size))
+
+    def headers(self):
+        return [header for field, header in self.columns]
+
+    def row_text(self, row):
+        return [format_cell(row[field]) for field in self.fields]
+
+
+class UsersTableModel(KeysetTableModel):
+    def __init__(self, manager, parent=None):
+        super().__init__(
+            manager, 'user',
+            columns=[('user_id', "User ID"), ('user_name', "Username"), ('email', "Email")],
+            key='user_id',
+            # user_name and email have unique indexes
+            sortable=('user_name', 'email'),
+            search_fields=('user_name', 'email'),
+            parent=parent,
+        )
+
+
+class AdminReportsTableModel(KeysetTableModel):
+    def __init__(self, manager, parent=None):
+        super().__init__(
+            manager, 'admin_reports',
+            columns=[('report_id', "Report ID"), ('user_id', "User ID"), ('user_name', "Username"),
+                     ('email', "Email"), ('report_date', "Report Date")],
+            key='report_id',
+            # Indexed in mysql/saras.sql
+            sortable=('user_id', 'user_name', 'email', 'report_date'),
+            search_fields=('user_name', 'email'),
+            default_sort='report_date',
+            default_order=Qt.SortOrder.DescendingOrder,
+            parent=parent,
+        )
@@ -4,14 +4,14 @@ from PyQt6.QtCore import Qt, QTimer, QRect
 from PyQt6.QtGui import QFont, QScreen
 import sys
 from admin_dashboard import AdminDashboard
-from database_manager import DatabaseManager
+from storage_backend import get_database_manager, run_deferred
 
 
 class AdminLoginWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         # Initialize database connection
-        self.db_manager = DatabaseManager.get_instance()
+        self.db_manager = get_database_manager()
         self.init_ui()
 
     def init_ui(self):
@@ -186,19 +186,19 @@ class AdminLoginWindow(QMainWindow):
 
             # Check admin credentials in database
             query = "SELECT * FROM admin WHERE admin_name = %s AND password = %s"
-            success, error = self.db_manager.execute_query(query, (username, password))
+            result = self.db_manager.run(query, (username, password), fetch='one')
 
-            if not success:
-                self.status_label.setText(f"Login error: {error}")
+            if not result.success:
+                self.status_label.setText(f"Login error: {result.error}")
                 self.shake_window()
                 return
 
-            admin = self.db_manager.fetchone()
+            admin = result.row
 
             if admin:
-                # Update last login time
+                # Update last login time in the background; the login does not wait for it
                 update_query = "UPDATE admin SET last_login = NOW() WHERE admin_id = %s"
-                self.db_manager.execute_query(update_query, (admin['admin_id'],), commit=True)
+                run_deferred(update_query, (admin['admin_id'],), self.db_manager)
 
                 self.status_label.setText("")
                 self.open_admin_dashboard()
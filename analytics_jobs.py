@@ -0,0 +1,272 @@
+# analytics_jobs.py
+#
+# Background refresh for the analytics table. Symbols are split into small
+# chunks; each chunk is downloaded (history store tail refresh) and scored
+# (vectorized indicator panel) in a worker process, and its rows are sent
+# back to the GUI thread as soon as the chunk completes.
+import math
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed, wait
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import rate_limiter
+from history_store import HistoryStore
+from indicator_graph import IndicatorGraph, merge_timing_reports, print_timing_report
+from indicator_panel import IndicatorPanel, score_panel, SIGNAL_NAMES
+
+# Most symbols scored by one worker call: small enough that rows stream back
+# steadily, big enough for the vectorized panel to be worth it
+MAX_CHUNK_SIZE = 25
+
+# Latest-bar values sent back for each row
+RESULT_KEYS = ('close', 'ema_5', 'ema_20', 'sma_50', 'sma_100', 'rsi', 'adx')
+
+# Print the slowest indicator nodes after each refresh (debugging aid)
+PRINT_TIMINGS = False
+
+
+# Per-host limits of this process before a pool took its share, and how
+# many pools are running
+_full_limits = None
+_pools = 0
+_pools_lock = threading.Lock()
+
+
+def _init_worker(host_limits, default_limit):
+    """
+    Pool initializer (and how the GUI process takes its own share). Every
+    process has its own token buckets, so each one gets an equal share of
+    the per-host limits.
+    """
+    rate_limiter.DEFAULT_LIMIT = default_limit
+    for host, (rate, burst) in host_limits.items():
+        rate_limiter.configure(host, rate, burst)
+
+
+def _split_limits(shares):
+    def share(limit):
+        rate, burst = limit
+        return rate / shares, max(1, int(burst // shares))
+    host_limits, default_limit = _full_limits
+    return {host: share(limit) for host, limit in host_limits.items()}, share(default_limit)
+
+
+def _take_parent_share(workers):
+    """
+    Split the limits into workers + 1 shares, as the GUI process keeps
+    downloading (charts, visible rows) while the pool runs; this process
+    keeps one share. Returns the limits for each worker.
+    """
+    global _full_limits, _pools
+    with _pools_lock:
+        if _pools == 0:
+            _full_limits = (dict(rate_limiter.HOST_LIMITS), rate_limiter.DEFAULT_LIMIT)
+        _pools += 1
+        limits = _split_limits(workers + 1)
+        _init_worker(*limits)
+    return limits
+
+
+def _return_parent_share():
+    """Give this process its full limits back once no pool is running"""
+    global _pools
+    with _pools_lock:
+        _pools -= 1
+        if _pools == 0:
+            _init_worker(*_full_limits)
+
+
+def refresh_chunk(symbols, priorities, interval='1d', adjusted=True):
+    """
+    Worker entry point: refresh the stored history of each symbol and score
+    the chunk as one panel. Returns one result dict per symbol plus the
+    indicator graph timings of this call.
+    """
+    store = HistoryStore.get_instance()
+    errors = {}
+    for symbol, priority in zip(symbols, priorities):
+        try:
+            store.refresh(symbol, interval=interval, adjusted=adjusted, priority=priority)
+        except Exception as e:
+            print(f"Error refreshing history for {symbol}: {str(e)}")
+            errors[symbol] = str(e)
+
+    graph = IndicatorGraph.get_instance()
+    graph.reset_timings()
+    panel = IndicatorPanel.from_store(symbols, store, interval, adjusted)
+    values, votes = score_panel(panel, graph)
+
+    results = []
+    for i, symbol in enumerate(symbols):
+        result = {key: float(values[key][i, -1]) for key in RESULT_KEYS}
+        result.update({
+            'symbol': symbol,
+            'bar_count': int(panel.bar_counts[i]),
+            'trend_direction': "Up" if votes['trend_up'][i] else "Down",
+            'signal': SIGNAL_NAMES[int(votes['signal'][i])],
+            'error': errors.get(symbol),
+        })
+        results.append(result)
+    return results, graph.timing_report()
+
+
+class AnalyticsRefreshJob(QObject):
+    """
+    One refresh of a list of symbols. Signals are emitted from the
+    collector thread and delivered on the GUI thread.
+    """
+    row_ready = pyqtSignal(object)          # result dict from refresh_chunk
+    progress = pyqtSignal(int, int)         # rows done, rows total
+    finished = pyqtSignal(int, int, bool)   # succeeded, failed, cancelled
+
+    def __init__(self, executor, symbols, priorities, chunk_size, wait_for=()):
+        super().__init__()
+        self.executor = executor
+        self.symbols = list(symbols)
+        self.priorities = list(priorities)
+        self.chunk_size = chunk_size
+        # Chunks of a cancelled job that were already running; their
+        # processes may still be writing the same history files
+        self.wait_for = list(wait_for)
+        self.futures = []
+        self.done_symbols = set()
+        self.cancelled = False
+        self.done = False
+        # merge_timing_reports() of all chunks, once the job has finished
+        self.timing_report = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="analytics-refresh", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop submitting work and drop the results of chunks still running"""
+        with self._lock:
+            self.cancelled = True
+            for future in self.futures:
+                future.cancel()
+
+    def running_futures(self):
+        with self._lock:
+            return [f for f in self.futures + self.wait_for if not f.done()]
+
+    def pending_symbols(self):
+        """Symbols whose rows have not been delivered yet"""
+        with self._lock:
+            return [s for s in self.symbols if s not in self.done_symbols]
+
+    def _run(self):
+        total = len(self.symbols)
+        succeeded = 0
+        failed = 0
+        timings = []
+
+        if self.wait_for:
+            wait(self.wait_for)
+
+        with self._lock:
+            if not self.cancelled:
+                for start in range(0, total, self.chunk_size):
+                    chunk = self.symbols[start:start + self.chunk_size]
+                    priorities = self.priorities[start:start + self.chunk_size]
+                    future = self.executor.submit(refresh_chunk, chunk, priorities)
+                    future.chunk = chunk
+                    self.futures.append(future)
+            futures = list(self.futures)
+
+        for future in as_completed(futures):
+            if self.cancelled:
+                break
+            try:
+                results, chunk_timings = future.result()
+                timings.append(chunk_timings)
+            except CancelledError:
+                continue
+            except Exception as e:
+                print(f"Error in analytics refresh worker: {str(e)}")
+                traceback.print_exc()
+                results = [{'symbol': symbol, 'error': str(e)} for symbol in future.chunk]
+
+            for result in results:
+                if self.cancelled:
+                    break
+                with self._lock:
+                    self.done_symbols.add(result['symbol'])
+                if result.get('error') and result.get('bar_count', 0) == 0:
+                    failed += 1
+                else:
+                    succeeded += 1
+                self.row_ready.emit(result)
+            self.progress.emit(succeeded + failed, total)
+
+        self.timing_report = merge_timing_reports(*timings)
+        if PRINT_TIMINGS and timings and not self.cancelled:
+            print_timing_report(self.timing_report, limit=5)
+        self.done = True
+        self.finished.emit(succeeded, failed, self.cancelled)
+
+
+class AnalyticsJobRunner:
+    """
+    Owns the process pool (one worker per core, started on first use) and
+    the current refresh job. Starting a job cancels the previous one.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.job = None
+
+    def _get_executor(self):
+        if self.executor is None:
+            host_limits, default_limit = _take_parent_share(self.workers)
+            # spawn: never fork a process that is running Qt threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(host_limits, default_limit),
+            )
+        return self.executor
+
+    def chunk_size(self, count):
+        # A few chunks per worker so results keep arriving
+        return max(1, min(MAX_CHUNK_SIZE, math.ceil(count / (self.workers * 4))))
+
+    def start(self, symbols, priorities):
+        """Cancel the running job (if any) and start refreshing symbols"""
+        wait_for = []
+        if self.job is not None:
+            self.job.cancel()
+            wait_for = self.job.running_futures()
+        self.job = AnalyticsRefreshJob(self._get_executor(), symbols, priorities,
+                                       self.chunk_size(len(symbols)), wait_for)
+        return self.job
+
+    def cancel(self):
+        """Cancel the running job; returns it so callers can resubmit its pending symbols"""
+        job = self.job
+        if job is not None:
+            job.cancel()
+        return job
+
+    def is_running(self):
+        return self.job is not None and not self.job.cancelled and not self.job.done
+
+    def shutdown(self):
+        job = self.cancel()
+        self.job = None
+        if self.executor is not None:
+            # shutdown(cancel_futures=True) needs Python 3.9: cancel the queued chunks here
+            if job is not None:
+                for future in job.running_futures():
+                    future.cancel()
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            _return_parent_share()
@@ -0,0 +1,348 @@
+# audit_log.py
+import atexit
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+# Write buffered records at least this often (seconds)
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+# Write early once this many records are buffered
+DEFAULT_BATCH_SIZE = 200
+
+# Records kept in memory while MySQL is unreachable and spilling is off;
+# the oldest are dropped beyond this
+DEFAULT_MAX_BUFFERED = 10000
+
+# Records that could not be inserted are appended here and replayed later
+DEFAULT_SPILL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  'stock_data', 'audit_spool.jsonl')
+
+# Records the database rejected even when inserted alone are moved here
+DEFAULT_QUARANTINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       'stock_data', 'audit_rejected.jsonl')
+
+COLUMNS = ('user_id', 'admin_id', 'action_type', 'timestamp', 'ip_address', 'status', 'details')
+
+
+def _local_ip():
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return '127.0.0.1'
+
+
+class AuditLog:
+    """
+    Buffered writer for access_logs. log() only appends a record (with its
+    own timestamp) to memory; a background thread bulk-inserts the buffer.
+    Records that cannot be written are spilled to disk and retried on the
+    next flush (records the database rejects are quarantined), and the buffer is flushed when the process exits.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every window shares one buffer and one writer thread"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = AuditLog()
+            return cls._instance
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, batch_size=DEFAULT_BATCH_SIZE,
+                 spill_path=DEFAULT_SPILL_PATH, max_buffered=DEFAULT_MAX_BUFFERED, manager=None,
+                 quarantine_path=DEFAULT_QUARANTINE_PATH):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # None keeps failed records in memory only
+        self.spill_path = spill_path
+        # None drops rejected records
+        self.quarantine_path = quarantine_path
+        self.max_buffered = max_buffered
+        self._manager = manager
+        self._ip_address = None
+        self._buffer = []
+        self._condition = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+        self._stats = {
+            'logged': 0,
+            'written': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'quarantined': 0,
+            'dropped': 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _get_manager(self):
+        if self._manager is None:
+            from storage_backend import get_database_manager
+            self._manager = get_database_manager()
+        return self._manager
+
+    @property
+    def ip_address(self):
+        """Local address, resolved once (simplified for local development)"""
+        if self._ip_address is None:
+            self._ip_address = _local_ip()
+        return self._ip_address
+
+    def log(self, user_id=None, admin_id=None, action_type="", status="", details=None):
+        """Queue one access_logs record; never waits for the database"""
+        record = {
+            'user_id': user_id,
+            'admin_id': admin_id,
+            'action_type': action_type,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'status': status,
+            'details': json.dumps(details) if details else None,
+        }
+        with self._condition:
+            if self._closed:
+                # Too late for the writer thread; keep the record on disk
+                self._spill([record])
+                return
+            self._buffer.append(record)
+            self._stats['logged'] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush_requested = True
+                self._condition.notify_all()
+
+    def flush(self, wait=True, timeout=None):
+        """Write everything buffered so far; returns False if it did not finish in time"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            if not wait:
+                return True
+            while (self._buffer or self._writing) and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return not self._buffer
+
+    def close(self, timeout=10):
+        """Write (or spill) what is buffered and stop the writer thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("Audit log did not finish writing before shutdown")
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats['buffered'] = len(self._buffer)
+        return stats
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._flush_requested or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                records = self._buffer
+                self._buffer = []
+                self._flush_requested = False
+                self._writing = True
+                closed = self._closed
+
+            self._write(records, final=closed)
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+                if closed and not self._buffer:
+                    return
+
+    def _write(self, records, final=False):
+        """Replay spilled records in chunks, then insert the new ones"""
+        reachable = self._replay_spill()
+        if records and reachable:
+            records = records[self._insert_batch(records):]
+        if not records:
+            return
+
+        # The database is unreachable
+        if self.spill_path and self._spill(records):
+            return
+        if final:
+            with self._condition:
+                self._stats['dropped'] += len(records)
+            print(f"❌ Audit log lost {len(records)} records on shutdown")
+            return
+        with self._condition:
+            # Keep them for the next attempt, bounded so a long outage cannot exhaust memory
+            self._buffer = records + self._buffer
+            overflow = len(self._buffer) - self.max_buffered
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._stats['dropped'] += overflow
+
+    def _replay_spill(self):
+        """
+        Insert the spill file batch_size records at a time, oldest first.
+        Returns False if the database became unreachable before it was empty.
+        """
+        while True:
+            chunk = self._read_spill(limit=self.batch_size)
+            if not chunk:
+                return True
+            done = self._insert_batch(chunk)
+            if done:
+                self._remove_spill(done)
+                with self._condition:
+                    self._stats['replayed'] += done
+            if done < len(chunk):
+                return False
+
+    def _insert_batch(self, batch):
+        """
+        Insert batch in one statement. If that fails, insert its records one
+        at a time and quarantine those the database rejects on their own
+        (e.g. a user_id that no longer exists), so one bad record cannot
+        block every later batch. Returns how many records from the start of
+        the batch were dealt with; fewer than len(batch) means the database
+        could not be reached.
+        """
+        if self._insert(batch):
+            with self._condition:
+                self._stats['batches'] += 1
+                self._stats['written'] += len(batch)
+            return len(batch)
+
+        with self._condition:
+            self._stats['failed_batches'] += 1
+        for i, record in enumerate(batch):
+            if len(batch) > 1 and self._insert([record]):
+                with self._condition:
+                    self._stats['written'] += 1
+                continue
+            if not self._reachable():
+                return i
+            self._quarantine(record)
+        return len(batch)
+
+    def _reachable(self):
+        try:
+            return self._get_manager().run("SELECT 1", fetch='one').success
+        except Exception:
+            return False
+
+    def _insert(self, batch):
+        try:
+            query = f"""
+            INSERT INTO access_logs
+            ({', '.join(COLUMNS)})
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """
+            ip_address = self.ip_address
+            rows = []
+            for record in batch:
+                record.setdefault('ip_address', ip_address)
+                rows.append([record[column] for column in COLUMNS])
+
+            success, error = self._get_manager().run_many(query, rows)
+            if not success:
+                print(f"❌ Error logging access: {error}")
+            return success
+        except Exception as e:
+            print(f"❌ Error logging access: {e}")
+            return False
+
+    # --- Spill file -----------------------------------------------------------
+
+    def _spill(self, records):
+        if not self.spill_path or not records:
+            return False
+        try:
+            with self._spill_lock:
+                _append_records(self.spill_path, records)
+            with self._condition:
+                self._stats['spilled'] += len(records)
+            return True
+        except OSError as e:
+            print(f"❌ Error spilling audit log to disk: {e}")
+            return False
+
+    def _quarantine(self, record):
+        print(f"❌ Audit record rejected by the database, quarantined: {record.get('action_type')}")
+        with self._condition:
+            self._stats['quarantined'] += 1
+        if not self.quarantine_path:
+            return
+        try:
+            _append_records(self.quarantine_path, [record])
+        except OSError as e:
+            print(f"❌ Error writing audit quarantine file: {e}")
+
+    def _read_spill(self, limit=None):
+        with self._spill_lock:
+            return self._read_spill_locked(limit)
+
+    def _read_spill_locked(self, limit=None):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        records = []
+        try:
+            with open(self.spill_path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            # A half-written last line from a crash
+                            continue
+                        if len(records) == limit:
+                            break
+        except OSError as e:
+            print(f"❌ Error reading audit spill file: {e}")
+        return records
+
+    def _remove_spill(self, count):
+        """Drop the first count spilled records (log() may have appended more since)"""
+        try:
+            with self._spill_lock:
+                remaining = self._read_spill_locked()[count:]
+                if remaining:
+                    temp_path = self.spill_path + '.tmp'
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        for record in remaining:
+                            f.write(json.dumps(record) + "\n")
+                    os.replace(temp_path, self.spill_path)
+                else:
+                    os.remove(self.spill_path)
+        except OSError as e:
+            print(f"❌ Error clearing audit spill file: {e}")
+
+
+def _append_records(path, records):
+    """Append records to a JSON-lines file and sync it to disk"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
@@ -0,0 +1,134 @@
+# benchmarks/chart_render.py
+#
+# Time to build and draw a candlestick + volume chart (the StockChart
+# layout, 10x6 in at 100 dpi) for growing bar counts, with the per-bar
+# artists StockChart used to create and with chart_renderers, and the
+# time of one blitted pan frame (the price/volume collections drawn over a
+# saved background, as ChartInteraction does while dragging).
+#
+#   python benchmarks/chart_render.py
+#   python benchmarks/chart_render.py --bars 250 1250 5000 20000 --legacy-max 1250
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chart_renderers import aggregate_bars, draw_candlesticks, draw_volume, max_bars_for, ohlcv_arrays
+
+UP, DOWN = '#00c853', '#ff1744'
+
+
+def make_bars(count, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1000.0 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, 0.002, count))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, count)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, count)))
+    volume = rng.integers(1e5, 1e7, count).astype(np.float64)
+    index = pd.date_range('2000-01-03', periods=count, freq='B', tz='Asia/Kolkata')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+
+def new_figure():
+    figure = Figure(figsize=(10, 6), dpi=100)
+    gs = figure.add_gridspec(2, 1, height_ratios=[3, 1], hspace=0)
+    ax = figure.add_subplot(gs[0])
+    volume_ax = figure.add_subplot(gs[1], sharex=ax)
+    return figure, ax, volume_ax
+
+
+def render_legacy(data):
+    """Per-bar artists, as StockChart drew candles before chart_renderers"""
+    figure, ax, volume_ax = new_figure()
+    up = data[data.Close >= data.Open]
+    down = data[data.Close < data.Open]
+    ax.bar(up.index, up.Close - up.Open, 0.8, bottom=up.Open, color=UP, zorder=3, edgecolor='black', linewidth=0.5)
+    ax.bar(down.index, down.Open - down.Close, 0.8, bottom=down.Close, color=DOWN, zorder=3,
+           edgecolor='black', linewidth=0.5)
+    for idx, row in data.iterrows():
+        ax.plot([idx, idx], [max(row.Open, row.Close), row.High], color='black', linewidth=1, alpha=0.8, zorder=4)
+        ax.plot([idx, idx], [min(row.Open, row.Close), row.Low], color='black', linewidth=1, alpha=0.8, zorder=4)
+    colors = np.where(data['Close'] >= data['Open'], UP, DOWN)
+    volume_ax.bar(data.index, data['Volume'], color=colors, alpha=0.3, width=0.8, edgecolor='black', linewidth=0.2)
+    figure.canvas.draw()
+
+
+def render_collections(data, level_of_detail=True):
+    figure, ax, volume_ax = new_figure()
+    bars = ohlcv_arrays(data)
+    if level_of_detail:
+        bars = aggregate_bars(*bars, max_bars=max_bars_for(ax))
+    x, open_, high, low, close, volume = bars
+    draw_candlesticks(ax, x, open_, high, low, close, UP, DOWN)
+    draw_volume(volume_ax, x, volume, np.where(close >= open_, UP, DOWN), 0.3, edge_color='black', edge_width=0.2)
+    figure.canvas.draw()
+
+
+def pan_frame_ms(data, frames=50):
+    figure, ax, volume_ax = new_figure()
+    x, open_, high, low, close, volume = aggregate_bars(*ohlcv_arrays(data), max_bars=max_bars_for(ax))
+    draw_candlesticks(ax, x, open_, high, low, close, UP, DOWN)
+    draw_volume(volume_ax, x, volume, np.where(close >= open_, UP, DOWN), 0.3, edge_color='black', edge_width=0.2)
+    moving = list(ax.collections) + list(volume_ax.collections)
+    for artist in moving:
+        artist.set_animated(True)
+    canvas = FigureCanvasAgg(figure)
+    canvas.draw()
+    background = canvas.copy_from_bbox(figure.bbox)
+    xmin, xmax = ax.get_xlim()
+    step = (xmax - xmin) / 200.0
+
+    started = time.perf_counter()
+    for i in range(frames):
+        ax.set_xlim(xmin - i * step, xmax - i * step)
+        canvas.restore_region(background)
+        for artist in moving:
+            artist.axes.draw_artist(artist)
+        canvas.blit(figure.bbox)
+    elapsed = time.perf_counter() - started
+    plt.close('all')
+    return elapsed / frames * 1000.0
+
+
+def best_of(repeat, func, *args, **kwargs):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - started)
+        plt.close('all')
+    return min(times) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candlestick chart draw time vs bar count")
+    parser.add_argument('--bars', type=int, nargs='+', default=[100, 250, 1250, 5000, 20000])
+    parser.add_argument('--legacy-max', type=int, default=1250,
+                        help="skip the per-bar renderer above this many bars (it takes seconds)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'bars':>7} {'per-bar artists ms':>19} {'collections ms':>15} {'collections+LOD ms':>19} "
+          f"{'pan frame ms':>13}")
+    for count in args.bars:
+        data = make_bars(count)
+        legacy = f"{best_of(1, render_legacy, data):>19.1f}" if count <= args.legacy_max else f"{'-':>19}"
+        plain = best_of(args.repeat, render_collections, data, level_of_detail=False)
+        lod = best_of(args.repeat, render_collections, data)
+        pan = pan_frame_ms(data)
+        print(f"{count:>7} {legacy} {plain:>15.1f} {lod:>19.1f} {pan:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/db_roundtrips.py
+#
+# Counts the database round trips each DatabaseConnection operation makes
+# on the calling thread (the one the user waits on), and times them with a
+# simulated network delay per round trip. Every statement sent on a
+# connection counts, including the COMMIT/ROLLBACK/ping around queries. Writes that happen on the audit
+# log / deferred-write threads are counted separately.
+#
+#   python benchmarks/db_roundtrips.py                  # temporary SQLite file
+#   python benchmarks/db_roundtrips.py --latency-ms 20  # remote-MySQL-like link
+#   STOCKMARKET_DB_BACKEND=mysql python benchmarks/db_roundtrips.py
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if 'STOCKMARKET_DB_BACKEND' not in os.environ:
+    os.environ['STOCKMARKET_DB_BACKEND'] = 'sqlite'
+    os.environ['STOCKMARKET_SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(), 'roundtrips.sqlite3')
+
+
+class StatementCounter:
+    """
+    Counts (and optionally delays) every statement a connection sends,
+    including the COMMIT/ROLLBACK/ping the manager issues around queries
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.caller = threading.get_ident()
+        self.foreground = 0
+        self.background = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def count(self):
+        with self._lock:
+            if threading.get_ident() == self.caller:
+                self.foreground += 1
+            else:
+                self.background += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def wrap(self, method):
+        """method counted once per call (commit() calling cmd_query() is still one statement)"""
+        def counted(*args, **kwargs):
+            depth = getattr(self._local, 'depth', 0)
+            if depth == 0:
+                self.count()
+            self._local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+        return counted
+
+    def patch_mysql(self, connection):
+        for name in MYSQL_WIRE_METHODS:
+            setattr(connection, name, self.wrap(getattr(connection, name)))
+        return connection
+
+
+# Connection methods that send something to a MySQL server (pure Python and C extension)
+MYSQL_WIRE_METHODS = ('cmd_query', 'cmd_ping', 'ping', 'commit', 'rollback')
+
+
+class CountingSQLiteConnection:
+    """sqlite3 connection whose statements go through a StatementCounter"""
+
+    def __init__(self, connection, counter):
+        self._connection = connection
+        self.execute = counter.wrap(connection.execute)
+        self.executemany = counter.wrap(connection.executemany)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def count_statements(manager, counter):
+    """Route every connection the manager hands out through counter"""
+    connect = manager.connect
+    if manager.dialect == 'sqlite':
+        manager.connect = lambda: CountingSQLiteConnection(connect(), counter)
+        return
+
+    def counting_connect():
+        connection = connect()
+        return counter.patch_mysql(connection) if connection is not None else None
+
+    manager.connect = counting_connect
+    # Connections the pool opened before the counter was installed
+    for connection, _ in list(manager._idle.queue):
+        counter.patch_mysql(connection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trips per DatabaseConnection operation")
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help="delay added to every round trip")
+    args = parser.parse_args()
+
+    from audit_log import AuditLog
+    from database import DatabaseConnection
+    from storage_backend import get_database_manager
+
+    counter = StatementCounter(args.latency_ms / 1000.0)
+    count_statements(get_database_manager(), counter)
+    db = DatabaseConnection()
+    audit = AuditLog.get_instance()
+
+    suffix = uuid.uuid4().hex[:8]
+    username, email = f"bench_{suffix}", f"bench_{suffix}@example.com"
+    state = {}
+
+    def login():
+        success, info = db.verify_login(username, 'secret')
+        state['user_id'] = info['user_id']
+
+    def portfolio_id():
+        return db.get_user_portfolio(state['user_id'])[0]['portfolio_id']
+
+    def analytics_id():
+        return db.get_user_analytics_preferences(state['user_id'])[0]['preference_id']
+
+    operations = [
+        ("create_user", lambda: db.create_user(username, email, 'secret')),
+        ("create_user (duplicate name)", lambda: db.create_user(username, 'other_' + email, 'secret')),
+        ("verify_login", login),
+        ("verify_login (bad password)", lambda: db.verify_login(username, 'wrong')),
+        ("add_to_watchlist", lambda: db.add_to_watchlist(state['user_id'], 'TCS.NS')),
+        ("get_user_watchlist (cold)", lambda: db.get_user_watchlist(state['user_id'])),
+        ("get_user_watchlist (cached)", lambda: db.get_user_watchlist(state['user_id'])),
+        ("remove_from_watchlist", lambda: db.remove_from_watchlist(state['user_id'], 'TCS.NS')),
+        ("add_to_portfolio", lambda: db.add_to_portfolio(state['user_id'], 'INFY.NS', 5, 1500.0, '2024-01-02')),
+        ("get_user_portfolio (cold)", lambda: db.get_user_portfolio(state['user_id'])),
+        ("remove_from_portfolio (cached)", lambda: db.remove_from_portfolio(state['user_id'], state['pid'])),
+        ("add_to_portfolio", lambda: db.add_to_portfolio(state['user_id'], 'INFY.NS', 5, 1500.0, '2024-01-02')),
+        ("remove_from_portfolio (uncached)", lambda: db.remove_from_portfolio(state['user_id'], state['pid'])),
+        ("add_analytics_preference", lambda: db.add_analytics_preference(state['user_id'], 'SBIN.NS')),
+        ("remove_analytics_preference (uncached)",
+         lambda: db.remove_analytics_preference(state['user_id'], state['aid'])),
+    ]
+
+    print(f"Backend: {os.environ['STOCKMARKET_DB_BACKEND']}, "
+          f"simulated latency {args.latency_ms:.1f} ms per round trip\n")
+    print(f"{'operation':<42} {'round trips':>11} {'ms':>9}")
+    for name, operation in operations:
+        # Ids for the removals are read before the measured call
+        if name == "remove_from_portfolio (cached)":
+            state['pid'] = portfolio_id()
+        elif name == "remove_from_portfolio (uncached)":
+            db.get_user_portfolio(state['user_id'], refresh=True)
+            state['pid'] = portfolio_id()
+            db.cache.invalidate(user_id=state['user_id'])
+        elif name.startswith("remove_analytics_preference"):
+            state['aid'] = analytics_id()
+            db.cache.invalidate(user_id=state['user_id'])
+
+        before = counter.foreground
+        started = time.perf_counter()
+        operation()
+        elapsed = (time.perf_counter() - started) * 1000.0
+        print(f"{name:<42} {counter.foreground - before:>11} {elapsed:>9.2f}")
+
+    audit.flush()
+    time.sleep(0.1)
+    print(f"\nBackground round trips (audit log, deferred writes): {counter.background}")
+
+    # Leave a MySQL database as it was
+    db.manager.run("DELETE FROM user WHERE user_id = %s", (state['user_id'],), commit=True)
+
+
+if __name__ == '__main__':
+    main()
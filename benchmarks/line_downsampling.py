@@ -0,0 +1,106 @@
+# benchmarks/line_downsampling.py
+#
+# Close + four moving averages + volume, as the StockChart line chart draws
+# them, at full resolution and downsampled (LTTB for lines, min/max
+# envelope for volume): time to downsample, time to draw the series, points
+# kept, and how many of the pixels the full close line paints differ when
+# it is drawn downsampled.
+#
+#   python benchmarks/line_downsampling.py
+#   python benchmarks/line_downsampling.py --bars 10000 100000 1000000
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chart_render import make_bars, new_figure
+from chart_renderers import bar_positions, draw_volume, max_bars_for
+from downsampling import lttb, minmax_indices, point_budget
+
+MA_WINDOWS = (5, 10, 50, 100)
+
+
+def series(data):
+    x = bar_positions(data.index)
+    close = data['Close']
+    lines = [close.to_numpy()] + [close.rolling(window).mean().to_numpy() for window in MA_WINDOWS]
+    return x, lines, data['Volume'].to_numpy(dtype=np.float64)
+
+
+def draw_series(x, lines, volume, downsample):
+    figure, ax, volume_ax = new_figure()
+    canvas = FigureCanvasAgg(figure)
+    started = time.perf_counter()
+    points = 0
+    if downsample:
+        budget = point_budget(ax)
+        plotted = [lttb(x, y, budget) for y in lines]
+        keep = minmax_indices(volume, max_bars_for(volume_ax) // 2)
+        bars = (x[keep], volume[keep])
+    else:
+        plotted = [(x, y) for y in lines]
+        bars = (x, volume)
+    prepared = time.perf_counter() - started
+
+    for line_x, line_y in plotted:
+        ax.plot(line_x, line_y, linewidth=1.5)
+        points += len(line_x)
+    draw_volume(volume_ax, bars[0], bars[1], '#00c853', 0.3)
+    points += len(bars[0])
+    canvas.draw()
+    artists = list(ax.lines) + list(volume_ax.collections)
+
+    # The series alone, without axes, ticks and text
+    started = time.perf_counter()
+    for artist in artists:
+        artist.axes.draw_artist(artist)
+    drawn = time.perf_counter() - started
+    plt.close('all')
+    return prepared * 1000.0, drawn * 1000.0, points
+
+
+def line_pixels(x, y):
+    figure, ax, _ = new_figure()
+    canvas = FigureCanvasAgg(figure)
+    ax.set_axis_off()
+    ax.plot(x, y, color='black', linewidth=1.5, antialiased=False)
+    canvas.draw()
+    pixels = np.asarray(canvas.buffer_rgba())[:, :, 0] < 128
+    plt.close('all')
+    return pixels
+
+
+def changed_pixels(x, y):
+    # Share of the pixels painted by either line that only one of them paints
+    full = line_pixels(x, y)
+    downsampled = line_pixels(*lttb(x, y, point_budget(new_figure()[1])))
+    return 100.0 * np.count_nonzero(full ^ downsampled) / max(np.count_nonzero(full | downsampled), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Line/volume series draw time, full vs downsampled")
+    parser.add_argument('--bars', type=int, nargs='+', default=[2500, 10000, 100000, 500000])
+    args = parser.parse_args()
+
+    print(f"{'bars':>8} {'full points':>12} {'full draw ms':>13} {'points':>7} {'downsample ms':>14} "
+          f"{'draw ms':>8} {'changed px %':>13}")
+    for count in args.bars:
+        x, lines, volume = series(make_bars(count))
+        _, full_ms, full_points = draw_series(x, lines, volume, downsample=False)
+        prepare_ms, drawn_ms, points = draw_series(x, lines, volume, downsample=True)
+        changed = changed_pixels(x, lines[0])
+        print(f"{count:>8} {full_points:>12} {full_ms:>13.1f} {points:>7} {prepare_ms:>14.1f} "
+              f"{drawn_ms:>8.1f} {changed:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
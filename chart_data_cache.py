@@ -0,0 +1,117 @@
+# chart_data_cache.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import pandas as pd
+
+from history_store import HistoryStore, DEFAULT_MAX_AGE
+
+# Total size of the cached frames before the least recently used are dropped
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+class ChartDataCache:
+    """
+    In-memory LRU of chart frames keyed by (symbol, interval, period,
+    start, end, adjusted), bounded by the bytes the frames hold.
+    A miss reads the range from the HistoryStore, which only downloads the
+    bars after its last stored one - so a new range costs a slice of the
+    local series plus at most the missing tail, never a full download.
+    Cached frames are shared: callers must not modify them.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every chart shares one memory budget"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = ChartDataCache()
+            return cls._instance
+
+    def __init__(self, store=None, memory_budget=DEFAULT_MEMORY_BUDGET, max_age=DEFAULT_MAX_AGE):
+        self.store = store or HistoryStore.get_instance()
+        self.memory_budget = memory_budget
+        # Frames of ranges that reach the present are re-read (tail refresh) after this
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'load_seconds': 0.0,
+        }
+
+    @staticmethod
+    def key(symbol, interval='1d', period=None, start=None, end=None, adjusted=True):
+        return (symbol.upper(), interval, period, start, end, adjusted)
+
+    def get(self, symbol, interval='1d', period=None, start=None, end=None, adjusted=True,
+            refresh=False):
+        """
+        History for the range as a DataFrame like HistoryStore.get_frame().
+        refresh=True skips the cache and asks the store for new bars.
+        """
+        key = self.key(symbol, interval, period, start, end, adjusted)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not refresh:
+                frame, size, loaded_at, open_ended = entry
+                if not open_ended or time.monotonic() - loaded_at <= self.max_age:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return frame
+                self._stats['expired'] += 1
+            else:
+                self._stats['misses'] += 1
+
+        started = time.perf_counter()
+        frame = self.store.get_frame(symbol, interval, period=period, start=start, end=end,
+                                     adjusted=adjusted, max_age=0 if refresh else self.max_age)
+        with self._lock:
+            self._stats['load_seconds'] += time.perf_counter() - started
+        if not frame.empty:
+            open_ended = period is not None or end is None or self._reaches_today(end)
+            self._put(key, frame, open_ended)
+        return frame
+
+    @staticmethod
+    def _reaches_today(end):
+        # A range ending in the past never changes; one ending today keeps growing
+        return pd.Timestamp(end).date() >= date.today()
+
+    def _put(self, key, frame, open_ended):
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.memory_budget:
+                # Bigger than the whole budget: serve it without caching
+                return
+            self._entries[key] = (frame, size, time.monotonic(), open_ended)
+            self._bytes += size
+            while self._bytes > self.memory_budget:
+                _, (evicted, evicted_size, _, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats['evictions'] += 1
+
+    def invalidate(self, symbol=None):
+        """Forget every cached range (of one symbol)"""
+        with self._lock:
+            for key in [k for k in self._entries if symbol is None or k[0] == symbol.upper()]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        return stats
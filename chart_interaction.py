@@ -0,0 +1,232 @@
+# chart_interaction.py
+#
+# Mouse interaction for the report charts without rebuilding the figure:
+#   - crosshair and OHLC tooltip follow the mouse,
+#   - dragging pans the time axis,
+#   - the wheel zooms around the cursor, double-click resets the view.
+# Everything that moves is drawn with blitting: the rendered figure is
+# kept as a background bitmap and only the moving artists are drawn over
+# it. While panning, the price/volume artists are drawn over a background
+# without them, so a frame costs a few collections rather than a figure.
+# The tooltip is a QLabel over the canvas: Qt draws its text far faster
+# than Agg would on every mouse move.
+# Once panning/zooming stops, on_view_changed(xmin, xmax) lets the chart
+# re-render (and load finer or coarser bars) for the new window.
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.transforms import Bbox
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel
+
+# Visible range factor per wheel step
+ZOOM_STEP = 1.25
+
+# Milliseconds after the last pan/zoom before on_view_changed is called
+SETTLE_DELAY_MS = 250
+
+# Bars closer together than this (in days) are shown with the time of day
+INTRADAY_SPACING = 0.5
+
+
+class ChartInteraction:
+    """Blitted crosshair, tooltip, pan and zoom for one price axes (and its volume axes)"""
+
+    def __init__(self, canvas, ax, volume_ax=None, on_view_changed=None, on_view_reset=None,
+                 text_color='black'):
+        self.canvas = canvas
+        self.ax = ax
+        self.axes = [a for a in (ax, volume_ax) if a is not None]
+        self.on_view_changed = on_view_changed
+        self.on_view_reset = on_view_reset
+        self.bars = None
+        self.background = None
+        self._pan = None
+        self._moving = []
+        self._edge_widths = {}
+
+        # Place the crosshair inside the current limits so it never widens autoscaling
+        x0 = ax.get_xlim()[0]
+        style = dict(color=text_color, linewidth=0.8, linestyle='--', alpha=0.7, animated=True, visible=False)
+        self.v_lines = [axis.axvline(x0, **style) for axis in self.axes]
+        self.h_lines = {axis: axis.axhline(axis.get_ylim()[0], **style) for axis in self.axes}
+        self.crosshair = self.v_lines + list(self.h_lines.values())
+
+        self.tooltip = QLabel(canvas)
+        self.tooltip.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.tooltip.setStyleSheet(f"""
+            QLabel {{
+                color: {text_color};
+                background-color: rgba(128, 128, 128, 40);
+                border: none;
+                border-radius: 4px;
+                padding: 2px 6px;
+                font-size: 9pt;
+            }}
+        """)
+        self.tooltip.hide()
+
+        self._timer = canvas.new_timer(interval=SETTLE_DELAY_MS)
+        self._timer.single_shot = True
+        self._timer.add_callback(self._settled)
+
+        self._connections = [
+            canvas.mpl_connect('draw_event', self._on_draw),
+            canvas.mpl_connect('motion_notify_event', self._on_motion),
+            canvas.mpl_connect('button_press_event', self._on_press),
+            canvas.mpl_connect('button_release_event', self._on_release),
+            canvas.mpl_connect('scroll_event', self._on_scroll),
+            canvas.mpl_connect('figure_leave_event', self._on_leave),
+        ]
+
+    def set_bars(self, x, open_, high, low, close, volume):
+        """The bars as drawn (after any level-of-detail merge), for the tooltip"""
+        self.bars = (x, open_, high, low, close, volume)
+
+    def disconnect(self):
+        self._timer.stop()
+        for connection in self._connections:
+            self.canvas.mpl_disconnect(connection)
+        self._connections = []
+        self.tooltip.hide()
+        self.tooltip.deleteLater()
+
+    # --- drawing ------------------------------------------------------------
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        if self._pan is None and self.v_lines[0].get_visible():
+            self._blit()
+
+    def _blit(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        for artist in self._moving:
+            artist.axes.draw_artist(artist)
+        for artist in self.crosshair:
+            if artist.get_visible():
+                artist.axes.draw_artist(artist)
+        # Only the plot areas change; copying less to the screen is faster
+        self.canvas.blit(Bbox.union([axis.bbox for axis in self.axes]).expanded(1.01, 1.01))
+
+    def _hide_crosshair(self):
+        for artist in self.crosshair:
+            artist.set_visible(False)
+        self.tooltip.hide()
+
+    def _show_tooltip(self, text):
+        if not text:
+            self.tooltip.hide()
+            return
+        # Top left corner of the price axes, in widget coordinates
+        ratio = getattr(self.canvas, 'device_pixel_ratio', 1) or 1
+        bbox = self.ax.bbox
+        self.tooltip.setText(text)
+        self.tooltip.adjustSize()
+        self.tooltip.move(int(bbox.x0 / ratio) + 6,
+                          int((self.canvas.figure.bbox.height - bbox.y1) / ratio) + 6)
+        self.tooltip.show()
+
+    # --- crosshair and tooltip ----------------------------------------------
+
+    def _on_motion(self, event):
+        if self._pan is not None:
+            self._drag(event)
+            return
+        if event.inaxes not in self.axes or event.xdata is None:
+            if self.v_lines[0].get_visible():
+                self._hide_crosshair()
+                self._blit()
+            return
+
+        for line in self.v_lines:
+            line.set_xdata([event.xdata, event.xdata])
+            line.set_visible(True)
+        for axis, line in self.h_lines.items():
+            line.set_ydata([event.ydata, event.ydata])
+            line.set_visible(axis is event.inaxes)
+        self._show_tooltip(self.tooltip_text(event.xdata))
+        self._blit()
+
+    def tooltip_text(self, xdata):
+        """OHLCV of the bar nearest to xdata"""
+        if self.bars is None or len(self.bars[0]) == 0:
+            return ""
+        x, open_, high, low, close, volume = self.bars
+        i = int(np.searchsorted(x, xdata))
+        if i >= len(x) or (i > 0 and xdata - x[i - 1] < x[i] - xdata):
+            i -= 1
+        i = max(i, 0)
+        spacing = np.diff(x[max(i - 1, 0):i + 2])
+        intraday = len(spacing) and spacing.min() < INTRADAY_SPACING
+        when = mdates.num2date(x[i]).strftime('%Y-%m-%d %H:%M' if intraday else '%Y-%m-%d')
+        return (f"{when}   O {open_[i]:.2f}   H {high[i]:.2f}   L {low[i]:.2f}   "
+                f"C {close[i]:.2f}   V {volume[i]:,.0f}")
+
+    def _on_leave(self, event):
+        self._hide_crosshair()
+        self._blit()
+
+    # --- pan and zoom -------------------------------------------------------
+
+    def _on_press(self, event):
+        if event.inaxes not in self.axes or event.button != 1:
+            return
+        if event.dblclick:
+            if self.on_view_reset is not None:
+                self.on_view_reset()
+            return
+        self._timer.stop()
+        self._pan = (event.x, self.ax.get_xlim())
+        self._hide_crosshair()
+        # Redraw once without the data, then move only the data while dragging
+        self._moving = [artist for axis in self.axes for artist in list(axis.collections) + list(axis.lines)
+                        if artist not in self.crosshair]
+        for artist in self._moving:
+            artist.set_animated(True)
+        # Bar/candle outlines are a fraction of a pixel but cost as much to
+        # draw as the fills; leave them out until the drag ends
+        self._edge_widths = {artist: artist.get_linewidths() for artist in self._moving
+                             if isinstance(artist, PolyCollection)}
+        for artist in self._edge_widths:
+            artist.set_linewidths(0)
+        self.canvas.draw()
+        self._blit()
+
+    def _drag(self, event):
+        start_x, (xmin, xmax) = self._pan
+        scale = (xmax - xmin) / self.ax.bbox.width
+        shift = (event.x - start_x) * scale
+        self.ax.set_xlim(xmin - shift, xmax - shift)
+        self._blit()
+
+    def _on_release(self, event):
+        if self._pan is None:
+            return
+        moved = self.ax.get_xlim() != self._pan[1]
+        self._pan = None
+        for artist in self._moving:
+            artist.set_animated(False)
+        for artist, widths in self._edge_widths.items():
+            artist.set_linewidths(widths)
+        self._moving = []
+        self._edge_widths = {}
+        self.canvas.draw_idle()
+        if moved:
+            self._timer.start()
+
+    def _on_scroll(self, event):
+        if event.inaxes not in self.axes or event.xdata is None:
+            return
+        factor = 1 / ZOOM_STEP if event.button == 'up' else ZOOM_STEP
+        xmin, xmax = self.ax.get_xlim()
+        center = event.xdata
+        self.ax.set_xlim(center - (center - xmin) * factor, center + (xmax - center) * factor)
+        self.canvas.draw_idle()
+        self._timer.stop()
+        self._timer.start()
+
+    def _settled(self):
+        if self._pan is None and self.on_view_changed is not None:
+            self.on_view_changed(*self.ax.get_xlim())
@@ -0,0 +1,116 @@
+# chart_renderers.py
+#
+# Candlestick and volume drawing for the matplotlib charts. Every bar of a
+# series goes into one PolyCollection (bodies) and one LineCollection
+# (wicks) built from NumPy arrays, instead of one or more artists per bar,
+# so the cost of a draw barely depends on the number of bars. When there
+# are more bars than the axes has room for, consecutive bars are merged
+# first (level of detail) so each candle stays a few pixels wide.
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection, PolyCollection
+
+# Fraction of the bar spacing covered by a candle body / volume bar
+BODY_WIDTH = 0.8
+
+# Fewest horizontal pixels per candle before bars are merged
+MIN_PIXELS_PER_BAR = 3
+
+
+def bar_positions(index):
+    """Matplotlib date numbers for a DatetimeIndex (tz-aware indexes are placed in UTC, like matplotlib does)"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return mdates.date2num(index.to_numpy())
+
+
+def bar_spacing(x):
+    """Typical distance between neighbouring bars (1 for a single bar)"""
+    if len(x) < 2:
+        return 1.0
+    return float(np.median(np.diff(x)))
+
+
+def aggregate_bars(x, open_, high, low, close, volume, max_bars):
+    """
+    Merge runs of consecutive bars so at most max_bars remain: first open,
+    highest high, lowest low, last close and summed volume per run, placed
+    at the middle of the run. Returns the arrays unchanged when they fit.
+    """
+    n = len(x)
+    if max_bars <= 0 or n <= max_bars:
+        return x, open_, high, low, close, volume
+    size = int(np.ceil(n / max_bars))
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    return (
+        (x[starts] + x[ends]) / 2.0,
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(volume, starts),
+    )
+
+
+def max_bars_for(ax):
+    """How many candles fit across the axes at the current figure size"""
+    width = ax.get_window_extent().width
+    return max(int(width // MIN_PIXELS_PER_BAR), 1)
+
+
+def _rectangles(x, bottom, top, width):
+    half = width / 2.0
+    verts = np.empty((len(x), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = x - half
+    verts[:, 2, 0] = verts[:, 3, 0] = x + half
+    verts[:, 0, 1] = verts[:, 3, 1] = bottom
+    verts[:, 1, 1] = verts[:, 2, 1] = top
+    return verts
+
+
+def draw_candlesticks(ax, x, open_, high, low, close, up_color, down_color,
+                      wick_color='black', edge_color='black', width=None, zorder=3):
+    """Candles as one wick LineCollection plus one body PolyCollection"""
+    if width is None:
+        width = bar_spacing(x) * BODY_WIDTH
+    up = close >= open_
+
+    wicks = np.empty((len(x), 2, 2))
+    wicks[:, 0, 0] = wicks[:, 1, 0] = x
+    wicks[:, 0, 1] = low
+    wicks[:, 1, 1] = high
+    ax.add_collection(LineCollection(wicks, colors=wick_color, linewidths=1, alpha=0.8,
+                                     zorder=zorder - 0.5))
+
+    bodies = PolyCollection(_rectangles(x, np.minimum(open_, close), np.maximum(open_, close), width),
+                            facecolors=np.where(up, up_color, down_color),
+                            edgecolors=edge_color, linewidths=0.5, zorder=zorder)
+    ax.add_collection(bodies)
+    ax.autoscale_view()
+    return bodies
+
+
+def draw_volume(ax, x, volume, colors, alpha, width=None, edge_color='none', edge_width=0.0):
+    """Volume bars as one PolyCollection; colors is one color per bar"""
+    if width is None:
+        width = bar_spacing(x) * BODY_WIDTH
+    bars = PolyCollection(_rectangles(x, np.zeros(len(x)), volume, width),
+                          facecolors=colors, edgecolors=edge_color, linewidths=edge_width, alpha=alpha)
+    ax.add_collection(bars)
+    ax.autoscale_view()
+    return bars
+
+
+def ohlcv_arrays(data):
+    """(x, open, high, low, close, volume) float arrays of a yfinance-shaped frame"""
+    return (
+        bar_positions(data.index),
+        data['Open'].to_numpy(dtype=np.float64),
+        data['High'].to_numpy(dtype=np.float64),
+        data['Low'].to_numpy(dtype=np.float64),
+        data['Close'].to_numpy(dtype=np.float64),
+        data['Volume'].to_numpy(dtype=np.float64),
+    )
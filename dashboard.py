@@ -1,18 +1,23 @@
 import talib
 from PyQt6.QtWidgets import QMessageBox
-import requests
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
                              QFrame, QStackedWidget, QMenuBar, QMenu, QStatusBar,
-                             QToolBar, QSizePolicy, QTableWidget, QTableWidgetItem,
+                             QToolBar, QSizePolicy, QTableView,
                              QHeaderView, QComboBox, QScrollArea, QTabWidget, QGridLayout, QDialog)
 from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QAction, QIcon, QFont
 import sys
-import pandas as pd
 from datetime import datetime
-import time
 from stock_thread_manager import StockDataManager
+from quote_engine import QuoteEngine
+from quote_cache import QuoteCache
+from update_pump import UpdatePump
+from quote_writer import QuoteWriter
+from stock_table_model import StockTableModel, AddButtonDelegate, ACTIONS_COLUMN, HEADERS
+from streaming_export import ExportJob
+import rate_limiter
+from rate_limiter import PRIORITY_VISIBLE, PRIORITY_NORMAL, YFINANCE_HOST
 from add_to_portfolio_dialog import AddToPortfolioDialog
 # from nsepy import get_history
 from datetime import date, timedelta
@@ -56,8 +61,8 @@ class AddStockButton(QPushButton):
         # Connect the click event to show menu
         self.clicked.connect(self.show_add_options)
 
-    def show_add_options(self):
-        """Show menu with add options"""
+    def show_add_options(self, global_pos=None):
+        """Show menu with add options (below the button unless a position is given)"""
         menu = QMenu(self)
 
         # Add menu actions
@@ -71,7 +76,9 @@ class AddStockButton(QPushButton):
         analytics_action.triggered.connect(self.add_to_analytics)
 
         # Show menu at button's position
-        menu.exec(self.mapToGlobal(self.rect().bottomLeft()))
+        if global_pos is None:
+            global_pos = self.mapToGlobal(self.rect().bottomLeft())
+        menu.exec(global_pos)
 
     def add_to_watchlist(self):
         """Add stock to watchlist"""
@@ -117,17 +124,9 @@ class AddStockButton(QPushButton):
     def add_to_portfolio(self):
         """Add stock to portfolio with purchase details"""
         try:
-            # Get current price from the dashboard's stock table
-            current_price = 0
-            for row in range(self.dashboard.stock_table.rowCount()):
-                if (self.dashboard.stock_table.item(row, 0) and
-                        self.dashboard.stock_table.item(row, 0).text() == self.symbol):
-                    # Get the current price from Close column (index 2)
-                    price_text = self.dashboard.stock_table.item(row, 2).text()
-                    if price_text.startswith('₹'):
-                        price_text = price_text[1:]  # Remove the Rupee symbol
-                    current_price = float(price_text)
-                    break
+            # Every row in the stock table is filled from the shared quote cache
+            cached_quote = QuoteCache.get_instance().peek(self.symbol)
+            current_price = cached_quote.current_price if cached_quote is not None else 0
 
             # Show the Add to Portfolio dialog
             dialog = AddToPortfolioDialog(self.symbol, current_price, self.dashboard)
@@ -232,13 +231,31 @@ class StockDashboard(QMainWindow):
         self.user_id = user_id if user_id is not None else 1  # Default for testing
         self.username = username
 
-        self.stock_table = QTableWidget()
+        self.stock_model = StockTableModel()
+        self.export_job = None
 
-        stocks_to_fetch = ['RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS']
-        self.stock_data_manager.fetch_multiple_stocks(
-            stocks_to_fetch,
-            update_callback=self.update_stock_table
-        )
+        # Market indices shown in the summary cards (symbol -> card title)
+        self.market_indices = {
+            '^NSEI': 'NIFTY 50',
+            '^BSESN': 'SENSEX',
+            '^NSEBANK': 'BANK NIFTY'
+        }
+
+        # Symbols shown in the stock table, symbols to insert at the top
+        # (searches) and symbols still waiting for a quote
+        self.tracked_symbols = set()
+        self.pinned_symbols = set()
+        self.pending_symbols = set()
+
+        # All quotes are fetched concurrently by the shared quote engine and
+        # land in the shared quote cache, which notifies every window
+        self.quote_engine = QuoteEngine.get_instance()
+        self.quote_cache = QuoteCache.get_instance()
+        self.quote_cache.quote_updated.connect(self.on_quote_ready)
+        # Table rows are repainted in batches, at most once per frame
+        self.update_pump = UpdatePump(self.apply_quote_updates, rate_hz=20, parent=self)
+        self.quote_writer = QuoteWriter.get_instance()
+        self.quote_engine.quote_failed.connect(self.on_quote_failed)
 
         self.nav_buttons = [
             'Market Overview',
@@ -258,8 +275,6 @@ class StockDashboard(QMainWindow):
             'TITAN.NS', 'AXISBANK.NS', 'ULTRACEMCO.NS', 'M&M.NS', 'SUNPHARMA.NS'
         ]
 
-        self.process_next_stock(0)
-
         # Initialize stock fetch timer
         self.stock_fetch_timer = None
 
@@ -292,8 +307,8 @@ class StockDashboard(QMainWindow):
         # Fetch market indices during initialization
         self.fetch_market_indices()
 
-        # Start stock loading with a delay
-        QTimer.singleShot(1000, lambda: self.process_next_stock(0))
+        # Load all top stocks at once
+        self.load_top_stocks()
 
         # Optional: Start auto update
         self.start_auto_update()
@@ -529,147 +544,121 @@ class StockDashboard(QMainWindow):
         self.analytics_window.showMaximized()
 
     def load_top_stocks(self):
+        """Add a row for every top stock and fetch them all concurrently"""
         self.statusBar().showMessage('Loading top stocks...')
-        self.stock_table.setRowCount(0)  # Clear existing data
 
+        # Create the rows up front so the table keeps the top stocks order
+        # no matter in which order the quotes arrive
         for symbol in self.top_stocks:
-            try:
-                self.fetch_stock_data(symbol)
-                # Add a small delay to avoid hitting rate limits
-                QTimer.singleShot(500, lambda: None)
-            except Exception as e:
-                print(f"Error loading stock {symbol}: {str(e)}")
-                continue
-
-        self.statusBar().showMessage('Top stocks loaded successfully')
-
-    # Add these two methods to your StockDashboard class
-
-    def process_next_stock(self, index):
-        """
-        Process one stock at a time with improved open price handling
-        """
-        # Base case: we've processed all stocks
-        if index >= len(self.top_stocks):
-            self.statusBar().showMessage('All stocks loaded successfully')
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            if hasattr(self, 'last_updated_label'):
-                self.last_updated_label.setText(f'Last Updated: {current_time}')
-            print("Stock loading process completed.")
+            self.find_or_create_row(symbol)
+
+        self.request_quotes(self.top_stocks)
+
+    def request_quotes(self, symbols):
+        """Track symbols in the stock table and ask the quote engine for them"""
+        self.tracked_symbols.update(symbols)
+        self.pending_symbols.update(symbols)
+
+        # Rows on screen are fetched before the ones scrolled out of view
+        visible = self.visible_symbols()
+        cached = self.quote_engine.request([s for s in symbols if s in visible], PRIORITY_VISIBLE)
+        cached += self.quote_engine.request([s for s in symbols if s not in visible], PRIORITY_NORMAL)
+
+        # Quotes still fresh in the cache are shown without a network round trip
+        for quote in cached:
+            self.on_quote_ready(quote, save=False)
+
+    def visible_symbols(self):
+        """Symbols of the stock table rows currently inside the viewport"""
+        viewport = self.stock_table.viewport()
+        first_row = self.stock_table.rowAt(0)
+        last_row = self.stock_table.rowAt(viewport.height() - 1)
+        if first_row < 0:
+            first_row = 0
+        if last_row < 0:
+            last_row = self.stock_model.rowCount() - 1
+
+        return set(self.stock_model.symbols[first_row:last_row + 1])
+
+    def on_quote_ready(self, quote, save=True):
+        """Route a quote from the cache to the summary cards or the stock table"""
+        if quote.symbol in self.market_indices:
+            self.update_market_summary_card(self.market_indices[quote.symbol],
+                                            quote.current_price, quote.percent_change)
             return
 
-        # Process current stock
-        symbol = self.top_stocks[index]
-        try:
-            # Update status bar
-            self.statusBar().showMessage(f'Loading stock {index + 1}/{len(self.top_stocks)}: {symbol}')
-
-            # Find if the symbol already exists in the table
-            row_exists = -1
-            for row in range(self.stock_table.rowCount()):
-                if self.stock_table.item(row, 0) and self.stock_table.item(row, 0).text() == symbol:
-                    row_exists = row
-                    break
-
-            # Use watchlist URL format
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=2d"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.get(url, headers=headers)
-            data = response.json()
-
-            if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                result = data['chart']['result'][0]
-                meta = result['meta']
-                quote = result['indicators']['quote'][0]
-
-                # Get open price with aggressive fallback logic
-                open_price = meta.get('regularMarketOpen', 0)
-                if open_price == 0 or open_price is None:
-                    # Try to get from quote data
-                    if 'open' in quote and len(quote['open']) > 0:
-                        valid_opens = [o for o in quote['open'] if o is not None and o > 0]
-                        if valid_opens:
-                            open_price = valid_opens[-1]  # Use the most recent valid open
-
-                    # If still zero, try previous close
-                    if open_price == 0 or open_price is None:
-                        open_price = meta.get('chartPreviousClose', 0)
+        # Quotes requested by other windows are ignored
+        if quote.symbol not in self.tracked_symbols:
+            return
 
-                    # If still zero, use current price as last resort
-                    if open_price == 0 or open_price is None:
-                        open_price = meta.get('regularMarketPrice', 0)
+        # Bursts of quotes are merged per symbol and applied by the pump;
+        # a merged quote is still saved if any of the quotes it replaced was
+        previous = self.update_pump.pending.get(quote.symbol)
+        save = save or (previous is not None and previous[1])
+        self.update_pump.push(quote.symbol, (quote, save))
+
+    def apply_quote_updates(self, updates):
+        """Write a batch of (quote, save) updates from the pump into the table"""
+        for quote, save in updates:
+            self.update_stock_table(quote)
+            if save:
+                self.save_quote(quote)
+        self.mark_quote_done(*[quote.symbol for quote, save in updates])
+
+        # Update timestamp once per batch
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if hasattr(self, 'last_updated_label'):
+            self.last_updated_label.setText(f'Last Updated: {current_time}')
+
+    def on_quote_failed(self, symbol, error_tuple):
+        """Handle a symbol the engine could not fetch"""
+        if symbol in self.market_indices:
+            print(f"Error fetching {self.market_indices[symbol]} data: {error_tuple[0]}")
+            return
 
-                # Print debug info
-                print(f"Symbol: {symbol}, Open price: {open_price}")
+        if symbol not in self.tracked_symbols:
+            return
 
-                # Use meta data like in watchlist
-                current_price = meta.get('regularMarketPrice', 0)
-                prev_close = meta.get('chartPreviousClose', 0)
+        print(f"Error loading stock {symbol}: {error_tuple[0]}")
+        if symbol in self.pinned_symbols:
+            # A searched symbol that does not exist never gets a row
+            self.pinned_symbols.discard(symbol)
+            self.tracked_symbols.discard(symbol)
+            self.statusBar().showMessage(f'No data available for {symbol}')
+        self.mark_quote_done(symbol)
+
+    def mark_quote_done(self, *symbols):
+        """Update loading progress once requested symbols have been answered"""
+        self.pending_symbols.difference_update(symbols)
+
+        if self.pending_symbols:
+            loaded = len(self.tracked_symbols) - len(self.pending_symbols)
+            self.statusBar().showMessage(f'Loading stocks {loaded}/{len(self.tracked_symbols)}...')
+        else:
+            self.statusBar().showMessage('All stocks loaded successfully')
+            # Save the whole refresh now rather than at the next interval
+            self.quote_writer.flush(wait=False)
 
-                # Fallback
-                if prev_close == 0 and len(quote['close']) > 1:
-                    prev_close = quote['close'][-2]
+    def save_quote(self, quote):
+        """Queue the latest quote for the background database writer"""
+        self.quote_writer.push(quote)
 
-                # Calculate changes
-                price_change = current_price - prev_close
-                percent_change = (price_change / prev_close) * 100 if prev_close else 0
+    # Add these two methods to your StockDashboard class
 
-                try:
-                    from database import DatabaseConnection
-                    db_conn = DatabaseConnection()
-                    db_conn.save_stock_data(
-                        symbol=symbol,
-                        current_price=current_price,
-                        open_price=open_price,
-                        high_price=meta.get('regularMarketDayHigh', current_price),
-                        low_price=meta.get('regularMarketDayLow', current_price),
-                        volume=int(meta.get('regularMarketVolume', 0)),
-                        change_percentage=percent_change
-                    )
-                except Exception as db_error:
-                    print(f"Error saving stock data to database: {db_error}")
-
-                # Add a new row or update existing
-                if row_exists == -1:
-                    row_position = self.stock_table.rowCount()
-                    self.stock_table.insertRow(row_position)
-                else:
-                    row_position = row_exists
-
-                # Update table with data
-                self.stock_table.setItem(row_position, 0, QTableWidgetItem(symbol))
-                # KEY CHANGE: Use our enhanced open_price value
-                self.stock_table.setItem(row_position, 1, QTableWidgetItem(f"₹{open_price:.2f}"))
-                self.stock_table.setItem(row_position, 2, QTableWidgetItem(f"₹{current_price:.2f}"))
-                self.stock_table.setItem(row_position, 3,
-                                         QTableWidgetItem(f"₹{meta.get('regularMarketDayHigh', current_price):.2f}"))
-                self.stock_table.setItem(row_position, 4,
-                                         QTableWidgetItem(f"₹{meta.get('regularMarketDayLow', current_price):.2f}"))
-                self.stock_table.setItem(row_position, 5,
-                                         QTableWidgetItem(f"{int(meta.get('regularMarketVolume', 0)):,}"))
-
-                # Format change with plus/minus and color
-                percent_str = f"{'+' if percent_change >= 0 else ''}{percent_change:.2f}%"
-                change_item = QTableWidgetItem(percent_str)
-                change_item.setForeground(Qt.GlobalColor.green if percent_change >= 0 else Qt.GlobalColor.red)
-                self.stock_table.setItem(row_position, 6, change_item)
-
-                # Add "Add" button with dropdown
-                add_btn = AddStockButton(symbol, self)
-                self.stock_table.setCellWidget(row_position, 7, add_btn)
-
-                print(f"Successfully loaded {symbol}")
+    def find_or_create_row(self, symbol):
+        """Return the table row for a symbol, appending a placeholder row if needed"""
+        return self.stock_model.find_or_create_row(symbol)
 
-        except Exception as e:
-            print(f"Error loading stock {symbol}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+    def move_row_to_top(self, symbol):
+        """Move (or insert) the row for a symbol to the top of the table"""
+        return self.stock_model.move_row_to_top(symbol)
 
-        # Schedule next stock with delay
-        QTimer.singleShot(1500, lambda: self.process_next_stock(index + 1))
+    def show_add_options(self, row, global_pos):
+        """Open the Add menu for the row whose Add button was clicked"""
+        actions = AddStockButton(self.stock_model.symbols[row], self, self.stock_table.viewport())
+        actions.hide()
+        actions.show_add_options(global_pos)
+        actions.deleteLater()
 
     def create_main_content(self):
         self.main_content = QWidget()  # Use QWidget instead of QStackedWidget for simplicity
@@ -753,23 +742,25 @@ class StockDashboard(QMainWindow):
         current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"stock_data_{current_time}.csv"
 
+        if self.export_job is not None and self.export_job.is_running():
+            self.statusBar().showMessage('An export is already running')
+            return
+
         try:
-            # Create a list to store the data
-            data = []
-            for row in range(self.stock_table.rowCount()):
-                row_data = []
-                for col in range(self.stock_table.columnCount()):
-                    item = self.stock_table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                data.append(row_data)
-
-            # Convert to DataFrame and save
-            df = pd.DataFrame(data, columns=['Stock', 'Open', 'Close', 'High', 'Low', 'Volume', '% Change'])
-            df.to_csv(filename, index=False)
-            self.statusBar().showMessage(f'Data exported successfully to {filename}')
+            # Written on a background thread straight from the model's rows
+            self.export_job = ExportJob(filename, HEADERS[:ACTIONS_COLUMN], self.stock_model.export_rows())
+            self.export_job.finished.connect(self.on_export_finished)
+            self.export_job.start()
+            self.statusBar().showMessage(f'Exporting data to {filename}...')
         except Exception as e:
             self.statusBar().showMessage(f'Error exporting data: {str(e)}')
 
+    def on_export_finished(self, filename, rows, cancelled, error):
+        if error:
+            self.statusBar().showMessage(f'Error exporting data: {error}')
+        else:
+            self.statusBar().showMessage(f'Data exported successfully to {filename}')
+
     def create_tool_bar(self):
         toolbar = QToolBar()
         toolbar.setMovable(False)
@@ -822,7 +813,7 @@ class StockDashboard(QMainWindow):
         refresh_container = QHBoxLayout()
 
         refresh_button = QPushButton('Refresh Data')
-        refresh_button.clicked.connect(self.fetch_stock_data)
+        refresh_button.clicked.connect(self.update_displayed_stocks)
         refresh_button.setMaximumWidth(200)
 
         self.last_updated_label = QLabel('Last Updated: Never')
@@ -832,18 +823,22 @@ class StockDashboard(QMainWindow):
         refresh_container.addWidget(self.last_updated_label)
         refresh_container.addStretch()
 
-        # Create table widget with an extra column for "Add to Analytics" button
-        self.stock_table = QTableWidget()
-        self.stock_table.setColumnCount(8)  # Added an extra column for the button
-        self.stock_table.setHorizontalHeaderLabels(
-            ['Stock', 'Open', 'Close', 'High', 'Low', 'Volume', '% Change', 'Actions'])
+        # Table view over the stock model; the "Add" button column is painted
+        # by a delegate instead of one widget per row
+        self.stock_table = QTableView()
+        self.stock_table.setModel(self.stock_model)
+        self.stock_table.verticalHeader().setVisible(False)
+        self.stock_table.setMouseTracking(True)  # Hover color on the Add buttons
+        self.add_button_delegate = AddButtonDelegate(self.stock_table)
+        self.add_button_delegate.clicked.connect(self.show_add_options)
+        self.stock_table.setItemDelegateForColumn(ACTIONS_COLUMN, self.add_button_delegate)
 
         # Set table properties
         self.stock_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.stock_table.horizontalHeader().setSectionResizeMode(7,
+        self.stock_table.horizontalHeader().setSectionResizeMode(ACTIONS_COLUMN,
                                                                  QHeaderView.ResizeMode.ResizeToContents)  # For the action column
         self.stock_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #ddd;
                 border-radius: 5px;
@@ -856,10 +851,10 @@ class StockDashboard(QMainWindow):
                 border: none;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e6f3ff;
                 color: black;
             }
@@ -877,111 +872,19 @@ class StockDashboard(QMainWindow):
 
 
     def fetch_stock_data(self, symbol=None):
-        try:
-            # Validate and format symbol
-            if not symbol or not isinstance(symbol, str):
-                self.statusBar().showMessage('Invalid stock symbol')
-                return
-
-            symbol = symbol.strip().upper()
-            if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
-                symbol = f"{symbol}.NS"
-
-            # Use the same URL approach as in the watchlist
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=2d"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.get(url, headers=headers)
-            data = response.json()
-
-            if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                result = data['chart']['result'][0]
-                meta = result['meta']
-                quote = result['indicators']['quote'][0]
-
-                # Get current data - use the meta.regularMarketPrice like in watchlist
-                current_price = meta.get('regularMarketPrice', 0)
-                prev_close = meta.get('chartPreviousClose', 0)
-
-                # Add the fallback just like in watchlist
-                if prev_close == 0 and len(quote['close']) > 1:
-                    prev_close = quote['close'][-2]
-
-                # Calculate changes - exactly as in watchlist
-                price_change = current_price - prev_close
-                percent_change = (price_change / prev_close) * 100 if prev_close else 0
-
-                # Debug output
-                print(
-                    f"{symbol} Price: {current_price}, Prev: {prev_close}, Change: {price_change}, %Change: {percent_change}%")
-
-                # Find or create row (keep your existing row handling)
-                row_position = -1
-                for row in range(self.stock_table.rowCount()):
-                    if self.stock_table.item(row, 0) and self.stock_table.item(row, 0).text() == symbol:
-                        self.stock_table.removeRow(row)
-                        break
-
-                # Insert at top
-                self.stock_table.insertRow(0)
-                row_position = 0
-
-                # Update table cells
-                self.stock_table.setItem(row_position, 0, QTableWidgetItem(symbol))
-                self.stock_table.setItem(row_position, 1, QTableWidgetItem(f"₹{meta.get('regularMarketOpen', 0):.2f}"))
-                self.stock_table.setItem(row_position, 2, QTableWidgetItem(f"₹{current_price:.2f}"))
-                self.stock_table.setItem(row_position, 3,
-                                         QTableWidgetItem(f"₹{meta.get('regularMarketDayHigh', 0):.2f}"))
-                self.stock_table.setItem(row_position, 4,
-                                         QTableWidgetItem(f"₹{meta.get('regularMarketDayLow', 0):.2f}"))
-                self.stock_table.setItem(row_position, 5,
-                                         QTableWidgetItem(f"{int(meta.get('regularMarketVolume', 0)):,}"))
-
-                # Format the change percent like in watchlist
-                percent_str = f"{'+' if percent_change >= 0 else ''}{percent_change:.2f}%"
-                change_item = QTableWidgetItem(percent_str)
-
-                # Set color
-                if percent_change > 0:
-                    change_item.setForeground(Qt.GlobalColor.green)
-                elif percent_change < 0:
-                    change_item.setForeground(Qt.GlobalColor.red)
-                else:
-                    change_item.setForeground(Qt.GlobalColor.black)
-
-                self.stock_table.setItem(row_position, 6, change_item)
-
-                # Update timestamp
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.last_updated_label.setText(f'Last Updated: {current_time}')
-                self.statusBar().showMessage(f'Data updated for {symbol}')
-
-
-            else:
-                self.statusBar().showMessage(f'No data available for {symbol}')
-
-        except Exception as e:
-            print(f"Error in fetch_stock_data: {str(e)}")
-            self.statusBar().showMessage(f'Error fetching data: {str(e)}')
-            import traceback
-            traceback.print_exc()
-
-            # Update table cells
-            self.stock_table.setItem(row_position, 0, QTableWidgetItem(symbol))
-
-            # Add fallback logic for open price
-            open_price = meta.get('regularMarketOpen', 0)
-            if open_price == 0:
-                # Try previous close as fallback
-                open_price = meta.get('previousClose', 0)
-                # If still zero, try from quote data
-                if open_price == 0 and 'open' in quote and len(quote['open']) > 0:
-                    open_price = next((x for x in quote['open'] if x is not None), 0)
+        """Fetch a single stock and show it at the top of the table"""
+        # Validate and format symbol
+        if not symbol or not isinstance(symbol, str):
+            self.statusBar().showMessage('Invalid stock symbol')
+            return
 
-            self.stock_table.setItem(row_position, 1, QTableWidgetItem(f"₹{open_price:.2f}"))
+        symbol = symbol.strip().upper()
+        if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
+            symbol = f"{symbol}.NS"
 
+        self.statusBar().showMessage(f'Fetching data for {symbol}...')
+        self.pinned_symbols.add(symbol)
+        self.request_quotes([symbol])
 
     def filter_stocks(self, search_text):
         try:
@@ -1015,76 +918,17 @@ class StockDashboard(QMainWindow):
 
     # In StockDashboard class, modify the update_stock_table method:
 
-    def update_stock_table(self, stock_data):
-        """Thread-safe update of the stock table"""
+    def update_stock_table(self, quote):
+        """Write a quote into its table row (searched symbols move to the top)"""
         try:
-            from PyQt6.QtCore import QTimer, Qt
-
-            # Debug output to verify data
-            print(f"Received data for {stock_data['symbol']}:")
-            print(f"  - Open: {stock_data['open']}")
-            print(f"  - Close: {stock_data['current_price']}")
-            print(f"  - High: {stock_data['high']}")
-            print(f"  - Low: {stock_data['low']}")
-
-            def update_ui():
-                # Find or create row for the stock
-                row_position = -1
-                for row in range(self.stock_table.rowCount()):
-                    if (self.stock_table.item(row, 0) and
-                            self.stock_table.item(row, 0).text() == stock_data['symbol']):
-                        row_position = row
-                        break
-
-                # If row not found, insert new row
-                if row_position == -1:
-                    self.stock_table.insertRow(0)
-                    row_position = 0
-
-                # CRITICAL FIX: Force a valid open price
-                open_price = stock_data['open']
-                if open_price == 0 or open_price is None:
-                    # Try using prev_close as fallback
-                    open_price = stock_data.get('prev_close', 0)
-                    # If still zero, use current price
-                    if open_price == 0 or open_price is None:
-                        open_price = stock_data['current_price']
-
-                # Update table cells with explicit conversions to avoid type issues
-                self.stock_table.setItem(row_position, 0, QTableWidgetItem(str(stock_data['symbol'])))
-                self.stock_table.setItem(row_position, 1, QTableWidgetItem(f"₹{float(open_price):.2f}"))
-                self.stock_table.setItem(row_position, 2,
-                                         QTableWidgetItem(f"₹{float(stock_data['current_price']):.2f}"))
-                self.stock_table.setItem(row_position, 3, QTableWidgetItem(f"₹{float(stock_data['high']):.2f}"))
-                self.stock_table.setItem(row_position, 4, QTableWidgetItem(f"₹{float(stock_data['low']):.2f}"))
-                self.stock_table.setItem(row_position, 5, QTableWidgetItem(f"{int(stock_data['volume']):,}"))
-
-                # Format change percent
-                percent_change = float(stock_data['percent_change'])
-                percent_str = f"{'+' if percent_change >= 0 else ''}{percent_change:.2f}%"
-                change_item = QTableWidgetItem(percent_str)
-
-                # Set color based on change
-                if percent_change > 0:
-                    change_item.setForeground(Qt.GlobalColor.green)
-                elif percent_change < 0:
-                    change_item.setForeground(Qt.GlobalColor.red)
-                else:
-                    change_item.setForeground(Qt.GlobalColor.black)
-
-                self.stock_table.setItem(row_position, 6, change_item)
-
-                # Add button in the last column
-                add_btn = AddStockButton(stock_data['symbol'], self)
-                self.stock_table.setCellWidget(row_position, 7, add_btn)
-
-                # Update timestamp
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if hasattr(self, 'last_updated_label'):
-                    self.last_updated_label.setText(f'Last Updated: {current_time}')
-
-            # Schedule the UI update on the main thread
-            QTimer.singleShot(0, update_ui)
+            if quote.symbol in self.pinned_symbols:
+                self.pinned_symbols.discard(quote.symbol)
+                row_position = self.move_row_to_top(quote.symbol)
+            else:
+                row_position = self.find_or_create_row(quote.symbol)
+
+            # The model formats and colors the cells and only repaints what changed
+            self.stock_model.update_quote(quote, row_position)
 
         except Exception as e:
             print(f"Error updating stock table: {str(e)}")
@@ -1092,106 +936,22 @@ class StockDashboard(QMainWindow):
             traceback.print_exc()
 
     def perform_stock_search(self, search_text):
-        try:
-            # Validate search text
-            if not isinstance(search_text, str) or len(search_text.strip()) < 1:
-                return
-
-            search_text = str(search_text).upper().strip()
-            self.statusBar().showMessage(f'Searching for {search_text}...')
-
-            # Handle both NSE and international stocks
-            if not (search_text.endswith('.NS') or search_text.endswith('.BO')):
-                symbol = f"{search_text}.NS"  # Try NSE first
-            else:
-                symbol = search_text
-
-            # Fetch stock data
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=2d"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.get(url, headers=headers)
-            data = response.json()
-
-            if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                result = data['chart']['result'][0]
-                meta = result['meta']
-                quote = result['indicators']['quote'][0]
+        # Validate search text
+        if not isinstance(search_text, str) or len(search_text.strip()) < 1:
+            return
 
-                # Use meta data
-                current_price = meta.get('regularMarketPrice', 0)
-                prev_close = meta.get('chartPreviousClose', 0)
-
-                # Fallback
-                if prev_close == 0 and len(quote['close']) > 1:
-                    prev_close = quote['close'][-2]
-
-                # Calculate changes
-                price_change = current_price - prev_close
-                percent_change = (price_change / prev_close) * 100 if prev_close else 0
-
-                # Find or create row
-                row_position = -1
-                for row in range(self.stock_table.rowCount()):
-                    if self.stock_table.item(row, 0) and self.stock_table.item(row, 0).text() == symbol:
-                        self.stock_table.removeRow(row)
-                        break
-
-                # Insert at top
-                self.stock_table.insertRow(0)
-                row_position = 0
-
-                # Update table cells
-                self.stock_table.setItem(row_position, 0, QTableWidgetItem(symbol))
-                self.stock_table.setItem(row_position, 1, QTableWidgetItem(f"₹{meta.get('regularMarketOpen', 0):.2f}"))
-                self.stock_table.setItem(row_position, 2, QTableWidgetItem(f"₹{current_price:.2f}"))
-                self.stock_table.setItem(row_position, 3,
-                                         QTableWidgetItem(f"₹{meta.get('regularMarketDayHigh', 0):.2f}"))
-                self.stock_table.setItem(row_position, 4,
-                                         QTableWidgetItem(f"₹{meta.get('regularMarketDayLow', 0):.2f}"))
-                self.stock_table.setItem(row_position, 5,
-                                         QTableWidgetItem(f"{int(meta.get('regularMarketVolume', 0)):,}"))
-
-                # Format the change percent
-                percent_str = f"{'+' if percent_change >= 0 else ''}{percent_change:.2f}%"
-                change_item = QTableWidgetItem(percent_str)
-
-                # Set color
-                if percent_change > 0:
-                    change_item.setForeground(Qt.GlobalColor.green)
-                elif percent_change < 0:
-                    change_item.setForeground(Qt.GlobalColor.red)
-                else:
-                    change_item.setForeground(Qt.GlobalColor.black)
-
-                self.stock_table.setItem(row_position, 6, change_item)
-
-                # Add the "Add" button with dropdown menu
-                add_btn = AddStockButton(symbol, self)
-
-                # Set the button in the cell
-                self.stock_table.setCellWidget(row_position, 7, add_btn)
-
-                # Update timestamp
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.last_updated_label.setText(f'Last Updated: {current_time}')
-                self.statusBar().showMessage(f'Data updated for {symbol}')
-
-                # Update TA dashboard if needed
-                if hasattr(self, 'ta_dashboard'):
-                    self.update_ta_dashboard(symbol)
-                    self.ta_dashboard.setVisible(True)
+        search_text = str(search_text).upper().strip()
+        self.statusBar().showMessage(f'Searching for {search_text}...')
 
-            else:
-                self.statusBar().showMessage(f'No data available for {symbol}')
+        # Handle both NSE and international stocks
+        if not (search_text.endswith('.NS') or search_text.endswith('.BO')):
+            symbol = f"{search_text}.NS"  # Try NSE first
+        else:
+            symbol = search_text
 
-        except Exception as e:
-            print(f"Error in perform_stock_search: {str(e)}")
-            self.statusBar().showMessage(f'Error fetching data: {str(e)}')
-            import traceback
-            traceback.print_exc()
+        # The row is inserted at the top when the quote arrives
+        self.pinned_symbols.add(symbol)
+        self.request_quotes([symbol])
 
     def start_auto_update(self):
         # self.update_timer = QTimer()
@@ -1344,7 +1104,7 @@ class StockDashboard(QMainWindow):
 
         actions = [
             ("📥 Export", self.export_data),
-            ("🔄 Refresh", self.fetch_stock_data),
+            ("🔄 Refresh", self.update_displayed_stocks),
             ("⭐ Favorites", lambda: None),
             ("🔔 Set Alert", lambda: None)
         ]
@@ -1371,15 +1131,11 @@ class StockDashboard(QMainWindow):
         return actions_widget
 
     def update_displayed_stocks(self):
-        """Update all displayed stocks with rate limiting"""
-        for row in range(self.stock_table.rowCount()):
-            try:
-                symbol = self.stock_table.item(row, 0).text()
-                self.fetch_stock_data(symbol)
-                time.sleep(5)  # Wait 5 seconds between updates to avoid rate limits
-            except Exception as e:
-                print(f"Error updating stock {symbol}: {str(e)}")
-                continue
+        """Refresh every stock currently shown in the table"""
+        symbols = list(self.stock_model.symbols)
+
+        self.statusBar().showMessage('Refreshing stock data...')
+        self.request_quotes(symbols)
 
     def create_main_content(self):
         self.main_content = QStackedWidget()
@@ -1476,57 +1232,11 @@ class StockDashboard(QMainWindow):
 
     def fetch_market_indices(self):
         """
-        Fetch and update market indices in summary cards using watchlist approach
+        Request the market indices; the summary cards are updated in on_quote_ready
         """
-        try:
-            indices = [
-                ("^NSEI", "NIFTY 50"),  # Nifty 50 index
-                ("^BSESN", "SENSEX"),  # Sensex index
-                ("^NSEBANK", "BANK NIFTY")  # Bank Nifty index
-            ]
-
-            for symbol, title in indices:
-                try:
-                    # Use same URL format as watchlist
-                    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=2d"
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    }
-
-                    response = requests.get(url, headers=headers)
-                    data = response.json()
-
-                    if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                        result = data['chart']['result'][0]
-                        meta = result['meta']
-                        quote = result['indicators']['quote'][0]
-
-                        # Get current price and previous close like in watchlist
-                        current_price = meta.get('regularMarketPrice', 0)
-                        prev_close = meta.get('chartPreviousClose', 0)
-
-                        # Fallback like in watchlist
-                        if prev_close == 0 and len(quote['close']) > 1:
-                            prev_close = quote['close'][-2]
-
-                        # Calculate change percentage
-                        price_change = current_price - prev_close
-                        change_percent = (price_change / prev_close) * 100 if prev_close else 0
-
-                        print(f"Index {title}: Current: {current_price}, Prev: {prev_close}, Change: {change_percent}%")
-
-                        # Update the market summary card
-                        self.update_market_summary_card(title, current_price, change_percent)
-
-                except Exception as e:
-                    print(f"Error fetching {title} data: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-
-        except Exception as e:
-            print(f"Error in fetch_market_indices: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        cached = self.quote_engine.request(list(self.market_indices), PRIORITY_VISIBLE)
+        for quote in cached:
+            self.on_quote_ready(quote, save=False)
 
     def update_market_summary_card(self, title, value, change_percent):
         """
@@ -1568,6 +1278,7 @@ class StockDashboard(QMainWindow):
             # Use yfinance to get market cap data for top stocks
             for symbol in self.top_stocks[:5]:  # Use first 5 stocks to avoid rate limiting
                 try:
+                    rate_limiter.acquire(YFINANCE_HOST)
                     stock = yf.Ticker(symbol)
                     info = stock.info
                     market_cap = info.get('marketCap', 0)
@@ -1,14 +1,18 @@
 # database.py
-from database_manager import DatabaseManager
-import json
-import socket
+from storage_backend import get_database_manager, run_deferred
+from audit_log import AuditLog
+from user_data_cache import UserDataCache, WATCHLIST, PORTFOLIO, ANALYTICS
+import time
 from datetime import datetime
 
+import numpy as np
+
 
 class DatabaseConnection:
     def __init__(self):
         """Initialize using the database manager singleton"""
-        self.manager = DatabaseManager.get_instance()
+        self.manager = get_database_manager()
+        self.cache = UserDataCache.get_instance()
 
     def add_to_watchlist(self, user_id, stock_symbol, notes=None):
         """Add a stock to user's watchlist"""
@@ -24,6 +28,9 @@ class DatabaseConnection:
                     return False, f"{stock_symbol} is already in your watchlist"
                 return False, f"Database error: {error}"
 
+            # The new row's id and date come from the database; reload on next read
+            self.cache.invalidate(WATCHLIST, user_id)
+
             # Log the action
             self.log_access(user_id, None, "WATCHLIST_ADD", "SUCCESS",
                             details=f"Added {stock_symbol} to watchlist")
@@ -35,29 +42,11 @@ class DatabaseConnection:
 
     def log_access(self, user_id=None, admin_id=None, action_type="", status="", details=None):
         """
-        Log access or actions for security and audit purposes
+        Log access or actions for security and audit purposes.
+        The record is buffered and written in bulk by the audit log thread.
         """
         try:
-            # Get IP address (simplified for local development)
-            ip_address = socket.gethostbyname(socket.gethostname())
-
-            query = """
-            INSERT INTO access_logs 
-            (user_id, admin_id, action_type, ip_address, status, details)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-
-            params = (
-                user_id, admin_id, action_type, ip_address, status,
-                json.dumps(details) if details else None
-            )
-
-            success, error = self.manager.execute_query(query, params, commit=True)
-
-            if not success:
-                print(f"❌ Error logging access: {error}")
-                return False
-
+            AuditLog.get_instance().log(user_id, admin_id, action_type, status, details)
             return True
         except Exception as e:
             print(f"❌ Error logging access: {e}")
@@ -72,12 +61,14 @@ class DatabaseConnection:
             DELETE FROM watchlist 
             WHERE user_id = %s AND stock_symbol = %s
             """
-            success, error = self.manager.execute_query(query, (user_id, stock_symbol), commit=True)
+            result = self.manager.run(query, (user_id, stock_symbol), commit=True)
 
-            if not success:
-                return False, f"Database error: {error}"
+            if not result.success:
+                return False, f"Database error: {result.error}"
+
+            if result.rowcount > 0:
+                self.cache.remove_rows(WATCHLIST, user_id, 'stock_symbol', stock_symbol)
 
-            if self.manager.cursor.rowcount > 0:
                 # Log the action
                 self.log_access(user_id, None, "WATCHLIST_REMOVE", "SUCCESS",
                                 details=f"Removed {stock_symbol} from watchlist")
@@ -89,50 +80,34 @@ class DatabaseConnection:
             print(f"❌ Error removing from watchlist: {e}")
             return False, f"Database error: {str(e)}"
 
-    def get_user_watchlist(self, user_id):
+    def get_user_watchlist(self, user_id, refresh=False):
         """
-        Get watchlist stocks for a specific user
+        Get watchlist stocks for a specific user (served from the cache when loaded)
         """
-        try:
-            query = """
-            SELECT w.watchlist_id, w.stock_symbol, w.date_added, w.notes
-            FROM watchlist w
-            WHERE w.user_id = %s
-            ORDER BY w.date_added DESC
-            """
-            success, error = self.manager.execute_query(query, (user_id,))
-
-            if not success:
-                print(f"❌ Error getting watchlist: {error}")
-                return []
-
-            return self.manager.fetchall()
-        except Exception as e:
-            print(f"❌ Error getting watchlist: {e}")
-            return []
+        query = """
+        SELECT w.watchlist_id, w.stock_symbol, w.date_added, w.notes
+        FROM watchlist w
+        WHERE w.user_id = %s
+        ORDER BY w.date_added DESC
+        """
+        return self.cache.get(WATCHLIST, user_id,
+                              lambda: self._load_user_rows(query, user_id, "watchlist"),
+                              refresh=refresh)
 
-    def get_user_portfolio(self, user_id):
+    def get_user_portfolio(self, user_id, refresh=False):
         """
-        Get portfolio holdings for a specific user
+        Get portfolio holdings for a specific user (served from the cache when loaded)
         """
-        try:
-            query = """
-            SELECT p.portfolio_id, p.stock_symbol, p.quantity, p.purchase_price, 
-                   p.purchase_date, p.notes
-            FROM portfolio p
-            WHERE p.user_id = %s
-            ORDER BY p.purchase_date DESC
-            """
-            success, error = self.manager.execute_query(query, (user_id,))
-
-            if not success:
-                print(f"❌ Error getting portfolio: {error}")
-                return []
-
-            return self.manager.fetchall()
-        except Exception as e:
-            print(f"❌ Error getting portfolio: {e}")
-            return []
+        query = """
+        SELECT p.portfolio_id, p.stock_symbol, p.quantity, p.purchase_price, 
+               p.purchase_date, p.notes
+        FROM portfolio p
+        WHERE p.user_id = %s
+        ORDER BY p.purchase_date DESC
+        """
+        return self.cache.get(PORTFOLIO, user_id,
+                              lambda: self._load_user_rows(query, user_id, "portfolio"),
+                              refresh=refresh)
 
     def add_to_portfolio(self, user_id, stock_symbol, quantity, purchase_price, purchase_date, notes=None):
         """
@@ -152,6 +127,8 @@ class DatabaseConnection:
             if not success:
                 return False, f"Database error: {error}"
 
+            self.cache.invalidate(PORTFOLIO, user_id)
+
             # Log the action
             self.log_access(user_id, None, "PORTFOLIO_ADD", "SUCCESS",
                             details=f"Added {quantity} shares of {stock_symbol} to portfolio")
@@ -166,14 +143,29 @@ class DatabaseConnection:
         Remove a stock from user's portfolio
         """
         try:
-            # First get the stock symbol for logging
-            query = "SELECT stock_symbol FROM portfolio WHERE portfolio_id = %s AND user_id = %s"
-            success, error = self.manager.execute_query(query, (portfolio_id, user_id))
-
-            if not success:
-                return False, f"Database error: {error}"
-
-            result = self.manager.fetchone()
+            # First get the stock symbol for logging (the cached portfolio usually has it)
+            result = self.cache.find(PORTFOLIO, user_id, 'portfolio_id', portfolio_id)
+            if result is None and self.manager.supports_returning:
+                # Delete and read the symbol in one statement
+                query = """
+                DELETE FROM portfolio WHERE portfolio_id = %s AND user_id = %s
+                RETURNING stock_symbol
+                """
+                deleted = self.manager.run(query, (portfolio_id, user_id), commit=True, fetch='one')
+                if not deleted.success:
+                    return False, f"Database error: {deleted.error}"
+                if not deleted.row:
+                    return False, "Portfolio item not found or doesn't belong to you"
+                return self._portfolio_removed(user_id, portfolio_id, deleted.row['stock_symbol'])
+
+            if result is None:
+                query = "SELECT stock_symbol FROM portfolio WHERE portfolio_id = %s AND user_id = %s"
+                lookup = self.manager.run(query, (portfolio_id, user_id), fetch='one')
+
+                if not lookup.success:
+                    return False, f"Database error: {lookup.error}"
+
+                result = lookup.row
 
             if not result:
                 return False, "Portfolio item not found or doesn't belong to you"
@@ -182,39 +174,55 @@ class DatabaseConnection:
 
             # Delete the portfolio item
             delete_query = "DELETE FROM portfolio WHERE portfolio_id = %s AND user_id = %s"
-            success, error = self.manager.execute_query(delete_query, (portfolio_id, user_id), commit=True)
+            deleted = self.manager.run(delete_query, (portfolio_id, user_id), commit=True)
 
-            if not success:
-                return False, f"Database error: {error}"
+            if not deleted.success:
+                return False, f"Database error: {deleted.error}"
 
-            # Log the action
-            self.log_access(user_id, None, "PORTFOLIO_REMOVE", "SUCCESS",
-                            details=f"Removed {stock_symbol} from portfolio")
+            if deleted.rowcount == 0:
+                # Removed elsewhere since the cache was loaded
+                self.cache.invalidate(PORTFOLIO, user_id)
+                return False, "Portfolio item not found or doesn't belong to you"
 
-            return True, f"Removed {stock_symbol} from portfolio"
+            return self._portfolio_removed(user_id, portfolio_id, stock_symbol)
         except Exception as e:
             print(f"❌ Error removing from portfolio: {e}")
             return False, f"Database error: {str(e)}"
 
-    def get_user_analytics_preferences(self, user_id):
-        """Get analytics preferences for a specific user"""
+    def _portfolio_removed(self, user_id, portfolio_id, stock_symbol):
+        self.cache.remove_rows(PORTFOLIO, user_id, 'portfolio_id', portfolio_id)
+
+        # Log the action
+        self.log_access(user_id, None, "PORTFOLIO_REMOVE", "SUCCESS",
+                        details=f"Removed {stock_symbol} from portfolio")
+
+        return True, f"Removed {stock_symbol} from portfolio"
+
+    def get_user_analytics_preferences(self, user_id, refresh=False):
+        """Get analytics preferences for a specific user (served from the cache when loaded)"""
+        query = """
+        SELECT preference_id, stock_symbol, date_added
+        FROM analytics_preferences
+        WHERE user_id = %s
+        ORDER BY date_added DESC
+        """
+        return self.cache.get(ANALYTICS, user_id,
+                              lambda: self._load_user_rows(query, user_id, "analytics preferences"),
+                              refresh=refresh)
+
+    def _load_user_rows(self, query, user_id, label):
+        """Cache loader: the user's rows, or None on error so nothing is cached"""
         try:
-            query = """
-            SELECT preference_id, stock_symbol, date_added
-            FROM analytics_preferences
-            WHERE user_id = %s
-            ORDER BY date_added DESC
-            """
-            success, error = self.manager.execute_query(query, (user_id,))
+            result = self.manager.run(query, (user_id,), fetch='all')
 
-            if not success:
-                print(f"❌ Error getting analytics preferences: {error}")
-                return []
+            if not result.success:
+                print(f"❌ Error getting {label}: {result.error}")
+                return None
 
-            return self.manager.fetchall()
+            return result.rows
         except Exception as e:
-            print(f"❌ Error getting analytics preferences: {e}")
-            return []
+            print(f"❌ Error getting {label}: {e}")
+            return None
 
     def add_analytics_preference(self, user_id, stock_symbol):
         """Add a stock to user's analytics preferences"""
@@ -230,6 +238,8 @@ class DatabaseConnection:
                     return False, f"{stock_symbol} is already in your analytics preferences"
                 return False, f"Database error: {error}"
 
+            self.cache.invalidate(ANALYTICS, user_id)
+
             # Log the action
             self.log_access(user_id, None, "ANALYTICS_ADD", "SUCCESS",
                             details=f"Added {stock_symbol} to analytics preferences")
@@ -242,17 +252,32 @@ class DatabaseConnection:
     def remove_analytics_preference(self, user_id, preference_id):
         """Remove a stock from user's analytics preferences"""
         try:
-            # First get the stock symbol for logging
-            query = """
-            SELECT stock_symbol FROM analytics_preferences 
-            WHERE preference_id = %s AND user_id = %s
-            """
-            success, error = self.manager.execute_query(query, (preference_id, user_id))
-
-            if not success:
-                return False, f"Database error: {error}"
-
-            result = self.manager.fetchone()
+            # First get the stock symbol for logging (the cached preferences usually have it)
+            result = self.cache.find(ANALYTICS, user_id, 'preference_id', preference_id)
+            if result is None and self.manager.supports_returning:
+                # Delete and read the symbol in one statement
+                query = """
+                DELETE FROM analytics_preferences WHERE preference_id = %s AND user_id = %s
+                RETURNING stock_symbol
+                """
+                deleted = self.manager.run(query, (preference_id, user_id), commit=True, fetch='one')
+                if not deleted.success:
+                    return False, f"Database error: {deleted.error}"
+                if not deleted.row:
+                    return False, "Analytics preference not found or doesn't belong to you"
+                return self._analytics_removed(user_id, preference_id, deleted.row['stock_symbol'])
+
+            if result is None:
+                query = """
+                SELECT stock_symbol FROM analytics_preferences 
+                WHERE preference_id = %s AND user_id = %s
+                """
+                lookup = self.manager.run(query, (preference_id, user_id), fetch='one')
+
+                if not lookup.success:
+                    return False, f"Database error: {lookup.error}"
+
+                result = lookup.row
             if not result:
                 return False, "Analytics preference not found or doesn't belong to you"
 
@@ -263,22 +288,30 @@ class DatabaseConnection:
             DELETE FROM analytics_preferences 
             WHERE preference_id = %s AND user_id = %s
             """
-            success, error = self.manager.execute_query(delete_query,
-                                                        (preference_id, user_id),
-                                                        commit=True)
+            deleted = self.manager.run(delete_query, (preference_id, user_id), commit=True)
 
-            if not success:
-                return False, f"Database error: {error}"
+            if not deleted.success:
+                return False, f"Database error: {deleted.error}"
 
-            # Log the action
-            self.log_access(user_id, None, "ANALYTICS_REMOVE", "SUCCESS",
-                            details=f"Removed {stock_symbol} from analytics preferences")
+            if deleted.rowcount == 0:
+                # Removed elsewhere since the cache was loaded
+                self.cache.invalidate(ANALYTICS, user_id)
+                return False, "Analytics preference not found or doesn't belong to you"
 
-            return True, f"Removed {stock_symbol} from analytics"
+            return self._analytics_removed(user_id, preference_id, stock_symbol)
         except Exception as e:
             print(f"❌ Error removing from analytics preferences: {e}")
             return False, f"Database error: {str(e)}"
 
+    def _analytics_removed(self, user_id, preference_id, stock_symbol):
+        self.cache.remove_rows(ANALYTICS, user_id, 'preference_id', preference_id)
+
+        # Log the action
+        self.log_access(user_id, None, "ANALYTICS_REMOVE", "SUCCESS",
+                        details=f"Removed {stock_symbol} from analytics preferences")
+
+        return True, f"Removed {stock_symbol} from analytics"
+
     def create_user(self, username, email, password):
         """
         Create a new user account
@@ -292,42 +325,37 @@ class DatabaseConnection:
             tuple: (success, message)
         """
         try:
-            # Check if username already exists
-            check_username_query = "SELECT user_id FROM user WHERE user_name = %s"
-            success, error = self.manager.execute_query(check_username_query, (username,))
-
-            if not success:
-                return False, f"Database error: {error}"
-
-            if self.manager.fetchone():
-                return False, "Username already exists. Please choose another username."
-
-            # Check if email already exists
-            check_email_query = "SELECT user_id FROM user WHERE email = %s"
-            success, error = self.manager.execute_query(check_email_query, (email,))
-
-            if not success:
-                return False, f"Database error: {error}"
-
-            if self.manager.fetchone():
-                return False, "Email already registered. Please use a different email."
-
-            # Insert new user
+            # One INSERT; the unique keys on user_name and email reject duplicates
             insert_query = """
             INSERT INTO user (user_name, email, password, created_at, account_status)
             VALUES (%s, %s, %s, NOW(), 'active')
             """
-            success, error = self.manager.execute_query(
+            result = self.manager.run(
                 insert_query,
                 (username, email, password),
                 commit=True
             )
 
-            if not success:
-                return False, f"Database error: {error}"
+            if not result.success:
+                if "Duplicate entry" in result.error:
+                    # MySQL: "... for key 'user.email'", SQLite: "... failed: user.email"
+                    error = result.error
+                    key = error.rsplit("for key", 1)[-1] if "for key" in error else error.rsplit(":", 1)[-1]
+                    if "email" in key:
+                        return False, "Email already registered. Please use a different email."
+                    return False, "Username already exists. Please choose another username."
+                return False, f"Database error: {result.error}"
 
             # Get the new user ID
-            user_id = self.manager.cursor.lastrowid
+            user_id = result.lastrowid
+
+            # Give the admin dashboard its row now rather than at its next sync
+            # (the unique key on admin_reports.user_id drops whichever comes second)
+            run_deferred(
+                "INSERT IGNORE INTO admin_reports (user_id, user_name, email) VALUES (%s, %s, %s)",
+                (user_id, username, email),
+                manager=self.manager
+            )
 
             # Log the account creation
             self.log_access(user_id, None, "USER_REGISTRATION", "SUCCESS")
@@ -344,13 +372,16 @@ class DatabaseConnection:
         """
         try:
             # Find user by username
-            query = "SELECT * FROM user WHERE user_name = %s"
-            success, error = self.manager.execute_query(query, (username,))
+            query = """
+            SELECT user_id, user_name, email, password, created_at, last_login, account_status
+            FROM user WHERE user_name = %s
+            """
+            result = self.manager.run(query, (username,), fetch='one')
 
-            if not success:
-                return False, f"Database error: {error}"
+            if not result.success:
+                return False, f"Database error: {result.error}"
 
-            user = self.manager.fetchone()
+            user = result.row
 
             if not user:
                 self.log_access(None, None, "USER_LOGIN_ATTEMPT", "FAILED", details="User not found")
@@ -358,9 +389,9 @@ class DatabaseConnection:
 
             # Using plain text for compatibility with your current system
             if user['password'] == password:
-                # Update last login time
+                # Update last login time in the background; the login does not wait for it
                 query = "UPDATE user SET last_login = NOW() WHERE user_id = %s"
-                self.manager.execute_query(query, (user['user_id'],), commit=True)
+                run_deferred(query, (user['user_id'],), self.manager)
 
                 # Log successful login
                 self.log_access(user['user_id'], None, "USER_LOGIN", "SUCCESS")
@@ -429,13 +460,13 @@ class DatabaseConnection:
             LIMIT %s
             """
 
-            success, error = self.manager.execute_query(query, (limit,))
+            result = self.manager.run(query, (limit,), fetch='all')
 
-            if not success:
-                print(f"❌ Error getting company reports: {error}")
+            if not result.success:
+                print(f"❌ Error getting company reports: {result.error}")
                 return []
 
-            return self.manager.fetchall()
+            return result.rows
 
         except Exception as e:
             print(f"❌ Error getting company reports: {e}")
@@ -451,13 +482,13 @@ class DatabaseConnection:
             WHERE stock_symbol = %s
             """
 
-            success, error = self.manager.execute_query(query, (stock_symbol,))
+            result = self.manager.run(query, (stock_symbol,), fetch='one')
 
-            if not success:
-                print(f"❌ Error getting company report: {error}")
+            if not result.success:
+                print(f"❌ Error getting company report: {result.error}")
                 return None
 
-            return self.manager.fetchone()
+            return result.row
 
         except Exception as e:
             print(f"❌ Error getting company report: {e}")
@@ -502,6 +533,141 @@ class DatabaseConnection:
             print(f"❌ Error in save_stock_data: {e}")
             return False
 
+    def save_stock_data_many(self, rows):
+        """
+        Save many stocks with one multi-row upsert and a single commit.
+        rows: (symbol, current_price, open_price, high_price, low_price, volume, change_percentage)
+        """
+        if not rows:
+            return True
+        try:
+            query = """
+            INSERT INTO stock
+            (symbol, current_price, open_price, high_price, low_price, volume, change_percentage, last_updated)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE
+            current_price = VALUES(current_price),
+            open_price = VALUES(open_price),
+            high_price = VALUES(high_price),
+            low_price = VALUES(low_price),
+            volume = VALUES(volume),
+            change_percentage = VALUES(change_percentage),
+            last_updated = NOW()
+            """
+
+            success, error = self.manager.run_many(query, rows)
+
+            if not success:
+                print(f"❌ Error saving stock data for {len(rows)} symbols: {error}")
+                return False
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in save_stock_data_many: {e}")
+            return False
+
+    def save_ticks_many(self, rows):
+        """
+        Append quotes to the stock_ticks time series in one bulk insert.
+        rows: (symbol, epoch seconds, price, volume); repeated ticks are ignored
+        """
+        if not rows:
+            return True
+        try:
+            query = """
+            INSERT IGNORE INTO stock_ticks (symbol, ts, price, volume)
+            VALUES (%s, FROM_UNIXTIME(%s), %s, %s)
+            """
+
+            success, error = self.manager.run_many(query, rows)
+
+            if not success:
+                print(f"❌ Error saving {len(rows)} ticks: {error}")
+                return False
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in save_ticks_many: {e}")
+            return False
+
+    def get_ticks(self, symbol, start, end=None):
+        """
+        Ticks of a symbol between two epoch times (end defaults to now).
+        Returns (timestamps, {'Price': values, 'Volume': values}) as NumPy
+        arrays, timestamps in epoch seconds, or (None, None) when empty.
+        """
+        try:
+            query = """
+            SELECT UNIX_TIMESTAMP(ts) AS ts, price, volume
+            FROM stock_ticks
+            WHERE symbol = %s AND ts >= FROM_UNIXTIME(%s) AND ts < FROM_UNIXTIME(%s)
+            ORDER BY ts
+            """
+            end = time.time() if end is None else end
+            result = self.manager.run(query, (symbol, start, end), fetch='all')
+
+            if not result.success:
+                print(f"❌ Error getting ticks for {symbol}: {result.error}")
+                return None, None
+            if not result.rows:
+                return None, None
+
+            rows = result.rows
+            ts = np.fromiter((float(r['ts']) for r in rows), dtype=np.float64, count=len(rows))
+            columns = {
+                'Price': np.fromiter((float(r['price']) for r in rows), dtype=np.float64, count=len(rows)),
+                'Volume': np.fromiter((float(r['volume'] or 0) for r in rows), dtype=np.float64, count=len(rows)),
+            }
+            return ts, columns
+
+        except Exception as e:
+            print(f"❌ Error getting ticks for {symbol}: {e}")
+            return None, None
+
+    def get_bars(self, symbol, interval='1m', start=0, end=None):
+        """
+        Downsampled bars of a symbol between two epoch times, in the same
+        layout as HistoryStore.read(): (timestamps, {'Open', 'High', 'Low',
+        'Close', 'Volume'}) with int64 epoch-second timestamps, or (None, None).
+        """
+        try:
+            query = """
+            SELECT UNIX_TIMESTAMP(ts) AS ts, open_price, high_price, low_price, close_price, volume
+            FROM stock_bars
+            WHERE symbol = %s AND bar_interval = %s
+              AND ts >= FROM_UNIXTIME(%s) AND ts < FROM_UNIXTIME(%s)
+            ORDER BY ts
+            """
+            end = time.time() if end is None else end
+            result = self.manager.run(query, (symbol, interval, start, end), fetch='all')
+
+            if not result.success:
+                print(f"❌ Error getting {interval} bars for {symbol}: {result.error}")
+                return None, None
+            if not result.rows:
+                return None, None
+
+            rows = result.rows
+            n = len(rows)
+            ts = np.fromiter((int(round(float(r['ts']))) for r in rows), dtype=np.int64, count=n)
+            columns = {}
+            for column, field in (('Open', 'open_price'), ('High', 'high_price'), ('Low', 'low_price'),
+                                  ('Close', 'close_price'), ('Volume', 'volume')):
+                columns[column] = np.fromiter(
+                    (np.nan if r[field] is None else float(r[field]) for r in rows),
+                    dtype=np.float64, count=n)
+            return ts, columns
+
+        except Exception as e:
+            print(f"❌ Error getting {interval} bars for {symbol}: {e}")
+            return None, None
+
+    def cache_metrics(self):
+        """Hit, miss and staleness counters of the per-user cache"""
+        return self.cache.metrics()
+
     def close(self):
         """
         Close connection via manager - mainly a no-op since manager handles connections
@@ -1,98 +1,289 @@
 # database_manager.py
 import mysql.connector
 from mysql.connector import Error
-import json
-import socket
-from datetime import datetime
+import queue
+import threading
+import time
+
+from storage_backend import QueryResult, values_group
+
+# Connections kept open at most (threads wait for a free one beyond this)
+DEFAULT_POOL_SIZE = 5
+
+# Seconds to wait for a free connection before giving up
+DEFAULT_POOL_TIMEOUT = 10
+
+# Connections idle for longer than this are pinged before reuse
+# (instead of pinging before every query)
+PING_AFTER_IDLE = 30
+
+# MySQL client errors that mean the connection itself is gone
+CONNECTION_LOST_ERRORS = (2006, 2013, 2055)
 
 
 class DatabaseManager:
+    dialect = 'mysql'
+    # MySQL has no DELETE ... RETURNING
+    supports_returning = False
+
     _instance = None
+    _instance_lock = threading.Lock()
 
     @classmethod
-    def get_instance(cls, host="localhost", user="root", password="Pornima#Undale28", database="STOCKMARKET_PROJECT"):
-        """Singleton pattern to ensure only one database connection exists"""
-        if cls._instance is None:
-            cls._instance = DatabaseManager(host, user, password, database)
-        return cls._instance
-
-    def __init__(self, host, user, password, database):
-        """Initialize connection - should typically only be called through get_instance()"""
+    def get_instance(cls, host="localhost", user="root", password="Pornima#Undale28", database="STOCKMARKET_PROJECT",
+                     pool_size=DEFAULT_POOL_SIZE):
+        """Singleton pattern so every window shares one connection pool"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = DatabaseManager(host, user, password, database, pool_size)
+            return cls._instance
+
+    def __init__(self, host, user, password, database, pool_size=DEFAULT_POOL_SIZE,
+                 pool_timeout=DEFAULT_POOL_TIMEOUT):
+        """Create the pool - should typically only be called through get_instance()"""
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
-        self.cursor = None
-        self.connect()
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+
+        # Idle connections as (connection, time returned to the pool)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._metrics = {
+            'checkouts': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'reconnects': 0,
+            'errors': 0,
+        }
+
+        # Open the first connection up front so a bad configuration shows at startup
+        connection = self._open_connection()
+        if connection is not None:
+            self._release(connection)
 
     def connect(self):
-        """Establish a database connection"""
+        """Open a new database connection (None on failure)"""
         try:
-            self.connection = mysql.connector.connect(
+            connection = mysql.connector.connect(
                 host=self.host,
                 user=self.user,
                 password=self.password,
-                database=self.database
+                database=self.database,
+                # Every run() is one statement: the server commits it, and reads
+                # see fresh data without a COMMIT/ROLLBACK round trip after each
+                autocommit=True
             )
 
-            if self.connection.is_connected():
-                print("✅ Database Connection Established")
-                self.cursor = self.connection.cursor(dictionary=True)
-                return True
-            return False
+            if connection.is_connected():
+                with self._lock:
+                    self._metrics['connections_created'] += 1
+                    first = self._metrics['connections_created'] == 1
+                if first:
+                    print("✅ Database Connection Established")
+                return connection
+            return None
         except Error as e:
             print(f"❌ Connection Error: {e}")
-            self.connection = None
-            self.cursor = None
-            return False
+            return None
 
-    def ensure_connection(self):
-        """Ensure database connection is active"""
+    def _open_connection(self):
+        """connect() while holding a pool slot; the slot is given back on failure"""
+        with self._lock:
+            self._open += 1
+        connection = self.connect()
+        if connection is None:
+            with self._lock:
+                self._open -= 1
+        return connection
+
+    def set_pool_size(self, pool_size):
+        """Change how many connections may be open at once"""
+        with self._lock:
+            self.pool_size = max(1, pool_size)
+
+    def _acquire(self):
+        """Check out a connection, opening one if the pool is not full yet"""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.pool_timeout
+        connection = None
         try:
-            if self.connection is None or not self.connection.is_connected():
-                print("Database connection lost, reconnecting...")
-                return self.connect()
-            return True
-        except Error as e:
-            print(f"Failed to reconnect: {e}")
-            return False
+            while connection is None:
+                try:
+                    connection, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    with self._lock:
+                        can_open = self._open < self.pool_size
+                        if can_open:
+                            # Reserve the slot before connecting outside the lock
+                            self._open += 1
+                    if can_open:
+                        connection = self.connect()
+                        if connection is None:
+                            with self._lock:
+                                self._open -= 1
+                            return None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        with self._lock:
+                            self._metrics['timeouts'] += 1
+                        return None
+                    try:
+                        connection, idle_since = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        continue
 
-    def execute_query(self, query, params=None, commit=False):
-        """Execute a database query with automatic reconnection"""
+                if time.monotonic() - idle_since > PING_AFTER_IDLE:
+                    connection = self._revive(connection)
+            return connection
+        finally:
+            waited = time.perf_counter() - started
+            with self._lock:
+                self._metrics['checkouts'] += 1
+                self._metrics['wait_seconds'] += waited
+                self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], waited)
+
+    def _revive(self, connection):
+        """Ping a long-idle connection, replacing it if the server dropped it"""
+        try:
+            connection.ping(reconnect=False)
+            return connection
+        except Error:
+            self._discard(connection)
+            with self._lock:
+                self._metrics['reconnects'] += 1
+            return self._open_connection()
+
+    def _release(self, connection):
+        self._idle.put((connection, time.monotonic()))
+
+    def _discard(self, connection):
+        with self._lock:
+            self._open -= 1
         try:
-            if not self.ensure_connection():
-                return False, "Database connection failed"
+            connection.close()
+        except Exception:
+            pass
 
-            self.cursor.execute(query, params or ())
+    def run(self, query, params=None, commit=False, fetch=None):
+        """
+        Execute one statement on a pooled connection with its own cursor.
+        fetch='one' or 'all' reads the rows before the connection is returned,
+        so concurrent callers never see each other's result sets.
+        A lost connection is replaced and the statement retried once.
+        """
+        for attempt in range(2):
+            connection = self._acquire()
+            if connection is None:
+                return QueryResult(False, "Database connection failed")
 
-            if commit:
-                self.connection.commit()
+            cursor = None
+            returned = False
+            try:
+                cursor = connection.cursor(dictionary=True)
+                cursor.execute(query, params or ())
+                rows = []
+                if fetch == 'one':
+                    row = cursor.fetchone()
+                    rows = [row] if row is not None else []
+                    # Drain anything left so the connection can be reused
+                    if cursor.with_rows:
+                        cursor.fetchall()
+                elif fetch == 'all' or cursor.with_rows:
+                    rows = cursor.fetchall()
 
-            return True, None
-        except Error as e:
-            print(f"❌ Query error: {e}")
-            return False, str(e)
+                # Autocommit connections only hold a transaction if a statement opened one
+                if connection.in_transaction:
+                    if commit:
+                        connection.commit()
+                    else:
+                        connection.rollback()
 
-    def fetchone(self):
-        """Fetch one result after executing a query"""
-        if self.cursor:
-            return self.cursor.fetchone()
-        return None
+                result = QueryResult(True, None, rows if fetch else [], cursor.rowcount, cursor.lastrowid)
+                cursor.close()
+                self._release(connection)
+                returned = True
+                return result
+            except Error as e:
+                lost = getattr(e, 'errno', None) in CONNECTION_LOST_ERRORS
+                if cursor is not None:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+                if lost:
+                    self._discard(connection)
+                    returned = True
+                    with self._lock:
+                        self._metrics['reconnects'] += 1
+                    if attempt == 0:
+                        print("Database connection lost, reconnecting...")
+                        continue
+                else:
+                    try:
+                        if connection.in_transaction:
+                            connection.rollback()
+                        self._release(connection)
+                    except Error:
+                        self._discard(connection)
+                    returned = True
+                with self._lock:
+                    self._metrics['errors'] += 1
+                print(f"❌ Query error: {e}")
+                return QueryResult(False, str(e))
+            finally:
+                if not returned:
+                    # Not a database error (e.g. bad parameters): the connection's
+                    # state is unknown, so close it and free its pool slot
+                    self._discard(connection)
 
-    def fetchall(self):
-        """Fetch all results after executing a query"""
-        if self.cursor:
-            return self.cursor.fetchall()
-        return []
+    def run_many(self, query, rows, commit=True):
+        """
+        Bulk form of run() for a single-row INSERT: the VALUES group is
+        repeated once per row so everything goes in one round trip.
+        """
+        rows = list(rows)
+        if not rows:
+            return QueryResult(True)
+        start, end = values_group(query)
+        expanded = query[:start] + ", ".join([query[start:end]] * len(rows)) + query[end:]
+        params = [value for row in rows for value in row]
+        return self.run(expanded, params, commit=commit)
+
+    def execute_query(self, query, params=None, commit=False):
+        """Execute a statement that returns no rows; returns (success, error)"""
+        result = self.run(query, params, commit=commit)
+        return result.success, result.error
+
+    def metrics(self):
+        """Pool counters, including how long callers waited for a connection"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pool_size'] = self.pool_size
+            metrics['open_connections'] = self._open
+        metrics['idle_connections'] = self._idle.qsize()
+        checkouts = metrics['checkouts']
+        metrics['avg_wait_seconds'] = metrics['wait_seconds'] / checkouts if checkouts else 0.0
+        return metrics
 
     def close(self):
-        """Close the database connection"""
-        try:
-            if hasattr(self, 'cursor') and self.cursor:
-                self.cursor.close()
-            if hasattr(self, 'connection') and self.connection and self.connection.is_connected():
-                self.connection.close()
-                print("Database connection closed")
-        except Error as e:
-            print(f"❌ Error closing connection: {e}")
\ No newline at end of file
+        """Close the idle pooled connections (new ones are opened on the next query)"""
+        while True:
+            try:
+                connection, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if connection.is_connected():
+                    connection.close()
+            except Error as e:
+                print(f"❌ Error closing connection: {e}")
+            with self._lock:
+                self._open -= 1
+        print("Database connection closed")
@@ -0,0 +1,195 @@
+# downsampling.py
+#
+# Fewer points for long series before they are plotted. An axes a thousand
+# pixels wide cannot show more than a couple of points per pixel, so
+# drawing 10k+ points per line only costs time and memory:
+#   - lines use Largest-Triangle-Three-Buckets (LTTB), which keeps the
+#     points that shape the line (peaks, troughs, turns),
+#   - bar series (volume) keep the smallest and largest bar per bucket,
+#     so spikes survive.
+# SeriesDownsampler caches the results per (series, width) so presentation
+# toggles and re-renders of the same data reuse them.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Line points per horizontal pixel of the axes
+POINTS_PER_PIXEL = 1
+
+# LTTB buckets up to this many points are solved with one table for all
+# buckets (cost grows with the square of the size); larger ones bucket by
+# bucket, where the per-bucket overhead no longer matters
+MAX_TABLE_BUCKET = 16
+
+# Triangle areas computed per block of the table
+TABLE_BLOCK = 1 << 20
+
+# Downsampled series kept by a SeriesDownsampler
+DEFAULT_MAX_ENTRIES = 64
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the threshold points LTTB keeps out of x/y (first and last
+    always included). x must be increasing and both must be free of NaN.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the inner points; bucket i is edges[i]:edges[i + 1]
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # Third corner of the triangles: the average of the next bucket (the last point for the last bucket)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    size = int(counts.max())
+    if size > MAX_TABLE_BUCKET:
+        selected[1:-1] = _lttb_loop(x, y, edges, next_x, next_y)
+    else:
+        selected[1:-1] = _lttb_table(x, y, edges, counts, size, next_x, next_y)
+    return selected
+
+
+def _triangle_areas(ax, ay, bx, by, cx, cy):
+    # Twice the area; only the argmax matters
+    return np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+
+
+def _lttb_loop(x, y, edges, next_x, next_y):
+    # The textbook form: each bucket's point depends on the previous bucket's
+    chosen = np.empty(len(edges) - 1, dtype=np.int64)
+    a = 0
+    for i in range(len(chosen)):
+        start, end = edges[i], edges[i + 1]
+        areas = _triangle_areas(x[a], y[a], x[start:end], y[start:end], next_x[i], next_y[i])
+        a = start + int(areas.argmax())
+        chosen[i] = a
+    return chosen
+
+
+def _lttb_table(x, y, edges, counts, size, next_x, next_y):
+    """
+    Same result as _lttb_loop without a NumPy call per bucket: for every
+    bucket and every point the previous bucket may have chosen, the best
+    point is computed at once (buckets x size x size); then the choices
+    are followed from the first bucket, which is plain list indexing.
+    """
+    buckets = len(counts)
+    column = np.arange(size)
+    valid = column < counts[:, None]
+    index = np.minimum(edges[:-1, None] + column, len(x) - 1)
+    bx, by = x[index], y[index]
+
+    # Bucket 0 follows the first point
+    areas = _triangle_areas(x[0], y[0], bx[0], by[0], next_x[0], next_y[0])
+    first = int(np.where(valid[0], areas, -1.0).argmax())
+
+    # best[i, p]: point of bucket i when bucket i - 1 chose its point p
+    best = np.zeros((buckets, size), dtype=np.int64)
+    rows = max(TABLE_BLOCK // (size * size), 1)
+    for start in range(1, buckets, rows):
+        end = min(start + rows, buckets)
+        areas = _triangle_areas(bx[start - 1:end - 1, :, None], by[start - 1:end - 1, :, None],
+                                bx[start:end, None, :], by[start:end, None, :],
+                                next_x[start:end, None, None], next_y[start:end, None, None])
+        areas[~np.broadcast_to(valid[start:end, None, :], areas.shape)] = -1.0
+        best[start:end] = areas.argmax(axis=2)
+
+    columns = [first]
+    choice = first
+    for row in best[1:].tolist():
+        choice = row[choice]
+        columns.append(choice)
+    return index[np.arange(buckets), columns]
+
+
+def lttb(x, y, threshold):
+    """x/y reduced to about threshold points with LTTB; NaN points (e.g. the start of a moving average) are dropped"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    keep = lttb_indices(x, y, threshold)
+    return x[keep], y[keep]
+
+
+def minmax_indices(y, buckets):
+    """Indices of the smallest and largest value of each of about `buckets` equal runs of y, in order"""
+    n = len(y)
+    if buckets <= 0 or 2 * buckets >= n:
+        return np.arange(n)
+    size = int(np.ceil(n / buckets))
+    count = int(np.ceil(n / size))
+    padded = np.empty(count * size)
+    padded[:n] = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    rows = padded.reshape(count, size)
+    offsets = np.arange(count) * size
+
+    padded[n:] = -np.inf
+    highest = offsets + rows.argmax(axis=1)
+    padded[n:] = np.inf
+    lowest = offsets + rows.argmin(axis=1)
+    return np.unique(np.concatenate((lowest, highest)))
+
+
+def point_budget(ax, scale=1.0):
+    """Points worth plotting across the axes (scale > 1 when the data extends beyond the view)"""
+    return max(int(ax.get_window_extent().width * POINTS_PER_PIXEL * scale), 3)
+
+
+class SeriesDownsampler:
+    """
+    Downsampled series cached per (key, points). The key names the series
+    and must change when its data does (or call clear()).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def line(self, key, x, y, points):
+        """LTTB of a line series -> (x, y)"""
+        return self._get(('line', key, points), lambda: lttb(x, y, points))
+
+    def envelope(self, key, y, points):
+        """
+        Indices of the bars of a bar series to draw, at most about points
+        (index x, colors, ... with them)
+        """
+        return self._get(('envelope', key, points), lambda: minmax_indices(y, points // 2))
+
+    def _get(self, key, compute):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return result
+            self._stats['misses'] += 1
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
@@ -0,0 +1,216 @@
+# frame_table_model.py
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def is_volume(column):
+    return 'Volume' in str(column)
+
+
+def format_cell(value, column):
+    """Cell text as the preview shows it"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        if is_volume(column):
+            return f"{value:,.0f}"
+        if isinstance(value, (int, np.integer)):
+            return str(value)
+        return f"{value:.2f}"
+    return str(value)
+
+
+def format_dates(index):
+    """DATE_FORMAT text of a DatetimeIndex at NumPy speed (strftime is a Python call per value)"""
+    text = np.datetime_as_string(wall_clock(index), unit='s')
+    # 'YYYY-MM-DDTHH:MM:SS' -> 'YYYY-MM-DD HH:MM:SS'
+    text.view('U1').reshape(len(text), -1)[:, 10] = ' '
+    return text.astype(object)
+
+
+def format_column(values, column):
+    """format_cell over a whole column (object array of text)"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf' and is_volume(column):
+        return pd.Series(values).map('{:,.0f}'.format).to_numpy(dtype=object)
+    if values.dtype.kind == 'f':
+        return pd.Series(values).map('{:.2f}'.format).to_numpy(dtype=object)
+    return values.astype(str).astype(object)
+
+
+def wall_clock(index):
+    """Index values as naive datetime64 in the index's own time zone, as shown"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy()
+
+
+class FrameTableModel(QAbstractTableModel):
+    """
+    Read-only view of a history DataFrame: a Date column from the index
+    plus the frame's columns. Cells are formatted only when Qt asks for
+    them (the visible ones), and the rows shown are an array of positions
+    into the frame, so filtering never copies the data (text filters
+    format each column once per frame).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frame = None
+        self.columns = []
+        self.values = []
+        self.positions = np.arange(0)
+        self.matched = 0
+        # Lower-case cell text per column of the last frame filtered by text
+        self._texts_frame = None
+        self._texts = []
+
+    # --- Qt model interface -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.positions)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.frame is None else len(self.columns) + 1
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.headers()[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        position = self.positions[index.row()]
+        col = index.column()
+        if col == 0:
+            return self.frame.index[position].strftime(DATE_FORMAT)
+        return format_cell(self.values[col - 1][position], self.columns[col - 1])
+
+    def headers(self):
+        return ['Date'] + [str(column) for column in self.columns]
+
+    # --- Contents -----------------------------------------------------------
+
+    def set_frame(self, frame, mask=None, limit=None):
+        """
+        Show the rows of frame where mask is True (all rows if None), at
+        most limit of them. The frame is not copied and must not change.
+        """
+        self.beginResetModel()
+        self.frame = frame
+        self.columns = list(frame.columns)
+        # One array per column so cells are read without pandas indexing
+        self.values = [frame[column].to_numpy() for column in self.columns]
+        positions = np.arange(len(frame)) if mask is None else np.flatnonzero(mask)
+        self.matched = len(positions)
+        self.positions = positions if limit is None else positions[:limit]
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.frame = None
+        self.columns = []
+        self.values = []
+        self.positions = np.arange(0)
+        self.matched = 0
+        self._texts_frame = None
+        self._texts = []
+        self.endResetModel()
+
+    # --- Filtering ----------------------------------------------------------
+
+    def filter_mask(self, frame, text):
+        """
+        Boolean mask of the rows of frame matching the preview filter text:
+          YYYY-MM-DD (or part of one)   date contains the text
+          >100, <50, 100-200            Close price above / below / between
+          anything else                 any cell contains the text
+        """
+        text = text.strip().lower()
+        if not text:
+            return None
+        if text.count('-') == 2:
+            return self.date_mask(frame, text)
+        close = frame['Close'].to_numpy(dtype=np.float64)
+        if '>' in text:
+            return close > float(text.replace('>', '').strip())
+        if '<' in text:
+            return close < float(text.replace('<', '').strip())
+        if '-' in text and text.count('-') == 1:
+            min_val, max_val = map(float, text.split('-'))
+            return (close >= min_val) & (close <= max_val)
+        return self.text_mask(frame, text)
+
+    @staticmethod
+    def date_mask(frame, text):
+        # Days repeat for every intraday bar: match the distinct days, then look rows up
+        days = wall_clock(frame.index).astype('datetime64[D]')
+        distinct = np.unique(days)
+        matched = [day for day, day_text in zip(distinct, np.datetime_as_string(distinct, unit='D'))
+                   if text in day_text]
+        return np.isin(days, np.array(matched, dtype='datetime64[D]'))
+
+    def cell_texts(self, frame):
+        """
+        Lower-case text of every column of frame as the table shows it,
+        built once per frame (the frame must not change) and reused by
+        every filter typed after it
+        """
+        if self._texts_frame is not frame:
+            self._texts = [pd.Series(format_column(frame[column].to_numpy(), column)).str.lower()
+                           for column in frame.columns]
+            self._texts_frame = frame
+        return self._texts
+
+    def text_mask(self, frame, text):
+        mask = np.zeros(len(frame), dtype=bool)
+        for texts in self.cell_texts(frame):
+            mask |= texts.str.contains(text, regex=False).to_numpy(dtype=bool)
+        return mask
+
+    # --- Copy / export ------------------------------------------------------
+
+    def text_columns(self, rows=None):
+        """
+        Cell text of the given table rows (all shown rows if None), one
+        object array per column, formatted from the underlying arrays
+        """
+        positions = self.positions if rows is None else self.positions[np.asarray(rows, dtype=np.int64)]
+        columns = {'Date': format_dates(self.frame.index[positions])}
+        for column, values in zip(self.columns, self.values):
+            columns[str(column)] = format_column(values[positions], column)
+        return columns
+
+    def text_frame(self, rows=None):
+        """text_columns as a DataFrame"""
+        return pd.DataFrame(self.text_columns(rows))
+
+    def csv_text(self, rows=None):
+        """The rows as CSV with a header, joined column by column rather than row by row"""
+        columns = self.text_columns(rows)
+        lines = None
+        for column, texts in columns.items():
+            if column != 'Date':
+                texts = csv_cells(texts, self.frame[column].dtype.kind, is_volume(column))
+            lines = texts if lines is None else lines + ',' + texts
+        header = ",".join(csv_cells(np.array(list(columns), dtype=object), 'O', False))
+        return "\n".join([header] + lines.tolist())
+
+
+def csv_cells(texts, kind, volume):
+    """Cells quoted where the csv module would quote them"""
+    if volume:
+        # Thousands separators
+        return '"' + texts + '"'
+    if kind in 'iuf':
+        return texts
+    # Text: check each distinct value once
+    codes, distinct = pd.factorize(texts)
+    quoted = np.array(['"' + text.replace('"', '""') + '"' if any(c in text for c in ',"\n\r') else text
+                       for text in distinct], dtype=object)
+    return quoted[codes] if len(distinct) else texts
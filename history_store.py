@@ -0,0 +1,468 @@
+# history_store.py
+import glob
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import rate_limiter
+from rate_limiter import PRIORITY_NORMAL, YFINANCE_HOST
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEED_DIR = os.path.join(BASE_DIR, 'stock_data')
+HISTORY_DIR = os.path.join(SEED_DIR, 'history')
+
+MARKET_TZ = 'Asia/Kolkata'
+
+# One raw little-endian file per column; timestamps are epoch seconds
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+TS_FILE = 'ts.i8'
+
+# Epoch seconds back to which Yahoo was already asked for the bars before
+# the first stored one (so a range it has no data for is only asked once)
+HEAD_FILE = 'head'
+# HEAD_FILE value once everything Yahoo has is stored
+EARLIEST = np.iinfo(np.int64).min
+INTRADAY_INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h')
+
+# How much to pull the first time a symbol/interval is loaded
+# (Yahoo only serves limited intraday history)
+INITIAL_PERIOD = {
+    '1m': '7d', '2m': '60d', '5m': '60d', '15m': '60d', '30m': '60d',
+    '60m': '730d', '90m': '60d', '1h': '730d',
+}
+DEFAULT_INITIAL_PERIOD = 'max'
+
+# Don't ask Yahoo for the tail more often than this (seconds)
+DEFAULT_MAX_AGE = 60
+
+# Relative difference on an already-stored bar that means Yahoo re-adjusted
+# the series (dividend/split) and the local copy must be reloaded
+ADJUSTMENT_TOLERANCE = 1e-6
+
+# Lock files (one per series) shared with the analytics worker processes
+LOCK_DIR = '.locks'
+
+
+class SeriesLock:
+    """
+    Re-entrant lock for one series that also holds an OS lock on a lock
+    file, so threads of this process and other processes (the analytics
+    workers refresh the same files) take turns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, 'a+b')
+                self._lock_file()
+            except Exception:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_file()
+            finally:
+                self._file.close()
+                self._file = None
+        self._lock.release()
+        return False
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            return
+        self._file.seek(0)
+        while True:
+            try:
+                # LK_LOCK gives up after about 10 seconds: keep waiting
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class HistoryStore:
+    """
+    On-disk columnar OHLCV history per symbol and interval.
+    Reads are memory-mapped; refreshes only download the bars after the last
+    stored one (the last stored bar is re-fetched because it may still be
+    the provisional bar of the current session); ranges reaching back
+    before the first stored bar download the missing head once.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so all windows share the same locks and files"""
+        if cls._instance is None:
+            cls._instance = HistoryStore()
+        return cls._instance
+
+    def __init__(self, root=HISTORY_DIR, seed_dir=SEED_DIR):
+        self.root = root
+        self.seed_dir = seed_dir
+        self._lock = threading.RLock()
+        self._series_locks = {}
+
+    # ----- paths -----
+
+    def series_dir(self, symbol, interval='1d', adjusted=True):
+        name = interval if adjusted else f"{interval}_raw"
+        return os.path.join(self.root, symbol.upper(), name)
+
+    def _column_path(self, directory, column):
+        return os.path.join(directory, f"{column.lower()}.f8")
+
+    def _series_lock(self, directory):
+        """
+        Per-series lock so downloads for different symbols run in parallel;
+        it also excludes other processes using the same store
+        """
+        with self._lock:
+            lock = self._series_locks.get(directory)
+            if lock is None:
+                # e.g. .locks/RELIANCE.NS-1d.lock (the dot keeps it out of symbols())
+                name = os.path.relpath(directory, self.root).replace(os.sep, '-')
+                path = os.path.join(self.root, LOCK_DIR, f"{name}.lock")
+                lock = self._series_locks[directory] = SeriesLock(path)
+            return lock
+
+    # ----- low level read/write -----
+
+    def _length(self, directory):
+        """Number of complete rows (a torn write leaves some columns longer)"""
+        paths = [os.path.join(directory, TS_FILE)] + [self._column_path(directory, c) for c in COLUMNS]
+        if not all(os.path.exists(p) for p in paths):
+            return 0
+        return min(os.path.getsize(p) // 8 for p in paths)
+
+    def read(self, symbol, interval='1d', adjusted=True):
+        """
+        Return (timestamps, {column: values}) as read-only memory maps,
+        or (None, None) when nothing is stored yet.
+        Use the maps inside locked(): a refresh (in any thread or process)
+        may truncate the files under them.
+        """
+        directory = self.series_dir(symbol, interval, adjusted)
+        with self._series_lock(directory):
+            n = self._length(directory)
+            if n == 0:
+                return None, None
+            ts = np.memmap(os.path.join(directory, TS_FILE), dtype='<i8', mode='r', shape=(n,))
+            columns = {
+                c: np.memmap(self._column_path(directory, c), dtype='<f8', mode='r', shape=(n,))
+                for c in COLUMNS
+            }
+            return ts, columns
+
+    def locked(self, symbol, interval='1d', adjusted=True):
+        """The series lock, to hold while reading through read()'s maps"""
+        return self._series_lock(self.series_dir(symbol, interval, adjusted))
+
+    def _truncate(self, directory, n):
+        for path in [os.path.join(directory, TS_FILE)] + [self._column_path(directory, c) for c in COLUMNS]:
+            if os.path.exists(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(n * 8)
+
+    def _append(self, directory, ts, columns):
+        os.makedirs(directory, exist_ok=True)
+        for c in COLUMNS:
+            with open(self._column_path(directory, c), 'ab') as f:
+                f.write(np.ascontiguousarray(columns[c], dtype='<f8').tobytes())
+        # Timestamps last: a row only counts once every column has it
+        with open(os.path.join(directory, TS_FILE), 'ab') as f:
+            f.write(np.ascontiguousarray(ts, dtype='<i8').tobytes())
+
+    def write(self, symbol, interval, adjusted, frame):
+        """
+        Merge a yfinance-style DataFrame into the store.
+        Rows at or after the first new timestamp replace what is stored.
+        """
+        frame = frame.dropna(subset=['Close'])
+        if frame.empty:
+            return 0
+
+        new_ts = self._to_epoch(frame.index)
+        directory = self.series_dir(symbol, interval, adjusted)
+        with self._series_lock(directory):
+            n = self._length(directory)
+            if n:
+                ts = np.fromfile(os.path.join(directory, TS_FILE), dtype='<i8', count=n)
+                keep = int(np.searchsorted(ts, new_ts[0], side='left'))
+            else:
+                keep = 0
+            # Also drops any torn partial row
+            self._truncate(directory, keep)
+            self._append(directory, new_ts,
+                         {c: frame[c].to_numpy(dtype=np.float64) for c in COLUMNS})
+            return len(new_ts)
+
+    def clear(self, symbol, interval='1d', adjusted=True):
+        directory = self.series_dir(symbol, interval, adjusted)
+        with self._series_lock(directory):
+            self._truncate(directory, 0)
+
+    # ----- conversions -----
+
+    @staticmethod
+    def _to_epoch(index):
+        index = pd.DatetimeIndex(index)
+        if index.tz is None:
+            index = index.tz_localize(MARKET_TZ)
+        utc = index.tz_convert('UTC').tz_localize(None)
+        return np.asarray(utc, dtype='datetime64[s]').astype(np.int64)
+
+    @staticmethod
+    def _to_date(epoch):
+        """Market-time date of epoch seconds, as yfinance start/end take it"""
+        return pd.Timestamp(int(epoch), unit='s', tz='UTC').tz_convert(MARKET_TZ).date()
+
+    def to_frame(self, ts, columns, interval='1d'):
+        """Build a yfinance-shaped DataFrame (tz-aware index, OHLCV columns)"""
+        index = pd.to_datetime(np.asarray(ts), unit='s', utc=True).tz_convert(MARKET_TZ)
+        index.name = 'Datetime' if interval in INTRADAY_INTERVALS else 'Date'
+        # Copy out of the memory maps so the frame outlives the next refresh
+        return pd.DataFrame({c: np.array(columns[c], dtype=np.float64) for c in COLUMNS}, index=index)
+
+    # ----- seeding and refreshing -----
+
+    def seed_from_csv(self, symbol):
+        """Load stock_data/{NAME}_historical_data.csv (adjusted daily bars) if present"""
+        name = symbol.upper().split('.')[0]
+        path = os.path.join(self.seed_dir, f"{name}_historical_data.csv")
+        if not symbol.upper().endswith('.NS') or not os.path.exists(path):
+            return 0
+
+        frame = pd.read_csv(path)
+        frame.index = pd.to_datetime(frame['Date'], utc=True).dt.tz_convert(MARKET_TZ)
+        print(f"Seeding {symbol} daily history from {os.path.basename(path)}")
+        return self.write(symbol, '1d', True, frame)
+
+    def last_sync(self, symbol, interval='1d', adjusted=True):
+        """When the series was last written (epoch seconds), or None"""
+        path = os.path.join(self.series_dir(symbol, interval, adjusted), TS_FILE)
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def _download(self, symbol, interval, adjusted, priority, **kwargs):
+        rate_limiter.acquire(YFINANCE_HOST, priority)
+        return yf.Ticker(symbol).history(interval=interval, auto_adjust=adjusted, **kwargs)
+
+    def refresh(self, symbol, interval='1d', adjusted=True, max_age=DEFAULT_MAX_AGE,
+                priority=PRIORITY_NORMAL):
+        """
+        Bring the stored series up to date, downloading only the missing tail.
+        Returns the number of bars written.
+        """
+        directory = self.series_dir(symbol, interval, adjusted)
+        with self._series_lock(directory):
+            seeded = False
+            if self._length(directory) == 0 and interval == '1d' and adjusted:
+                seeded = self.seed_from_csv(symbol) > 0
+
+            last_sync = self.last_sync(symbol, interval, adjusted)
+            n = self._length(directory)
+            if n and not seeded and last_sync is not None and time.time() - last_sync < max_age:
+                return 0
+
+            if n == 0:
+                return self._load_initial(symbol, interval, adjusted, priority)
+
+            # Re-fetch from the bar before the last one: the last bar may be
+            # provisional, the one before it tells us if the series was re-adjusted
+            # Plain reads, not maps: the files are rewritten below
+            ts = np.fromfile(os.path.join(directory, TS_FILE), dtype='<i8', count=n)
+            anchor = max(n - 2, 0)
+            start = self._to_date(ts[anchor])
+            tail = self._download(symbol, interval, adjusted, priority, start=start)
+            if tail.empty:
+                os.utime(os.path.join(directory, TS_FILE))
+                return 0
+
+            tail_ts = self._to_epoch(tail.index)
+            match = np.nonzero(tail_ts == ts[anchor])[0]
+            if anchor < n - 1 and len(match):
+                stored = float(np.fromfile(self._column_path(directory, 'Close'), dtype='<f8',
+                                           count=1, offset=anchor * 8)[0])
+                fetched = float(tail['Close'].iloc[match[0]])
+                if abs(fetched - stored) > ADJUSTMENT_TOLERANCE * max(abs(stored), 1.0):
+                    print(f"History for {symbol} {interval} was re-adjusted upstream, reloading")
+                    self.clear(symbol, interval, adjusted)
+                    return self._load_initial(symbol, interval, adjusted, priority)
+
+            # Only bars from the anchor onwards are rewritten
+            tail = tail[tail_ts >= ts[anchor]]
+            return self.write(symbol, interval, adjusted, tail)
+
+    def _load_initial(self, symbol, interval, adjusted, priority):
+        period = INITIAL_PERIOD.get(interval, DEFAULT_INITIAL_PERIOD)
+        written = self.write(symbol, interval, adjusted,
+                             self._download(symbol, interval, adjusted, priority, period=period))
+        if written and period == 'max':
+            self._mark_head(self.series_dir(symbol, interval, adjusted), EARLIEST)
+        return written
+
+    def _head_checked(self, directory):
+        try:
+            with open(os.path.join(directory, HEAD_FILE), encoding='utf-8') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _mark_head(self, directory, since):
+        with open(os.path.join(directory, HEAD_FILE), 'w', encoding='utf-8') as f:
+            f.write(str(int(since)))
+
+    def fill_head(self, symbol, interval='1d', adjusted=True, period=None, start=None,
+                  priority=PRIORITY_NORMAL):
+        """
+        Download the bars a period/start range needs before the first stored
+        one (e.g. 5y of a series seeded from a CSV that starts later) and
+        prepend them. Each range is only asked for once.
+        Returns the number of bars added.
+        """
+        if interval in INTRADAY_INTERVALS:
+            # The first load already took all the intraday history Yahoo serves
+            return 0
+        directory = self.series_dir(symbol, interval, adjusted)
+        with self._series_lock(directory):
+            n = self._length(directory)
+            if n == 0 or (period is None and start is None):
+                return 0
+            ts = np.fromfile(os.path.join(directory, TS_FILE), dtype='<i8', count=n)
+            wanted = EARLIEST
+            if period:
+                wanted = self._period_cutoff(ts, period)
+            if start is not None:
+                wanted = max(wanted, int(self._to_epoch([pd.Timestamp(start)])[0]))
+            first = int(ts[0])
+            checked = self._head_checked(directory)
+            if wanted >= first or (checked is not None and checked <= wanted):
+                return 0
+
+            if wanted == EARLIEST:
+                head = self._download(symbol, interval, adjusted, priority, period='max')
+            else:
+                head = self._download(symbol, interval, adjusted, priority,
+                                      start=self._to_date(wanted), end=self._to_date(first))
+            head = head.dropna(subset=['Close'])
+            added = 0
+            if not head.empty:
+                head_ts = self._to_epoch(head.index)
+                keep = head_ts < first
+                added = int(np.count_nonzero(keep))
+            if added:
+                print(f"Prepending {added} earlier bars to {symbol} {interval} history")
+                columns = {c: np.fromfile(self._column_path(directory, c), dtype='<f8', count=n)
+                           for c in COLUMNS}
+                self._truncate(directory, 0)
+                self._append(directory, head_ts[keep],
+                             {c: head[c].to_numpy(dtype=np.float64)[keep] for c in COLUMNS})
+                self._append(directory, ts, columns)
+            self._mark_head(directory, wanted)
+            return added
+
+    def get_frame(self, symbol, interval='1d', period=None, start=None, end=None, adjusted=True,
+                  refresh=True, max_age=DEFAULT_MAX_AGE, priority=PRIORITY_NORMAL):
+        """
+        Return history as a DataFrame like yf.Ticker.history().
+        Either a yfinance period string ('5d', '3mo', '1y', 'ytd', 'max', ...)
+        or a start/end date range selects the rows.
+        """
+        if refresh:
+            try:
+                self.refresh(symbol, interval, adjusted, max_age, priority)
+                self.fill_head(symbol, interval, adjusted, period, start, priority)
+            except Exception as e:
+                # Serve whatever is on disk when Yahoo is unreachable
+                print(f"Error refreshing history for {symbol}: {str(e)}")
+
+        # Copied out of the maps before another refresh can rewrite the files
+        with self.locked(symbol, interval, adjusted):
+            ts, columns = self.read(symbol, interval, adjusted)
+            if ts is None:
+                return pd.DataFrame(columns=list(COLUMNS))
+
+            lo, hi = 0, len(ts)
+            if period:
+                lo = self._period_start(ts, period)
+            if start is not None:
+                lo = max(lo, int(np.searchsorted(ts, self._to_epoch([pd.Timestamp(start)])[0], side='left')))
+            if end is not None:
+                hi = int(np.searchsorted(ts, self._to_epoch([pd.Timestamp(end)])[0], side='left'))
+
+            return self.to_frame(ts[lo:hi], {c: columns[c][lo:hi] for c in COLUMNS}, interval)
+
+    @classmethod
+    def _period_start(cls, ts, period):
+        """First row index covered by a yfinance period string, counted back from the last bar"""
+        if period == 'max':
+            return 0
+        return int(np.searchsorted(ts, cls._period_cutoff(ts, period), side='left'))
+
+    @staticmethod
+    def _period_cutoff(ts, period):
+        """Earliest time (epoch seconds) a yfinance period string covers; EARLIEST for 'max'"""
+        if period == 'max':
+            return EARLIEST
+
+        last = pd.Timestamp(int(ts[-1]), unit='s', tz='UTC').tz_convert(MARKET_TZ)
+        if period == 'ytd':
+            cutoff = pd.Timestamp(year=last.year, month=1, day=1, tz=MARKET_TZ)
+        else:
+            match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+            if not match:
+                raise ValueError(f"Unsupported period: {period}")
+            count, unit = int(match.group(1)), match.group(2)
+            if unit == 'd':
+                # Trading days, like yfinance: the last N distinct sessions
+                days = pd.to_datetime(np.asarray(ts), unit='s', utc=True).tz_convert(MARKET_TZ).normalize()
+                unique_days = days.unique()
+                cutoff = unique_days[max(len(unique_days) - count, 0)]
+            elif unit == 'wk':
+                cutoff = last.normalize() - pd.DateOffset(weeks=count)
+            elif unit == 'mo':
+                cutoff = last.normalize() - pd.DateOffset(months=count)
+            else:
+                cutoff = last.normalize() - pd.DateOffset(years=count)
+
+        return cutoff.value // 10 ** 9
+
+    def symbols(self):
+        """Symbols that have any stored history"""
+        return sorted(os.path.basename(p) for p in glob.glob(os.path.join(self.root, '*')) if os.path.isdir(p))
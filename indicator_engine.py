@@ -0,0 +1,670 @@
+# indicator_engine.py
+#
+# Streaming indicators. Every class follows the TA-Lib C implementation
+# (same seeding, smoothing and lookback), so feeding bars one at a time gives
+# the same numbers as calling talib on the whole array - identical for
+# SMA/EMA/ADX/DI/OBV and equal to the last few bits for the rest (TA-Lib
+# 0.8 picks FMA or plain kernels per CPU, so it is not bit-stable itself).
+# update() commits a bar and returns the new value(s); peek() returns what
+# update() would return without changing any state (used for the
+# still-forming intraday bar). Both are O(1). Values are NaN until the
+# TA-Lib lookback is reached.
+import math
+import threading
+from collections import deque
+
+NAN = float('nan')
+
+# TA-Lib's TA_IS_ZERO / TA_IS_ZERO_OR_NEG thresholds
+_EPSILON = 0.00000001
+
+
+def _is_zero(value):
+    return -_EPSILON < value < _EPSILON
+
+
+
+class SMA:
+    """TA-Lib SMA (running total, oldest value subtracted after each output)"""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def _next(self, value):
+        if len(self.window) < self.period - 1:
+            return NAN, self.total + value
+        total = self.total + value
+        return total / self.period, total - (self.window[0] if self.period > 1 else value)
+
+    def peek(self, value):
+        return self._next(value)[0]
+
+    def update(self, value):
+        result, self.total = self._next(value)
+        self.window.append(value)
+        if len(self.window) >= self.period:
+            self.window.popleft()
+        return result
+
+
+class EMA:
+    """
+    TA-Lib EMA seeded with the SMA of its first `period` inputs.
+    `skip` ignores that many leading inputs (MACD seeds its fast EMA late).
+    """
+
+    def __init__(self, period, skip=0):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.skip = skip
+        self.count = 0
+        self.seed_total = 0.0
+        self.value = NAN
+
+    def _next(self, value):
+        if self.count < self.skip:
+            return NAN, self.seed_total
+        seen = self.count - self.skip
+        if seen < self.period - 1:
+            return NAN, self.seed_total + value
+        if seen == self.period - 1:
+            return (self.seed_total + value) / self.period, self.seed_total + value
+        return ((value - self.value) * self.k) + self.value, self.seed_total
+
+    def peek(self, value):
+        return self._next(value)[0]
+
+    def update(self, value):
+        result, self.seed_total = self._next(value)
+        self.count += 1
+        if not math.isnan(result):
+            self.value = result
+        return result
+
+
+class RSI:
+    """TA-Lib RSI (Wilder smoothing, first value after `period` changes)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.prev_value = NAN
+        self.prev_gain = 0.0
+        self.prev_loss = 0.0
+
+    def _next(self, value):
+        n = self.period
+        if self.count == 0:
+            return NAN, 0.0, 0.0
+        change = value - self.prev_value
+        gain, loss = self.prev_gain, self.prev_loss
+        if self.count > n:
+            loss *= (n - 1)
+            gain *= (n - 1)
+        if change < 0:
+            loss -= change
+        else:
+            gain += change
+        if self.count < n:
+            return NAN, gain, loss
+        loss /= n
+        gain /= n
+        total = gain + loss
+        return (100.0 * (gain / total) if not _is_zero(total) else 0.0), gain, loss
+
+    def peek(self, value):
+        return self._next(value)[0]
+
+    def update(self, value):
+        result, self.prev_gain, self.prev_loss = self._next(value)
+        self.prev_value = value
+        self.count += 1
+        return result
+
+
+def _true_range(high, low, prev_close):
+    """TA-Lib TRUE_RANGE macro"""
+    result = high - low
+    value = abs(high - prev_close)
+    if value > result:
+        result = value
+    value = abs(low - prev_close)
+    if value > result:
+        result = value
+    return result
+
+
+class ATR:
+    """TA-Lib ATR: SMA of the first `period` true ranges, then Wilder smoothing"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.prev_close = NAN
+        self.total = 0.0
+        self.value = NAN
+
+    def _next(self, high, low, close):
+        n = self.period
+        if self.count == 0:
+            return NAN, 0.0
+        tr = _true_range(high, low, self.prev_close)
+        if self.count < n:
+            return NAN, self.total + tr
+        if self.count == n:
+            return (self.total + tr) / n, self.total + tr
+        value = self.value * (n - 1)
+        value += tr
+        value /= n
+        return value, self.total
+
+    def peek(self, high, low, close):
+        return self._next(high, low, close)[0]
+
+    def update(self, high, low, close):
+        result, self.total = self._next(high, low, close)
+        self.prev_close = close
+        self.count += 1
+        if not math.isnan(result):
+            self.value = result
+        return result
+
+
+class DMI:
+    """
+    TA-Lib ADX, PLUS_DI and MINUS_DI sharing one directional-movement state.
+    DI values start at index `period`, ADX at index 2 * period - 1.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.plus_dm = 0.0
+        self.minus_dm = 0.0
+        self.tr = 0.0
+        self.sum_dx = 0.0
+        self.adx = NAN
+
+    def _next(self, high, low, close):
+        """Returns ((adx, plus_di, minus_di), new state tuple)"""
+        n = self.period
+        state = (self.plus_dm, self.minus_dm, self.tr, self.sum_dx, self.adx)
+        if self.count == 0:
+            return (NAN, NAN, NAN), state
+
+        plus_dm, minus_dm, tr, sum_dx, adx = state
+        diff_p = high - self.prev_high
+        diff_m = self.prev_low - low
+        true_range = _true_range(high, low, self.prev_close)
+
+        if self.count < n:
+            # Plain accumulation over the first period - 1 bars
+            if diff_m > 0 and diff_p < diff_m:
+                minus_dm += diff_m
+            elif diff_p > 0 and diff_p > diff_m:
+                plus_dm += diff_p
+            tr += true_range
+            return (NAN, NAN, NAN), (plus_dm, minus_dm, tr, sum_dx, adx)
+
+        minus_dm -= minus_dm / n
+        plus_dm -= plus_dm / n
+        if diff_m > 0 and diff_p < diff_m:
+            minus_dm += diff_m
+        elif diff_p > 0 and diff_p > diff_m:
+            plus_dm += diff_p
+        tr = tr - (tr / n) + true_range
+
+        plus_di = minus_di = 0.0
+        dx = None
+        if not _is_zero(tr):
+            minus_di = 100.0 * (minus_dm / tr)
+            plus_di = 100.0 * (plus_dm / tr)
+            total = minus_di + plus_di
+            if not _is_zero(total):
+                dx = 100.0 * (abs(minus_di - plus_di) / total)
+
+        if self.count < 2 * n - 1:
+            if dx is not None:
+                sum_dx += dx
+            out_adx = NAN
+        elif self.count == 2 * n - 1:
+            if dx is not None:
+                sum_dx += dx
+            adx = sum_dx / n
+            out_adx = adx
+        else:
+            if dx is not None:
+                adx = ((adx * (n - 1)) + dx) / n
+            out_adx = adx
+
+        return (out_adx, plus_di, minus_di), (plus_dm, minus_dm, tr, sum_dx, adx)
+
+    def peek(self, high, low, close):
+        return self._next(high, low, close)[0]
+
+    def update(self, high, low, close):
+        result, state = self._next(high, low, close)
+        self.plus_dm, self.minus_dm, self.tr, self.sum_dx, self.adx = state
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        self.count += 1
+        return result
+
+
+class MACD:
+    """
+    TA-Lib MACD: the fast EMA is seeded at the slow EMA's lookback, the signal
+    EMA is seeded on the first `signal` MACD values; output starts at
+    slow + signal - 2.
+    """
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        if slow < fast:
+            fast, slow = slow, fast
+        self.slow_ema = EMA(slow)
+        self.fast_ema = EMA(fast, skip=slow - fast)
+        self.signal_ema = EMA(signal)
+        self.lookback = slow - 1 + signal - 1
+        self.count = 0
+
+    def _finish(self, slow, fast, signal_fn):
+        if math.isnan(slow):
+            return (NAN, NAN, NAN)
+        macd = fast - slow
+        signal = signal_fn(macd)
+        if self.count < self.lookback:
+            return (NAN, NAN, NAN)
+        return (macd, signal, macd - signal)
+
+    def peek(self, value):
+        return self._finish(self.slow_ema.peek(value), self.fast_ema.peek(value), self.signal_ema.peek)
+
+    def update(self, value):
+        result = self._finish(self.slow_ema.update(value), self.fast_ema.update(value), self.signal_ema.update)
+        self.count += 1
+        return result
+
+
+class BBANDS:
+    """TA-Lib BBANDS with an SMA middle band and population standard deviation"""
+
+    def __init__(self, period=20, nbdevup=2.0, nbdevdn=2.0):
+        self.period = period
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+        self.sma = SMA(period)
+        self.squares = deque()
+        self.total2 = 0.0
+
+    def _next(self, value, middle):
+        square = value * value
+        if math.isnan(middle):
+            return (NAN, NAN, NAN), self.total2 + square
+        total2 = self.total2 + square
+        mean2 = total2 / self.period
+        new_total2 = total2 - (self.squares[0] if self.period > 1 else square)
+        mean2 -= middle * middle
+        stddev = math.sqrt(mean2) if not mean2 < _EPSILON else 0.0
+        if self.nbdevup == self.nbdevdn:
+            band = stddev * self.nbdevup
+            return (middle + band, middle, middle - band), new_total2
+        return (middle + stddev * self.nbdevup, middle, middle - stddev * self.nbdevdn), new_total2
+
+    def peek(self, value):
+        return self._next(value, self.sma.peek(value))[0]
+
+    def update(self, value):
+        result, self.total2 = self._next(value, self.sma.update(value))
+        self.squares.append(value * value)
+        if len(self.squares) >= self.period:
+            self.squares.popleft()
+        return result
+
+
+class _RollingExtreme:
+    """Sliding-window max (or min) with a monotonic deque - amortized O(1)"""
+
+    def __init__(self, period, use_max):
+        self.period = period
+        self.better = (lambda a, b: a >= b) if use_max else (lambda a, b: a <= b)
+        self.items = deque()  # (index, value)
+
+    def peek(self, index, value):
+        best = value
+        for item_index, item_value in self.items:
+            if item_index <= index - self.period:
+                continue
+            # The first live item is the extreme of the stored window
+            if not self.better(best, item_value):
+                best = item_value
+            break
+        return best
+
+    def update(self, index, value):
+        while self.items and self.better(value, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((index, value))
+        while self.items[0][0] <= index - self.period:
+            self.items.popleft()
+        return self.items[0][1]
+
+
+class STOCH:
+    """TA-Lib STOCH with SMA smoothing for slow %K and slow %D"""
+
+    def __init__(self, fastk_period=14, slowk_period=3, slowd_period=3):
+        self.fastk_period = fastk_period
+        self.highest = _RollingExtreme(fastk_period, True)
+        self.lowest = _RollingExtreme(fastk_period, False)
+        self.slowk_sma = SMA(slowk_period)
+        self.slowd_sma = SMA(slowd_period)
+        self.lookback = fastk_period - 1 + slowk_period - 1 + slowd_period - 1
+        self.count = 0
+
+    @staticmethod
+    def _fastk(close, highest, lowest):
+        diff = (highest - lowest) / 100.0
+        return (close - lowest) / diff if diff != 0.0 else 0.0
+
+    def _finish(self, fastk, slowk_fn, slowd_fn):
+        if fastk is None:
+            return (NAN, NAN)
+        slowk = slowk_fn(fastk)
+        if math.isnan(slowk):
+            return (NAN, NAN)
+        slowd = slowd_fn(slowk)
+        if self.count < self.lookback:
+            return (NAN, NAN)
+        return (slowk, slowd)
+
+    def peek(self, high, low, close):
+        fastk = None
+        if self.count >= self.fastk_period - 1:
+            fastk = self._fastk(close, self.highest.peek(self.count, high), self.lowest.peek(self.count, low))
+        return self._finish(fastk, self.slowk_sma.peek, self.slowd_sma.peek)
+
+    def update(self, high, low, close):
+        highest = self.highest.update(self.count, high)
+        lowest = self.lowest.update(self.count, low)
+        fastk = None
+        if self.count >= self.fastk_period - 1:
+            fastk = self._fastk(close, highest, lowest)
+        result = self._finish(fastk, self.slowk_sma.update, self.slowd_sma.update)
+        self.count += 1
+        return result
+
+
+class OBV:
+    """TA-Lib OBV, starting from the first bar's volume"""
+
+    def __init__(self):
+        self.value = NAN
+        self.prev_close = NAN
+
+    def _next(self, close, volume):
+        if math.isnan(self.value):
+            return volume
+        if close > self.prev_close:
+            return self.value + volume
+        if close < self.prev_close:
+            return self.value - volume
+        return self.value
+
+    def peek(self, close, volume):
+        return self._next(close, volume)
+
+    def update(self, close, volume):
+        self.value = self._next(close, volume)
+        self.prev_close = close
+        return self.value
+
+
+# Number of committed bars kept per symbol for look-back comparisons
+HISTORY_LENGTH = 25
+
+
+class SymbolIndicators:
+    """All analytics-table indicators for one symbol, updated bar by bar"""
+
+    def __init__(self):
+        self.ema_5 = EMA(5)
+        self.ema_20 = EMA(20)
+        self.sma_50 = SMA(50)
+        self.sma_100 = SMA(100)
+        self.rsi = RSI(14)
+        self.dmi = DMI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bbands = BBANDS(20, 2.0, 2.0)
+        self.stoch = STOCH(14, 3, 3)
+        self.atr = ATR(14)
+        self.obv = OBV()
+        self.history = deque(maxlen=HISTORY_LENGTH)
+        self.count = 0
+        # (timestamp, close) of the last committed bar, to detect rewritten history
+        self.last_committed = None
+
+    def _snapshot(self, method, bar):
+        ts, open_price, high, low, close, volume = bar
+        adx, plus_di, minus_di = getattr(self.dmi, method)(high, low, close)
+        macd, macd_signal, macd_hist = getattr(self.macd, method)(close)
+        bb_upper, bb_middle, bb_lower = getattr(self.bbands, method)(close)
+        slowk, slowd = getattr(self.stoch, method)(high, low, close)
+        return {
+            'ts': ts,
+            'close': close,
+            'ema_5': getattr(self.ema_5, method)(close),
+            'ema_20': getattr(self.ema_20, method)(close),
+            'sma_50': getattr(self.sma_50, method)(close),
+            'sma_100': getattr(self.sma_100, method)(close),
+            'rsi': getattr(self.rsi, method)(close),
+            'adx': adx,
+            'plus_di': plus_di,
+            'minus_di': minus_di,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'slowk': slowk,
+            'slowd': slowd,
+            'atr': getattr(self.atr, method)(high, low, close),
+            'obv': getattr(self.obv, method)(close, volume),
+        }
+
+    def update(self, bar):
+        """Commit a completed bar (ts, open, high, low, close, volume)"""
+        snapshot = self._snapshot('update', bar)
+        self.history.append(snapshot)
+        self.count += 1
+        self.last_committed = (bar[0], bar[4])
+        return snapshot
+
+    def peek(self, bar):
+        """Indicator values if `bar` were appended - nothing is committed"""
+        return self._snapshot('peek', bar)
+
+
+class IndicatorEngine:
+    """
+    Keeps SymbolIndicators per symbol and brings them up to date from the
+    history store. All bars but the last are committed; the last one is
+    treated as provisional (it may be today's still-forming bar) and only
+    peeked, so each refresh costs O(new bars).
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so the state survives window refreshes"""
+        if cls._instance is None:
+            cls._instance = IndicatorEngine()
+        return cls._instance
+
+    def __init__(self):
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def reset(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self.states.clear()
+            else:
+                self.states.pop(symbol, None)
+
+    def sync(self, symbol, ts, opens, highs, lows, closes, volumes):
+        """
+        Bring the symbol's state up to date with the given columns (anything
+        indexable, e.g. HistoryStore memory maps) and return
+        (series, bar_count): the recent committed snapshots plus the
+        provisional last bar, oldest first.
+        """
+        n = len(ts)
+        if n == 0:
+            return [], 0
+
+        with self._lock:
+            state = self.states.get(symbol)
+            # Start over if the stored history no longer extends what we committed
+            if state is not None and state.count:
+                last = state.count - 1
+                if (state.count > n - 1 or int(ts[last]) != state.last_committed[0]
+                        or float(closes[last]) != state.last_committed[1]):
+                    state = None
+            if state is None:
+                state = SymbolIndicators()
+                self.states[symbol] = state
+
+            for i in range(state.count, n - 1):
+                state.update(self._bar(i, ts, opens, highs, lows, closes, volumes))
+
+            latest = state.peek(self._bar(n - 1, ts, opens, highs, lows, closes, volumes))
+            return list(state.history) + [latest], n
+
+    def sync_from_store(self, symbol, store, interval='1d', adjusted=True):
+        """sync() reading the history store's memory maps (only new rows are touched)"""
+        with store.locked(symbol, interval, adjusted):
+            ts, columns = store.read(symbol, interval, adjusted)
+            if ts is None:
+                return [], 0
+            return self.sync(symbol, ts, columns['Open'], columns['High'], columns['Low'],
+                             columns['Close'], columns['Volume'])
+
+    @staticmethod
+    def _bar(i, ts, opens, highs, lows, closes, volumes):
+        return (int(ts[i]), float(opens[i]), float(highs[i]), float(lows[i]),
+                float(closes[i]), float(volumes[i]))
+
+
+def generate_signal(series):
+    """
+    Vote BUY/SELL/HOLD from a snapshot series (oldest first, latest last),
+    using the same rules as the analytics table. Returns a dict with the
+    signal, the vote counts and the derived trend values.
+    """
+    latest = series[-1]
+    current_price = latest['close']
+    ma_5, ma_20, ma_50 = latest['ema_5'], latest['ema_20'], latest['sma_50']
+    rsi, adx = latest['rsi'], latest['adx']
+    macd, macd_signal, macd_hist = latest['macd'], latest['macd_signal'], latest['macd_hist']
+
+    def back(key, offset):
+        # Value `offset` bars before the latest one, None if not available
+        return series[-1 - offset][key] if len(series) > offset else None
+
+    ema_20_prev = back('ema_20', 5)
+    ma_20_slope = (ma_20 - ema_20_prev) / 5 if ema_20_prev is not None else 0
+    trend_direction = "Up" if latest['plus_di'] > latest['minus_di'] else "Down"
+
+    hist_prev = back('macd_hist', 1)
+    hist_momentum = macd_hist - hist_prev if hist_prev is not None else 0
+
+    band_width = latest['bb_upper'] - latest['bb_lower']
+    bb_percent = (current_price - latest['bb_lower']) / band_width * 100 if band_width > 0 else 50
+
+    obv_prev = back('obv', 19)
+    obv_trend = "Unknown"
+    if obv_prev is not None:
+        obv_trend = "Up" if latest['obv'] > obv_prev else "Down"
+
+    buy_signals = 0
+    sell_signals = 0
+
+    # Price vs Moving Averages analysis
+    if current_price > ma_20 and current_price > ma_50:
+        buy_signals += 1
+    elif current_price < ma_20 and current_price < ma_50:
+        sell_signals += 1
+
+    # Moving Average crossovers and slopes
+    if ma_5 > ma_20 and ma_20_slope > 0:
+        buy_signals += 1
+    elif ma_5 < ma_20 and ma_20_slope < 0:
+        sell_signals += 1
+
+    # RSI signals
+    if rsi < 30:
+        buy_signals += 1
+    elif rsi > 70:
+        sell_signals += 1
+
+    # ADX trend strength confirmation
+    if adx > 25:
+        if trend_direction == "Up":
+            buy_signals += 1
+        elif trend_direction == "Down":
+            sell_signals += 1
+
+    # MACD signals
+    if macd > macd_signal and macd_hist > 0:
+        buy_signals += 1
+    elif macd < macd_signal and macd_hist < 0:
+        sell_signals += 1
+
+    # MACD histogram momentum
+    if hist_momentum > 0 and macd_hist > 0:
+        buy_signals += 1
+    elif hist_momentum < 0 and macd_hist < 0:
+        sell_signals += 1
+
+    # Bollinger Band signals
+    if bb_percent < 10:
+        buy_signals += 1
+    elif bb_percent > 90:
+        sell_signals += 1
+
+    # Stochastic signals
+    if latest['slowk'] < 20 and latest['slowd'] < 20:
+        buy_signals += 1
+    elif latest['slowk'] > 80 and latest['slowd'] > 80:
+        sell_signals += 1
+
+    # Volume confirmation - only use if we have a valid trend
+    if obv_trend == "Up" and current_price > ma_20:
+        buy_signals += 1
+    elif obv_trend == "Down" and current_price < ma_20:
+        sell_signals += 1
+
+    signal_difference = buy_signals - sell_signals
+    if signal_difference >= 2:
+        signal = "BUY"
+    elif signal_difference <= -2:
+        signal = "SELL"
+    else:
+        signal = "HOLD"
+
+    return {
+        'signal': signal,
+        'buy_signals': buy_signals,
+        'sell_signals': sell_signals,
+        'trend_direction': trend_direction,
+        'ma_20_slope': ma_20_slope,
+        'hist_momentum': hist_momentum,
+        'bb_percent': bb_percent,
+        'obv_trend': obv_trend,
+    }
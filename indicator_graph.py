@@ -0,0 +1,142 @@
+# indicator_graph.py
+#
+# Small dependency graph for indicator computations. Each node is an
+# indicator with fixed parameters and a list of nodes it is built from
+# (ADX/+DI/-DI share one directional-movement node, which shares the true
+# range with ATR; Bollinger reuses the 20-bar SMA, MACD the EMAs).
+# Results are memoized per (indicator, params, symbol, last bar), so a node
+# requested by the display columns, the votes and anything else in the
+# same refresh is computed once, and every node keeps timing counters.
+import threading
+import time
+from collections import OrderedDict
+
+# Node results kept in memory - enough for about two full panels, each
+# result being one (symbols x bars) array
+DEFAULT_MAX_ENTRIES = 64
+
+
+class IndicatorNode:
+    """One indicator: compute(inputs, *dependency_values, **params)"""
+
+    def __init__(self, name, compute, deps=(), params=None):
+        self.name = name
+        self.compute = compute
+        self.deps = tuple(deps)
+        self.params = dict(params or {})
+        self.key = (name,) + tuple(sorted(self.params.items()))
+
+
+class NodeTiming:
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+
+class IndicatorGraph:
+    """
+    Registry of indicator nodes plus a bounded memo of their results.
+    Node timings are exclusive: a node's time excludes its dependencies.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Shared graph with the analytics-table indicators registered"""
+        if cls._instance is None:
+            from indicator_panel import register_default_nodes
+            graph = IndicatorGraph()
+            register_default_nodes(graph)
+            cls._instance = graph
+        return cls._instance
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.nodes = {}
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._timings = {}
+        self._lock = threading.RLock()
+
+    def add(self, name, compute, deps=(), **params):
+        """Register a node; deps are names of nodes registered before it"""
+        for dep in deps:
+            if dep not in self.nodes:
+                raise KeyError(f"Unknown dependency {dep!r} for indicator {name!r}")
+        node = IndicatorNode(name, compute, deps, params)
+        self.nodes[name] = node
+        return node
+
+    def evaluate(self, name, symbol, last_bar, inputs):
+        """
+        Value of node `name` for `symbol` as of `last_bar`. `inputs` holds
+        the raw columns; it is only read when the node is not memoized.
+        """
+        with self._lock:
+            node = self.nodes[name]
+            memo_key = (node.key, symbol, last_bar)
+            timing = self._timings.setdefault(node.key, NodeTiming())
+            timing.calls += 1
+            if memo_key in self._memo:
+                timing.hits += 1
+                self._memo.move_to_end(memo_key)
+                return self._memo[memo_key]
+
+            dep_values = [self.evaluate(dep, symbol, last_bar, inputs) for dep in node.deps]
+            started = time.perf_counter()
+            value = node.compute(inputs, *dep_values, **node.params)
+            timing.seconds += time.perf_counter() - started
+
+            self._memo[memo_key] = value
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+            return value
+
+    def context(self, symbol, last_bar, inputs):
+        """Bound evaluator for one symbol (or panel) and bar"""
+        return lambda name: self.evaluate(name, symbol, last_bar, inputs)
+
+    def invalidate(self, symbol=None):
+        """Drop memoized results for one symbol (or everything)"""
+        with self._lock:
+            if symbol is None:
+                self._memo.clear()
+                return
+            for key in [k for k in self._memo if k[1] == symbol]:
+                del self._memo[key]
+
+    def timing_report(self):
+        """[(node key, calls, memo hits, milliseconds)] slowest first"""
+        with self._lock:
+            rows = [(key, t.calls, t.hits, t.seconds * 1000.0) for key, t in self._timings.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def reset_timings(self):
+        with self._lock:
+            self._timings.clear()
+
+    def print_timings(self, limit=None):
+        print_timing_report(self.timing_report(), limit)
+
+
+def merge_timing_reports(*reports):
+    """Combine timing_report() rows (e.g. from several worker processes)"""
+    merged = {}
+    for report in reports:
+        for key, calls, hits, ms in report:
+            total = merged.setdefault(key, [0, 0, 0.0])
+            total[0] += calls
+            total[1] += hits
+            total[2] += ms
+    rows = [(key, calls, hits, ms) for key, (calls, hits, ms) in merged.items()]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def print_timing_report(rows, limit=None):
+    total = sum(row[3] for row in rows)
+    print(f"Indicator timings: {total:.1f} ms over {len(rows)} nodes")
+    for key, calls, hits, ms in rows[:limit]:
+        params = ", ".join(f"{k}={v}" for k, v in key[1:])
+        label = f"{key[0]}({params})" if params else key[0]
+        print(f"  {label:<48} {ms:8.2f} ms  {calls} calls, {hits} cached")
@@ -0,0 +1,423 @@
+# indicator_panel.py
+#
+# Whole-watchlist indicator computation. Bars of every symbol are stacked
+# into 2-D arrays (symbols x bars), right-aligned so the last column is
+# each symbol's latest bar; symbols with a shorter history are padded on
+# the left with NaN. Window indicators are computed for the whole panel at
+# once, recursive ones (EMA, RSI, DMI) with one vectorized step per bar,
+# so the cost grows with the number of bars rather than symbols x bars
+# Python calls. The arithmetic follows indicator_engine.py (and TA-Lib).
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicator_engine import _EPSILON
+from indicator_graph import IndicatorGraph
+
+# Trailing bars stacked per symbol: the 100-bar SMA plus ~200 bars for the
+# EMA/RSI/ADX seeds to decay to well below display precision
+PANEL_BARS = 300
+
+# Codes used in the vectorized signal column
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_NAMES = {SIGNAL_SELL: "SELL", SIGNAL_HOLD: "HOLD", SIGNAL_BUY: "BUY"}
+
+
+class IndicatorPanel:
+    """Right-aligned OHLCV arrays for a list of symbols"""
+
+    def __init__(self, symbols, bars=PANEL_BARS):
+        self.symbols = list(symbols)
+        shape = (len(self.symbols), bars)
+        self.ts = np.zeros(shape, dtype=np.int64)
+        self.open = np.full(shape, np.nan)
+        self.high = np.full(shape, np.nan)
+        self.low = np.full(shape, np.nan)
+        self.close = np.full(shape, np.nan)
+        self.volume = np.full(shape, np.nan)
+        # Bars stored per symbol (may exceed the panel width)
+        self.bar_counts = np.zeros(len(self.symbols), dtype=np.int64)
+        # Bar number of each cell within its symbol's panel window (-1 = padding)
+        self.bar_index = np.full(shape, -1, dtype=np.int64)
+
+    @classmethod
+    def from_store(cls, symbols, store, interval='1d', adjusted=True, bars=PANEL_BARS):
+        """Stack the trailing `bars` bars of each symbol from a HistoryStore"""
+        panel = cls(symbols, bars)
+        for i, symbol in enumerate(panel.symbols):
+            # set_row copies out of the maps while a refresh cannot rewrite them
+            with store.locked(symbol, interval, adjusted):
+                ts, columns = store.read(symbol, interval, adjusted)
+                if ts is None:
+                    continue
+                panel.set_row(i, ts, columns['Open'], columns['High'], columns['Low'],
+                              columns['Close'], columns['Volume'])
+        return panel
+
+    def set_row(self, i, ts, opens, highs, lows, closes, volumes):
+        n = len(ts)
+        width = self.close.shape[1]
+        take = min(n, width)
+        self.bar_counts[i] = n
+        if take == 0:
+            return
+        target = slice(width - take, width)
+        source = slice(n - take, n)
+        self.ts[i, target] = ts[source]
+        self.open[i, target] = opens[source]
+        self.high[i, target] = highs[source]
+        self.low[i, target] = lows[source]
+        self.close[i, target] = closes[source]
+        self.volume[i, target] = volumes[source]
+        self.bar_index[i, target] = np.arange(take)
+
+    def last_bar_key(self):
+        """
+        Identifies the panel's data: latest bar per row (every column, as a
+        provisional bar's high/low/volume can move while its close does
+        not) plus per-row checksums
+        """
+        columns = (self.open, self.high, self.low, self.close, self.volume)
+        with np.errstate(invalid='ignore'):
+            checksums = [np.nansum(column, axis=1) for column in columns]
+        return ((self.ts[:, -1].tobytes(), self.bar_counts.tobytes())
+                + tuple(column[:, -1].tobytes() for column in columns)
+                + tuple(checksum.tobytes() for checksum in checksums))
+
+
+def _rolling_sum(x, period):
+    """Sum of the last `period` values per cell (NaN until the window is full)"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= period:
+        out[:, period - 1:] = sliding_window_view(x, period, axis=1).sum(axis=-1)
+    return out
+
+
+def sma(x, period):
+    return _rolling_sum(x, period) / period
+
+
+def ema(x, bar_index, period, skip=0):
+    """TA-Lib EMA per row, seeded with the SMA of the first `period` inputs after `skip`"""
+    k = 2.0 / (period + 1)
+    seed_at = skip + period - 1
+    seeds = sma(x, period)
+    out = np.full(x.shape, np.nan)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        prev = ((x[:, t] - prev) * k) + prev
+        seeding = bar_index[:, t] == seed_at
+        prev[seeding] = seeds[seeding, t]
+        out[:, t] = prev
+    return out
+
+
+def rsi(close, bar_index, period=14):
+    n = period
+    out = np.full(close.shape, np.nan)
+    gain = np.zeros(close.shape[0])
+    loss = np.zeros(close.shape[0])
+    for t in range(1, close.shape[1]):
+        k = bar_index[:, t]
+        active = k >= 1
+        change = np.where(active, close[:, t] - close[:, t - 1], 0.0)
+        smoothing = k > n
+        g = np.where(smoothing, gain * (n - 1), gain)
+        l = np.where(smoothing, loss * (n - 1), loss)
+        l = l - np.where(change < 0, change, 0.0)
+        g = g + np.where(change < 0, 0.0, change)
+        ready = k >= n
+        g = np.where(ready, g / n, g)
+        l = np.where(ready, l / n, l)
+        total = g + l
+        zero = np.abs(total) < _EPSILON
+        value = 100.0 * (g / np.where(zero, 1.0, total))
+        out[:, t] = np.where(ready, np.where(zero, 0.0, value), np.nan)
+        gain = np.where(active, g, gain)
+        loss = np.where(active, l, loss)
+    return out
+
+
+def true_range(high, low, close):
+    """TA-Lib TRUE_RANGE against the previous close (NaN on the first column)"""
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+    result = high - low
+    result = np.maximum(result, np.abs(high - prev_close))
+    return np.maximum(result, np.abs(low - prev_close))
+
+
+def atr(tr_all, bar_index, period=14):
+    """TA-Lib ATR from precomputed true ranges"""
+    n = period
+    out = np.full(tr_all.shape, np.nan)
+    total = np.zeros(tr_all.shape[0])
+    value = np.full(tr_all.shape[0], np.nan)
+    for t in range(1, tr_all.shape[1]):
+        k = bar_index[:, t]
+        tr = tr_all[:, t]
+        total = np.where((k >= 1) & (k <= n), total + tr, total)
+        value = np.where(k == n, total / n, value)
+        value = np.where(k > n, ((value * (n - 1)) + tr) / n, value)
+        out[:, t] = np.where(k >= n, value, np.nan)
+    return out
+
+
+def dmi(high, low, close, bar_index, period=14, tr_all=None):
+    """TA-Lib ADX, PLUS_DI and MINUS_DI for every row"""
+    n = period
+    rows, width = close.shape
+    adx_out = np.full(close.shape, np.nan)
+    plus_out = np.full(close.shape, np.nan)
+    minus_out = np.full(close.shape, np.nan)
+    if tr_all is None:
+        tr_all = true_range(high, low, close)
+
+    plus_dm = np.zeros(rows)
+    minus_dm = np.zeros(rows)
+    tr = np.zeros(rows)
+    sum_dx = np.zeros(rows)
+    adx = np.full(rows, np.nan)
+    for t in range(1, width):
+        k = bar_index[:, t]
+        active = k >= 1
+        diff_p = high[:, t] - high[:, t - 1]
+        diff_m = low[:, t - 1] - low[:, t]
+        take_minus = (diff_m > 0) & (diff_p < diff_m)
+        take_plus = ~take_minus & (diff_p > 0) & (diff_p > diff_m)
+
+        smoothing = k >= n
+        p = np.where(smoothing, plus_dm - plus_dm / n, plus_dm)
+        m = np.where(smoothing, minus_dm - minus_dm / n, minus_dm)
+        m = m + np.where(take_minus, diff_m, 0.0)
+        p = p + np.where(take_plus, diff_p, 0.0)
+        r = np.where(smoothing, tr - (tr / n) + tr_all[:, t], tr + tr_all[:, t])
+
+        tr_zero = np.abs(r) < _EPSILON
+        safe_r = np.where(tr_zero, 1.0, r)
+        minus_di = np.where(tr_zero, 0.0, 100.0 * (m / safe_r))
+        plus_di = np.where(tr_zero, 0.0, 100.0 * (p / safe_r))
+        total = minus_di + plus_di
+        has_dx = ~tr_zero & ~(np.abs(total) < _EPSILON)
+        dx = 100.0 * (np.abs(minus_di - plus_di) / np.where(has_dx, total, 1.0))
+
+        summing = smoothing & (k <= 2 * n - 1)
+        s = np.where(summing & has_dx, sum_dx + dx, sum_dx)
+        a = np.where(k == 2 * n - 1, s / n, adx)
+        a = np.where((k > 2 * n - 1) & has_dx, ((adx * (n - 1)) + dx) / n, a)
+
+        plus_out[:, t] = np.where(smoothing, plus_di, np.nan)
+        minus_out[:, t] = np.where(smoothing, minus_di, np.nan)
+        adx_out[:, t] = np.where(k >= 2 * n - 1, a, np.nan)
+
+        plus_dm = np.where(active, p, plus_dm)
+        minus_dm = np.where(active, m, minus_dm)
+        tr = np.where(active, r, tr)
+        sum_dx = np.where(active, s, sum_dx)
+        adx = np.where(active, a, adx)
+    return adx_out, plus_out, minus_out
+
+
+def macd(close, bar_index, fast=12, slow=26, signal=9, fast_ema=None, slow_ema=None):
+    if slow < fast:
+        fast, slow = slow, fast
+    if slow_ema is None:
+        slow_ema = ema(close, bar_index, slow)
+    if fast_ema is None:
+        fast_ema = ema(close, bar_index, fast, skip=slow - fast)
+    line = fast_ema - slow_ema
+    signal_line = ema(line, bar_index - (slow - 1), signal)
+    hidden = bar_index < slow - 1 + signal - 1
+    line[hidden] = np.nan
+    signal_line[hidden] = np.nan
+    return line, signal_line, line - signal_line
+
+
+def bbands(close, period=20, nbdevup=2.0, nbdevdn=2.0, middle=None):
+    if middle is None:
+        middle = sma(close, period)
+    mean2 = _rolling_sum(close * close, period) / period
+    mean2 -= middle * middle
+    stddev = np.where(mean2 < _EPSILON, 0.0, np.sqrt(np.where(mean2 < _EPSILON, 0.0, mean2)))
+    stddev[np.isnan(middle)] = np.nan
+    return middle + stddev * nbdevup, middle, middle - stddev * nbdevdn
+
+
+def stoch(high, low, close, bar_index, fastk_period=14, slowk_period=3, slowd_period=3):
+    highest = np.full(close.shape, np.nan)
+    lowest = np.full(close.shape, np.nan)
+    if close.shape[1] >= fastk_period:
+        highest[:, fastk_period - 1:] = sliding_window_view(high, fastk_period, axis=1).max(axis=-1)
+        lowest[:, fastk_period - 1:] = sliding_window_view(low, fastk_period, axis=1).min(axis=-1)
+    diff = (highest - lowest) / 100.0
+    zero = diff == 0.0
+    fastk = np.where(zero, 0.0, (close - lowest) / np.where(zero, 1.0, diff))
+    slowk = sma(fastk, slowk_period)
+    slowd = sma(slowk, slowd_period)
+    hidden = bar_index < fastk_period - 1 + slowk_period - 1 + slowd_period - 1
+    slowk[hidden] = np.nan
+    slowd[hidden] = np.nan
+    return slowk, slowd
+
+
+def obv(close, volume, bar_index):
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+    step = np.sign(np.where(bar_index >= 1, close - prev_close, 0.0)) * volume
+    step = np.where(bar_index == 0, volume, step)
+    out = np.cumsum(np.where(bar_index >= 0, step, 0.0), axis=1)
+    out[bar_index < 0] = np.nan
+    return out
+
+
+def register_default_nodes(graph):
+    """Register the analytics-table indicators (on IndicatorPanel inputs) with a graph"""
+    graph.add('true_range', lambda p: true_range(p.high, p.low, p.close))
+    graph.add('ema_5', lambda p, period: ema(p.close, p.bar_index, period), period=5)
+    graph.add('ema_20', lambda p, period: ema(p.close, p.bar_index, period), period=20)
+    graph.add('sma_20', lambda p, period: sma(p.close, period), period=20)
+    graph.add('sma_50', lambda p, period: sma(p.close, period), period=50)
+    graph.add('sma_100', lambda p, period: sma(p.close, period), period=100)
+    graph.add('rsi', lambda p, period: rsi(p.close, p.bar_index, period), period=14)
+    graph.add('atr', lambda p, tr, period: atr(tr, p.bar_index, period), ('true_range',), period=14)
+    graph.add('dmi', lambda p, tr, period: dmi(p.high, p.low, p.close, p.bar_index, period, tr),
+              ('true_range',), period=14)
+    graph.add('adx', lambda p, values: values[0], ('dmi',))
+    graph.add('plus_di', lambda p, values: values[1], ('dmi',))
+    graph.add('minus_di', lambda p, values: values[2], ('dmi',))
+    # MACD's fast EMA is seeded at the slow EMA's lookback (slow - fast bars late)
+    graph.add('macd_fast_ema', lambda p, period, skip: ema(p.close, p.bar_index, period, skip),
+              period=12, skip=14)
+    graph.add('macd_slow_ema', lambda p, period: ema(p.close, p.bar_index, period), period=26)
+    graph.add('macd_lines', lambda p, fast_ema, slow_ema, fast, slow, signal: macd(
+        p.close, p.bar_index, fast, slow, signal, fast_ema, slow_ema),
+        ('macd_fast_ema', 'macd_slow_ema'), fast=12, slow=26, signal=9)
+    graph.add('macd', lambda p, values: values[0], ('macd_lines',))
+    graph.add('macd_signal', lambda p, values: values[1], ('macd_lines',))
+    graph.add('macd_hist', lambda p, values: values[2], ('macd_lines',))
+    graph.add('bbands', lambda p, middle, period, nbdevup, nbdevdn: bbands(
+        p.close, period, nbdevup, nbdevdn, middle), ('sma_20',), period=20, nbdevup=2.0, nbdevdn=2.0)
+    graph.add('bb_upper', lambda p, values: values[0], ('bbands',))
+    graph.add('bb_middle', lambda p, values: values[1], ('bbands',))
+    graph.add('bb_lower', lambda p, values: values[2], ('bbands',))
+    graph.add('stoch', lambda p, fastk_period, slowk_period, slowd_period: stoch(
+        p.high, p.low, p.close, p.bar_index, fastk_period, slowk_period, slowd_period),
+        fastk_period=14, slowk_period=3, slowd_period=3)
+    graph.add('slowk', lambda p, values: values[0], ('stoch',))
+    graph.add('slowd', lambda p, values: values[1], ('stoch',))
+    graph.add('obv', lambda p: obv(p.close, p.volume, p.bar_index))
+
+
+# Indicator columns returned by compute_indicators (besides ts and close)
+INDICATOR_KEYS = ('ema_5', 'ema_20', 'sma_50', 'sma_100', 'rsi', 'adx', 'plus_di', 'minus_di',
+                  'macd', 'macd_signal', 'macd_hist', 'bb_upper', 'bb_middle', 'bb_lower',
+                  'slowk', 'slowd', 'atr', 'obv')
+
+
+def compute_indicators(panel, graph=None):
+    """
+    Every analytics-table indicator for the whole panel, as a dict of
+    (symbols x bars) arrays keyed like indicator_engine snapshots.
+    Values come from the indicator graph, so shared intermediates are
+    computed once and an unchanged panel is not recomputed at all.
+    """
+    graph = graph or IndicatorGraph.get_instance()
+    get = graph.context(tuple(panel.symbols), panel.last_bar_key(), panel)
+    values = {'ts': panel.ts, 'close': panel.close}
+    # Silence NaN/zero warnings from the padding; those cells are masked anyway
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for key in INDICATOR_KEYS:
+            values[key] = get(key)
+    return values
+
+
+def generate_signals(values, bar_index):
+    """
+    Vectorized indicator_engine.generate_signal: the same votes for every
+    symbol at its latest bar. Returns a dict of 1-D arrays, with 'signal'
+    holding SIGNAL_BUY / SIGNAL_HOLD / SIGNAL_SELL codes.
+    """
+    def latest(key):
+        return values[key][:, -1]
+
+    def back(key, offset):
+        # Value `offset` bars before the latest one, and whether it exists
+        if offset >= bar_index.shape[1]:
+            return np.zeros(bar_index.shape[0]), np.zeros(bar_index.shape[0], dtype=bool)
+        return values[key][:, -1 - offset], bar_index[:, -1 - offset] >= 0
+
+    current_price = latest('close')
+    ma_5, ma_20, ma_50 = latest('ema_5'), latest('ema_20'), latest('sma_50')
+    rsi_now, adx_now = latest('rsi'), latest('adx')
+    macd_now, macd_signal, macd_hist = latest('macd'), latest('macd_signal'), latest('macd_hist')
+    slowk, slowd = latest('slowk'), latest('slowd')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ema_20_prev, has_prev = back('ema_20', 5)
+        ma_20_slope = np.where(has_prev, (ma_20 - ema_20_prev) / 5, 0.0)
+        trend_up = latest('plus_di') > latest('minus_di')
+
+        hist_prev, has_prev = back('macd_hist', 1)
+        hist_momentum = np.where(has_prev, macd_hist - hist_prev, 0.0)
+
+        band_width = latest('bb_upper') - latest('bb_lower')
+        bb_percent = np.where(band_width > 0,
+                              (current_price - latest('bb_lower')) / band_width * 100, 50.0)
+
+        obv_prev, has_obv = back('obv', 19)
+        obv_up = has_obv & (latest('obv') > obv_prev)
+        obv_down = has_obv & ~(latest('obv') > obv_prev)
+
+        votes = [
+            # Price vs Moving Averages analysis
+            ((current_price > ma_20) & (current_price > ma_50),
+             (current_price < ma_20) & (current_price < ma_50)),
+            # Moving Average crossovers and slopes
+            ((ma_5 > ma_20) & (ma_20_slope > 0), (ma_5 < ma_20) & (ma_20_slope < 0)),
+            # RSI signals
+            (rsi_now < 30, rsi_now > 70),
+            # ADX trend strength confirmation
+            ((adx_now > 25) & trend_up, (adx_now > 25) & ~trend_up),
+            # MACD signals
+            ((macd_now > macd_signal) & (macd_hist > 0), (macd_now < macd_signal) & (macd_hist < 0)),
+            # MACD histogram momentum
+            ((hist_momentum > 0) & (macd_hist > 0), (hist_momentum < 0) & (macd_hist < 0)),
+            # Bollinger Band signals
+            (bb_percent < 10, bb_percent > 90),
+            # Stochastic signals
+            ((slowk < 20) & (slowd < 20), (slowk > 80) & (slowd > 80)),
+            # Volume confirmation - only use if we have a valid trend
+            (obv_up & (current_price > ma_20), obv_down & (current_price < ma_20)),
+        ]
+
+    buy_signals = np.zeros(len(current_price), dtype=np.int64)
+    sell_signals = np.zeros(len(current_price), dtype=np.int64)
+    for buy, sell in votes:
+        # elif semantics: a rule never votes both ways
+        buy_signals += buy
+        sell_signals += sell & ~buy
+
+    signal_difference = buy_signals - sell_signals
+    signal = np.full(len(current_price), SIGNAL_HOLD, dtype=np.int64)
+    signal[signal_difference >= 2] = SIGNAL_BUY
+    signal[signal_difference <= -2] = SIGNAL_SELL
+
+    return {
+        'signal': signal,
+        'buy_signals': buy_signals,
+        'sell_signals': sell_signals,
+        'trend_up': trend_up,
+        'ma_20_slope': ma_20_slope,
+        'hist_momentum': hist_momentum,
+        'bb_percent': bb_percent,
+        'obv_up': obv_up,
+        'obv_down': obv_down,
+    }
+
+
+def score_panel(panel, graph=None):
+    """Indicators and votes for the latest bar of every symbol in the panel"""
+    values = compute_indicators(panel, graph)
+    votes = generate_signals(values, panel.bar_index)
+    return values, votes
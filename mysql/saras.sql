@@ -116,6 +116,14 @@ CREATE TABLE admin_reports (
 );
 SELECT * FROM admin_reports;
 
+-- One report row per user; AdminReportsSync and create_user rely on it
+ALTER TABLE admin_reports ADD UNIQUE INDEX uq_admin_reports_user_id (user_id);
+
+-- Sort / prefix-search indexes for the admin dashboard's paged tables
+ALTER TABLE admin_reports ADD INDEX idx_admin_reports_user_name (user_name);
+ALTER TABLE admin_reports ADD INDEX idx_admin_reports_email (email);
+ALTER TABLE admin_reports ADD INDEX idx_admin_reports_report_date (report_date);
+
 -- Add index for better performance
 ALTER TABLE user_reports ADD INDEX idx_user_id (user_id);
 ALTER TABLE user_reports ADD INDEX idx_report_date (report_date);
@@ -140,4 +148,35 @@ VALUES ('admin', 'admin@sarasfintech.com', 'admin123');
 -- Drop the tables you don't want
 DROP TABLE IF EXISTS analysis_notes;
 DROP TABLE IF EXISTS stock;
-DROP TABLE IF EXISTS user_dashboard_settings;
\ No newline at end of file
+DROP TABLE IF EXISTS user_dashboard_settings;
+
+-- Time series: every quote the app fetches (stock only keeps the latest one)
+-- Partitioned by day so retention is a cheap DROP PARTITION;
+-- tick_maintenance.py adds the daily partitions ahead of time
+CREATE TABLE stock_ticks (
+    symbol VARCHAR(20) NOT NULL,
+    ts DATETIME(3) NOT NULL,
+    price DECIMAL(12, 4) NOT NULL,
+    volume BIGINT,
+    PRIMARY KEY (symbol, ts)
+)
+PARTITION BY RANGE COLUMNS (ts) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- OHLCV bars downsampled from stock_ticks ('1m', '5m', '1h', ...)
+CREATE TABLE stock_bars (
+    symbol VARCHAR(20) NOT NULL,
+    bar_interval VARCHAR(8) NOT NULL,
+    ts DATETIME NOT NULL,
+    open_price DECIMAL(12, 4),
+    high_price DECIMAL(12, 4),
+    low_price DECIMAL(12, 4),
+    close_price DECIMAL(12, 4),
+    volume BIGINT,
+    tick_count INT,
+    PRIMARY KEY (symbol, bar_interval, ts)
+)
+PARTITION BY RANGE COLUMNS (ts) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
@@ -0,0 +1,132 @@
+-- SQLite version of saras.sql, used by sqlite_manager.py.
+-- Same tables and columns; ENUMs become CHECK constraints and the
+-- stock_ticks / stock_bars partitions are replaced by plain indexes.
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS user (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_name VARCHAR(50) NOT NULL UNIQUE,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    last_login DATETIME,
+    account_status VARCHAR(10) DEFAULT 'active'
+        CHECK (account_status IN ('active', 'suspended', 'inactive'))
+);
+
+CREATE TABLE IF NOT EXISTS admin (
+    admin_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    admin_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+    last_login DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol VARCHAR(20) NOT NULL UNIQUE,
+    current_price DECIMAL(10, 2),
+    open_price DECIMAL(10, 2),
+    high_price DECIMAL(10, 2),
+    low_price DECIMAL(10, 2),
+    volume BIGINT,
+    change_percentage DECIMAL(5, 2),
+    last_updated DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS watchlist (
+    watchlist_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    stock_symbol VARCHAR(20) NOT NULL,
+    date_added DATETIME DEFAULT (datetime('now', 'localtime')),
+    notes TEXT,
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE,
+    UNIQUE (user_id, stock_symbol)
+);
+
+CREATE TABLE IF NOT EXISTS portfolio (
+    portfolio_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    stock_symbol VARCHAR(20) NOT NULL,
+    quantity INT NOT NULL,
+    purchase_price DECIMAL(10, 2) NOT NULL,
+    purchase_date DATE NOT NULL,
+    notes TEXT,
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS analytics_preferences (
+    preference_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    stock_symbol VARCHAR(20) NOT NULL,
+    date_added DATETIME DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE,
+    UNIQUE (user_id, stock_symbol)
+);
+
+CREATE TABLE IF NOT EXISTS access_logs (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT,
+    admin_id INT,
+    action_type VARCHAR(50),
+    timestamp DATETIME DEFAULT (datetime('now', 'localtime')),
+    ip_address VARCHAR(45),
+    status VARCHAR(20),
+    details TEXT,
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE SET NULL,
+    FOREIGN KEY (admin_id) REFERENCES admin(admin_id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS company_reports (
+    report_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stock_symbol VARCHAR(20) NOT NULL UNIQUE,
+    company_name VARCHAR(100) NOT NULL,
+    current_price DECIMAL(10, 2),
+    market_cap DECIMAL(20, 2),
+    report_date DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS admin_reports (
+    report_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    user_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL,
+    report_date DATETIME DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS stock_ticks (
+    symbol VARCHAR(20) NOT NULL,
+    ts DATETIME NOT NULL,
+    price DECIMAL(12, 4) NOT NULL,
+    volume BIGINT,
+    PRIMARY KEY (symbol, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stock_bars (
+    symbol VARCHAR(20) NOT NULL,
+    bar_interval VARCHAR(8) NOT NULL,
+    ts DATETIME NOT NULL,
+    open_price DECIMAL(12, 4),
+    high_price DECIMAL(12, 4),
+    low_price DECIMAL(12, 4),
+    close_price DECIMAL(12, 4),
+    volume BIGINT,
+    tick_count INT,
+    PRIMARY KEY (symbol, bar_interval, ts)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_watchlist_user ON watchlist (user_id);
+CREATE INDEX IF NOT EXISTS idx_portfolio_user ON portfolio (user_id);
+CREATE INDEX IF NOT EXISTS idx_analytics_user ON analytics_preferences (user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_admin_reports_user_id ON admin_reports (user_id);
+CREATE INDEX IF NOT EXISTS idx_admin_reports_user_name ON admin_reports (user_name);
+CREATE INDEX IF NOT EXISTS idx_admin_reports_email ON admin_reports (email);
+CREATE INDEX IF NOT EXISTS idx_admin_reports_report_date ON admin_reports (report_date);
+CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp ON access_logs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_ticks_ts ON stock_ticks (ts);
+CREATE INDEX IF NOT EXISTS idx_bars_ts ON stock_bars (ts);
+
+INSERT OR IGNORE INTO admin (admin_name, email, password)
+VALUES ('admin', 'admin@sarasfintech.com', 'admin123');
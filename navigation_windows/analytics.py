@@ -13,6 +13,8 @@ from PyQt6.QtGui import QFont, QColor
 from PyQt6.QtCore import pyqtSignal, QTimer
 import sys
 from database import DatabaseConnection
+from analytics_jobs import AnalyticsJobRunner
+from rate_limiter import PRIORITY_VISIBLE, PRIORITY_NORMAL
 from navigation_windows import BaseNavigationWindow
 
 class AnalyticsWindow(BaseNavigationWindow):
@@ -229,6 +231,9 @@ class AnalyticsWindow(BaseNavigationWindow):
         """)
         self.stocks_list = []  # Initialize the stocks list
 
+        # Downloads and indicator work run in a background process pool
+        self.refresh_jobs = AnalyticsJobRunner()
+
         # Add the database setup:
         self.setup_database()
         # Then add a new method to load preferences from database:
@@ -314,6 +319,9 @@ class AnalyticsWindow(BaseNavigationWindow):
             self.stocks_table.removeRow(row)
             self.remove_buttons_table.removeRow(row)
 
+            # The symbol list changed - cancel the refresh, resubmitting what was left
+            self.restart_background_refresh(removed=[symbol])
+
             # Show status message - your existing code
             self.statusBar().showMessage(f'{symbol} removed from analytics', 3000)
         except Exception as e:
@@ -340,349 +348,165 @@ class AnalyticsWindow(BaseNavigationWindow):
             # Add each stock to the table
             self.stocks_table.setRowCount(0)  # Clear existing rows
             for symbol in self.stocks_list:
-                self.add_stock(symbol)
+                self.add_stock(symbol, refresh=False)
+
+            # One background refresh for the whole list
+            self.start_background_refresh()
 
         except Exception as e:
             print(f"❌ Error loading analytics preferences: {e}")
 
-    def enhanced_refresh_stock_data(self):
-        """Enhanced version of refresh_stock_data with better feedback"""
-        self.statusBar().showMessage('Refreshing technical data...')
-
-        # Count total rows for progress reporting
-        total_rows = self.stocks_table.rowCount()
-        if total_rows == 0:
-            self.statusBar().showMessage('No stocks to refresh', 3000)
-            return
-
-        success_count = 0
-        error_count = 0
-
-        for row in range(total_rows):
-            try:
-                symbol = self.stocks_table.item(row, 0).text()
-                self.statusBar().showMessage(f'Refreshing {symbol} ({row + 1}/{total_rows})...')
-
-                # Call our enhanced version instead
-                debug_calculate_technical_indicators(self, symbol, row)
-                success_count += 1
-
-                # Add delay to avoid rate limiting
-                from PyQt6.QtCore import QTimer
-                QTimer.singleShot(3000, lambda: None)  # 3 second delay between stocks
-
-            except Exception as e:
-                print(f"Error refreshing data for row {row}: {str(e)}")
-                error_count += 1
-                # Set placeholder values if no data returned
-                for col in range(1, 8):
-                    self.stocks_table.setItem(row, col, QTableWidgetItem("--"))
-
-        if error_count > 0:
-            self.statusBar().showMessage(f'Technical data updated: {success_count} succeeded, {error_count} failed',
-                                         5000)
-        else:
-            self.statusBar().showMessage('Technical data updated successfully', 3000)
-
-    def calculate_technical_indicators(self, symbol, row):
-        try:
-            # Ensure proper NSE stock format
-            if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
-                symbol = f"{symbol}.NS"
-
-            self.statusBar().showMessage(f'Fetching data for {symbol}...')
+    @staticmethod
+    def normalize_symbol(symbol):
+        """Ensure proper NSE stock format"""
+        if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
+            symbol = f"{symbol}.NS"
+        return symbol
 
-            # Download stock data with explicit parameters
-            stock_data = yf.download(
-                symbol,
-                period="1y",  # Get one year of data
-                interval="1d",  # Daily data
-                auto_adjust=True,  # Auto-adjust for splits
-                progress=False
-            )
-
-            if stock_data.empty:
-                print(f"No data available for {symbol}")
-                self.statusBar().showMessage(f"No data available for {symbol}", 5000)
-
-                # Set placeholder values
-                for col in range(1, 9):
-                    self.stocks_table.setItem(row, col, QTableWidgetItem("No Data"))
-                return
-
-            # Make sure we have enough data
-            if len(stock_data) < 100:
-                print(f"Insufficient data points for {symbol}: only {len(stock_data)} days")
-                self.statusBar().showMessage(f"Insufficient history for {symbol}", 5000)
-
-                # Still show current price but mark indicators as insufficient
-                if len(stock_data) > 0:
-                    current_price = stock_data['Close'].iloc[-1]
-                    self.stocks_table.setItem(row, 1, QTableWidgetItem(f"₹{current_price:.2f}"))
+    def find_symbol_row(self, symbol):
+        """Row currently showing symbol, or -1"""
+        for row in range(self.stocks_table.rowCount()):
+            item = self.stocks_table.item(row, 0)
+            if item is not None and self.normalize_symbol(item.text()) == symbol:
+                return row
+        return -1
 
-                for col in range(2, 9):
-                    self.stocks_table.setItem(row, col, QTableWidgetItem("Insuf. Data"))
+    def start_background_refresh(self, symbols=None):
+        """
+        Refresh rows on the process pool (visible rows first). Results are
+        written to the table as each chunk of symbols completes.
+        """
+        total_rows = self.stocks_table.rowCount()
+        if symbols is None:
+            if total_rows == 0:
+                self.statusBar().showMessage('No stocks to refresh', 3000)
                 return
+            visible_rows = self.visible_rows()
+            ordered_rows = visible_rows + [r for r in range(total_rows) if r not in visible_rows]
+            symbols = [self.normalize_symbol(self.stocks_table.item(row, 0).text())
+                       for row in ordered_rows if self.stocks_table.item(row, 0) is not None]
+        else:
+            visible_rows = self.visible_rows()
+            symbols = [self.normalize_symbol(symbol) for symbol in symbols]
 
-            # Extract price data as numpy arrays
-            close_prices = stock_data['Close'].values
-            high_prices = stock_data['High'].values
-            low_prices = stock_data['Low'].values
-
-            # Ensure we have 1D arrays for TA-Lib
-            if len(close_prices.shape) > 1:
-                close_prices = close_prices.flatten()
-                high_prices = high_prices.flatten()
-                low_prices = low_prices.flatten()
-
-            # Convert to float64 and handle NaN values
-            close_prices = np.array(close_prices, dtype=np.float64)
-            high_prices = np.array(high_prices, dtype=np.float64)
-            low_prices = np.array(low_prices, dtype=np.float64)
-            close_prices = np.nan_to_num(close_prices)
-            high_prices = np.nan_to_num(high_prices)
-            low_prices = np.nan_to_num(low_prices)
-
-            # Get current price
-            current_price = close_prices[-1]
-
-            # Calculate indicators with individual try/except blocks for each indicator
-            try:
-                # Moving Averages with exponential option for shorter periods
-                ma_5 = talib.EMA(close_prices, timeperiod=5)[-1]
-                ma_20 = talib.EMA(close_prices, timeperiod=20)[-1]
-                ma_50 = talib.SMA(close_prices, timeperiod=50)[-1]
-                ma_100 = talib.SMA(close_prices, timeperiod=100)[-1]
-
-                # Moving Average slopes (to determine trend direction)
-                ma_20_slope = (ma_20 - talib.EMA(close_prices, timeperiod=20)[-6]) / 5  # 5-day slope
-                ma_50_slope = (ma_50 - talib.SMA(close_prices, timeperiod=50)[-6]) / 5  # 5-day slope
-            except Exception as e:
-                print(f"Error calculating moving averages: {str(e)}")
-                ma_5, ma_20, ma_50, ma_100 = 0, 0, 0, 0
-                ma_20_slope, ma_50_slope = 0, 0
-
-            try:
-                # RSI with additional lookback periods
-                rsi = talib.RSI(close_prices, timeperiod=14)[-1]
-                rsi_5d = talib.RSI(close_prices, timeperiod=14)[-5] if len(close_prices) > 20 else 50
-                rsi_trend = "Up" if rsi > rsi_5d else "Down"
-            except Exception as e:
-                print(f"Error calculating RSI: {str(e)}")
-                rsi, rsi_5d = 50, 50
-                rsi_trend = "Unknown"
-
-            try:
-                # ADX - Direction and strength
-                adx = talib.ADX(high_prices, low_prices, close_prices, timeperiod=14)[-1]
-                plus_di = talib.PLUS_DI(high_prices, low_prices, close_prices, timeperiod=14)[-1]
-                minus_di = talib.MINUS_DI(high_prices, low_prices, close_prices, timeperiod=14)[-1]
-
-                # Trend direction based on DI
-                trend_direction = "Up" if plus_di > minus_di else "Down"
-            except Exception as e:
-                print(f"Error calculating ADX: {str(e)}")
-                adx, plus_di, minus_di = 0, 0, 0
-                trend_direction = "Unknown"
-
-            try:
-                # MACD with histogram momentum
-                macd, macd_signal, macd_hist = talib.MACD(
-                    close_prices, fastperiod=12, slowperiod=26, signalperiod=9
-                )
-
-                # Check if MACD histogram is accelerating/decelerating
-                hist_momentum = macd_hist[-1] - macd_hist[-2] if len(macd_hist) > 2 else 0
-            except Exception as e:
-                print(f"Error calculating MACD: {str(e)}")
-                macd = np.array([0])
-                macd_signal = np.array([0])
-                macd_hist = np.array([0, 0])
-                hist_momentum = 0
-
-            try:
-                # Bollinger Bands with width calculation
-                upper, middle, lower = talib.BBANDS(
-                    close_prices, timeperiod=20, nbdevup=2, nbdevdn=2, matype=0
-                )
-
-                # Calculate BB width and %B (position within bands)
-                bb_width = (upper[-1] - lower[-1]) / middle[-1] * 100  # As percentage
-                bb_percent = (current_price - lower[-1]) / (upper[-1] - lower[-1]) * 100 if (upper[-1] - lower[
-                    -1]) > 0 else 50
-            except Exception as e:
-                print(f"Error calculating Bollinger Bands: {str(e)}")
-                upper = np.array([current_price * 1.1])
-                middle = np.array([current_price])
-                lower = np.array([current_price * 0.9])
-                bb_width = 10
-                bb_percent = 50
+        if not symbols:
+            return
 
-            try:
-                # Stochastic oscillator
-                slowk, slowd = talib.STOCH(
-                    high_prices, low_prices, close_prices,
-                    fastk_period=14, slowk_period=3, slowk_matype=0,
-                    slowd_period=3, slowd_matype=0
-                )
-            except Exception as e:
-                print(f"Error calculating Stochastic: {str(e)}")
-                slowk = np.array([50])
-                slowd = np.array([50])
+        visible = {self.normalize_symbol(self.stocks_table.item(row, 0).text())
+                   for row in visible_rows if self.stocks_table.item(row, 0) is not None}
+        priorities = [PRIORITY_VISIBLE if symbol in visible else PRIORITY_NORMAL for symbol in symbols]
+
+        job = self.refresh_jobs.start(symbols, priorities)
+        job.row_ready.connect(lambda result, job=job: self.on_refresh_row(job, result))
+        job.progress.connect(lambda done, total, job=job: self.on_refresh_progress(job, done, total))
+        job.finished.connect(
+            lambda succeeded, failed, cancelled, job=job: self.on_refresh_finished(job, succeeded, failed, cancelled))
+        job.start()
+        self.statusBar().showMessage(f'Refreshing technical data (0/{len(symbols)})...')
+
+    def restart_background_refresh(self, added=(), removed=()):
+        """Cancel the running refresh and resubmit its unfinished symbols with the list changes"""
+        job = self.refresh_jobs.cancel() if self.refresh_jobs.is_running() else None
+        symbols = job.pending_symbols() if job is not None else []
+        removed = {self.normalize_symbol(symbol) for symbol in removed}
+        symbols = [symbol for symbol in symbols if symbol not in removed]
+        for symbol in added:
+            symbol = self.normalize_symbol(symbol)
+            if symbol not in symbols:
+                symbols.append(symbol)
+        if symbols:
+            self.start_background_refresh(symbols)
+        elif job is not None:
+            self.statusBar().showMessage('Technical data refresh cancelled', 3000)
+
+    def on_refresh_row(self, job, result):
+        """Write one symbol's indicators into its row"""
+        if job.cancelled:
+            return
+        row = self.find_symbol_row(result['symbol'])
+        if row < 0:
+            return
 
-            try:
-                # ATR for volatility assessment
-                atr = talib.ATR(high_prices, low_prices, close_prices, timeperiod=14)[-1]
-                atr_percent = (atr / current_price) * 100  # ATR as percentage of price
-            except Exception as e:
-                print(f"Error calculating ATR: {str(e)}")
-                atr = 0
-                atr_percent = 0
-
-            # Skip OBV calculation if it fails - it was causing the main issue
-            obv_trend = "Unknown"
-            try:
-                # Get volume data and ensure it's properly formatted
-                if 'Volume' in stock_data.columns:
-                    # Extract volume data and ensure it's the same length as close_prices
-                    volume = stock_data['Volume'].values
-
-                    # Convert to float64 and handle NaNs - crucial for TA-Lib
-                    volume = np.array(volume, dtype=np.float64)
-                    volume = np.nan_to_num(volume)
-
-                    # Verify dimensions match
-                    if len(volume) == len(close_prices):
-                        # OBV calculation
-                        obv = talib.OBV(close_prices, volume)
-                        # Only proceed if we have enough data
-                        if len(obv) > 20:
-                            obv_trend = "Up" if obv[-1] > obv[-20] else "Down"
-            except Exception as e:
-                print(f"Error calculating OBV (skipping): {str(e)}")
-                # We'll keep the default "Unknown" trend
-
-            # Integration of all technical indicators for buy/sell signal
-            buy_signals = 0
-            sell_signals = 0
-
-            # Price vs Moving Averages analysis
-            if current_price > ma_20 and current_price > ma_50:
-                buy_signals += 1
-            elif current_price < ma_20 and current_price < ma_50:
-                sell_signals += 1
+        bar_count = result.get('bar_count', 0)
+        if bar_count == 0:
+            text = "Error" if result.get('error') else "No Data"
+            for col in range(1, 9):
+                self.stocks_table.setItem(row, col, QTableWidgetItem(text))
+            return
 
-            # Moving Average crossovers and slopes
-            if ma_5 > ma_20 and ma_20_slope > 0:
-                buy_signals += 1
-            elif ma_5 < ma_20 and ma_20_slope < 0:
-                sell_signals += 1
+        current_price = result['close']
+        if bar_count < 100:
+            # Still show current price but mark indicators as insufficient
+            self.stocks_table.setItem(row, 1, QTableWidgetItem(f"₹{current_price:.2f}"))
+            for col in range(2, 9):
+                self.stocks_table.setItem(row, col, QTableWidgetItem("Insuf. Data"))
+            return
 
-            # RSI signals
-            if rsi < 30:
-                buy_signals += 1
-            elif rsi > 70:
-                sell_signals += 1
+        self.show_indicator_row(row, current_price, result['ema_5'], result['ema_20'],
+                                result['sma_50'], result['sma_100'], result['rsi'], result['adx'],
+                                result['trend_direction'], result['signal'])
 
-            # ADX trend strength confirmation
-            if adx > 25:
-                if trend_direction == "Up":
-                    buy_signals += 1
-                elif trend_direction == "Down":
-                    sell_signals += 1
-
-            # MACD signals
-            if len(macd) > 1 and len(macd_signal) > 1:
-                if macd[-1] > macd_signal[-1] and macd_hist[-1] > 0:
-                    buy_signals += 1
-                elif macd[-1] < macd_signal[-1] and macd_hist[-1] < 0:
-                    sell_signals += 1
-
-            # MACD histogram momentum
-            if hist_momentum > 0 and macd_hist[-1] > 0:
-                buy_signals += 1
-            elif hist_momentum < 0 and macd_hist[-1] < 0:
-                sell_signals += 1
+    def on_refresh_progress(self, job, done, total):
+        if not job.cancelled:
+            self.statusBar().showMessage(f'Refreshing technical data ({done}/{total})...')
 
-            # Bollinger Band signals
-            if bb_percent < 10:  # Price near lower band
-                buy_signals += 1
-            elif bb_percent > 90:  # Price near upper band
-                sell_signals += 1
+    def on_refresh_finished(self, job, succeeded, failed, cancelled):
+        if cancelled or job.cancelled:
+            return
+        if failed > 0:
+            self.statusBar().showMessage(f'Technical data updated: {succeeded} succeeded, {failed} failed',
+                                         5000)
+        else:
+            self.statusBar().showMessage('Technical data updated successfully', 3000)
 
-            # Stochastic signals
-            if len(slowk) > 0 and len(slowd) > 0:
-                if slowk[-1] < 20 and slowd[-1] < 20:
-                    buy_signals += 1
-                elif slowk[-1] > 80 and slowd[-1] > 80:
-                    sell_signals += 1
-
-            # Volume confirmation - only use if we have a valid trend
-            if obv_trend != "Unknown":
-                if obv_trend == "Up" and current_price > ma_20:
-                    buy_signals += 1
-                elif obv_trend == "Down" and current_price < ma_20:
-                    sell_signals += 1
-
-            # Determine signal based on overall technical picture
-            signal_difference = buy_signals - sell_signals
-
-            if signal_difference >= 2:
-                signal = "BUY"
-            elif signal_difference <= -2:
-                signal = "SELL"
+    def visible_rows(self):
+        """Rows of the stocks table currently inside the viewport"""
+        first_row = self.stocks_table.rowAt(0)
+        last_row = self.stocks_table.rowAt(self.stocks_table.viewport().height() - 1)
+        if first_row < 0:
+            first_row = 0
+        if last_row < 0:
+            last_row = self.stocks_table.rowCount() - 1
+        return list(range(first_row, last_row + 1))
+
+    def show_indicator_row(self, row, current_price, ma_5, ma_20, ma_50, ma_100,
+                           rsi, adx, trend_direction, signal):
+        """Fill one stocks_table row with indicator values and the signal"""
+        self.stocks_table.setItem(row, 1, QTableWidgetItem(f"₹{current_price:.2f}"))
+        self.stocks_table.setItem(row, 2, QTableWidgetItem(f"₹{ma_5:.2f}"))
+        self.stocks_table.setItem(row, 3, QTableWidgetItem(f"₹{ma_20:.2f}"))
+        self.stocks_table.setItem(row, 4, QTableWidgetItem(f"₹{ma_50:.2f}"))
+        self.stocks_table.setItem(row, 5, QTableWidgetItem(f"₹{ma_100:.2f}"))
+
+        # Color-code RSI values
+        rsi_item = QTableWidgetItem(f"{rsi:.2f}")
+        if rsi > 70:
+            rsi_item.setForeground(Qt.GlobalColor.red)  # Overbought
+        elif rsi < 30:
+            rsi_item.setForeground(Qt.GlobalColor.green)  # Oversold
+        self.stocks_table.setItem(row, 6, rsi_item)
+
+        # ADX with direction
+        adx_item = QTableWidgetItem(f"{adx:.2f}")
+        if adx > 25:
+            if trend_direction == "Up":
+                adx_item.setForeground(Qt.GlobalColor.green)  # Strong uptrend
             else:
-                signal = "HOLD"
-
-            # Update table with calculated values (only core indicators)
-            self.stocks_table.setItem(row, 1, QTableWidgetItem(f"₹{current_price:.2f}"))
-            self.stocks_table.setItem(row, 2, QTableWidgetItem(f"₹{ma_5:.2f}"))
-            self.stocks_table.setItem(row, 3, QTableWidgetItem(f"₹{ma_20:.2f}"))
-            self.stocks_table.setItem(row, 4, QTableWidgetItem(f"₹{ma_50:.2f}"))
-            self.stocks_table.setItem(row, 5, QTableWidgetItem(f"₹{ma_100:.2f}"))
-
-            # Color-code RSI values
-            rsi_item = QTableWidgetItem(f"{rsi:.2f}")
-            if rsi > 70:
-                rsi_item.setForeground(Qt.GlobalColor.red)  # Overbought
-            elif rsi < 30:
-                rsi_item.setForeground(Qt.GlobalColor.green)  # Oversold
-            self.stocks_table.setItem(row, 6, rsi_item)
-
-            # ADX with direction
-            adx_item = QTableWidgetItem(f"{adx:.2f}")
-            if adx > 25:
-                if trend_direction == "Up":
-                    adx_item.setForeground(Qt.GlobalColor.green)  # Strong uptrend
-                else:
-                    adx_item.setForeground(Qt.GlobalColor.red)  # Strong downtrend
-            self.stocks_table.setItem(row, 7, adx_item)
-
-            # Signal column
-            signal_item = QTableWidgetItem(signal)
-            if signal == "BUY":
-                signal_item.setForeground(Qt.GlobalColor.green)
-                signal_item.setFont(QFont('Arial', 9, QFont.Weight.Bold))
-            elif signal == "SELL":
-                signal_item.setForeground(Qt.GlobalColor.red)
-                signal_item.setFont(QFont('Arial', 9, QFont.Weight.Bold))
-            else:  # HOLD
-                signal_item.setForeground(Qt.GlobalColor.black)
-                signal_item.setFont(QFont('Arial', 9, QFont.Weight.Normal))
-            self.stocks_table.setItem(row, 8, signal_item)
-
-            # Show status message
-            self.statusBar().showMessage(f'Data updated for {symbol}', 3000)
-
-        except Exception as e:
-            print(f"Error calculating indicators for {symbol}: {str(e)}")
-            traceback.print_exc()
-            self.statusBar().showMessage(f'Error calculating indicators for {symbol}', 3000)
-
-            # Set error in cells but keep the stock in the table
-            self.stocks_table.setItem(row, 1, QTableWidgetItem("Error"))
-            for col in range(2, 9):
-                self.stocks_table.setItem(row, col, QTableWidgetItem("--"))
+                adx_item.setForeground(Qt.GlobalColor.red)  # Strong downtrend
+        self.stocks_table.setItem(row, 7, adx_item)
+
+        # Signal column
+        signal_item = QTableWidgetItem(signal)
+        if signal == "BUY":
+            signal_item.setForeground(Qt.GlobalColor.green)
+            signal_item.setFont(QFont('Arial', 9, QFont.Weight.Bold))
+        elif signal == "SELL":
+            signal_item.setForeground(Qt.GlobalColor.red)
+            signal_item.setFont(QFont('Arial', 9, QFont.Weight.Bold))
+        else:  # HOLD
+            signal_item.setForeground(Qt.GlobalColor.black)
+            signal_item.setFont(QFont('Arial', 9, QFont.Weight.Normal))
+        self.stocks_table.setItem(row, 8, signal_item)
 
     '''def calculate_technical_indicators(self, symbol, row):
         try:
@@ -1064,11 +888,7 @@ class AnalyticsWindow(BaseNavigationWindow):
                 return "HOLD"
         else:
             return "HOLD"'''
-     # Update the method in the class
-    def update_calculate_technical_indicators(self, symbol, row):
-        return calculate_technical_indicators(self, symbol, row)
-
-    def add_stock(self, symbol):
+    def add_stock(self, symbol, refresh=True):
         """Add a stock to the analytics with database integration"""
         # Check if stock already exists in the list (keep your existing check)
         for i in range(self.stocks_table.rowCount()):
@@ -1114,14 +934,10 @@ class AnalyticsWindow(BaseNavigationWindow):
             remove_btn.clicked.connect(lambda checked, r=row_position: self.remove_stock(r))
             self.remove_buttons_table.setCellWidget(row_position, 0, remove_btn)
 
-            # Calculate technical indicators for this stock with error handling
-            try:
-                self.calculate_technical_indicators(symbol, row_position)
-            except Exception as tech_error:
-                print(f"Warning: Could not calculate technical indicators for {symbol}: {tech_error}")
-                # Keep the stock in the table but show warning in status bar
-                self.statusBar().showMessage(
-                    f'Added {symbol}, but could not fetch technical data. Will retry on refresh.', 5000)
+            # Technical indicators are calculated in the background; the
+            # symbol list changed, so any running refresh is restarted with it
+            if refresh:
+                self.restart_background_refresh(added=[symbol])
 
             self.statusBar().showMessage(f'{symbol} added to analytics', 3000)
         except Exception as e:
@@ -1151,23 +967,11 @@ class AnalyticsWindow(BaseNavigationWindow):
             )
             return
 
-        self.statusBar().showMessage('Refreshing technical data...')
-
-        for row in range(self.stocks_table.rowCount()):
-            try:
-                symbol = self.stocks_table.item(row, 0).text()
-                # Call the debug version for better error handling
-                self.calculate_technical_indicators(symbol, row)
-            except Exception as e:
-                print(f"Error refreshing data for row {row}: {str(e)}")
-                # Set placeholder values if no data returned
-                for col in range(1, 8):
-                    self.stocks_table.setItem(row, col, QTableWidgetItem("--"))
-
-        self.statusBar().showMessage('Technical data updated', 3000)
+        self.start_background_refresh()
 
     def closeEvent(self, event):
         """Close database connection when window is closed"""
+        self.refresh_jobs.shutdown()
         self.close_database()
         super().closeEvent(event)
 
@@ -7,6 +7,10 @@ from PyQt6.QtGui import QFont, QColor
 import sqlite3
 from datetime import datetime, date
 import yfinance as yf
+import rate_limiter
+from rate_limiter import YFINANCE_HOST
+from quote_engine import QuoteEngine
+from quote_cache import QuoteCache
 from navigation_windows import BaseNavigationWindow
 
 
@@ -38,6 +42,9 @@ class PortfolioWindow(BaseNavigationWindow):
 
         self.setMinimumSize(1400, 900)
 
+        # Keep current prices in step with quotes fetched by any window
+        QuoteCache.get_instance().quote_updated.connect(self.on_quote_updated)
+
         # Load portfolio data from database
         self.load_portfolio_data()
 
@@ -505,17 +512,14 @@ class PortfolioWindow(BaseNavigationWindow):
     def get_current_price(self, symbol):
         """Get current price for a stock symbol"""
         try:
-            # First try to get price from main dashboard if available
-            if hasattr(self, 'parent') and hasattr(self.parent, 'stock_table'):
-                for row in range(self.parent.stock_table.rowCount()):
-                    if (self.parent.stock_table.item(row, 0) and
-                            self.parent.stock_table.item(row, 0).text() == symbol):
-                        price_text = self.parent.stock_table.item(row, 2).text()
-                        if price_text.startswith('₹'):
-                            price_text = price_text[1:]
-                        return float(price_text)
-
-            # If not found in dashboard, use yfinance as fallback
+            # Serve from the shared quote cache, fetching (and caching) when stale
+            try:
+                return QuoteEngine.get_instance().get_quote(symbol).current_price
+            except Exception as quote_error:
+                print(f"Quote lookup failed for {symbol}: {quote_error}")
+
+            # If the chart API has nothing, use yfinance as fallback
+            rate_limiter.acquire(YFINANCE_HOST)
             stock = yf.Ticker(symbol)
             history = stock.history(period="1d")
             if not history.empty:
@@ -527,6 +531,23 @@ class PortfolioWindow(BaseNavigationWindow):
             print(f"Error getting price for {symbol}: {str(e)}")
             return 0.00
 
+    def on_quote_updated(self, quote):
+        """Revalue holdings of a symbol when a newer quote arrives in the cache"""
+        changed = False
+        for stock in self.portfolio_data:
+            if stock['symbol'] != quote.symbol:
+                continue
+            stock['current_price'] = quote.current_price
+            stock['market_value'] = float(stock['quantity']) * quote.current_price
+            stock['profit_loss'] = stock['market_value'] - stock['total_investment']
+            stock['profit_loss_percent'] = (stock['profit_loss'] / stock['total_investment']) * 100 \
+                if stock['total_investment'] > 0 else 0
+            changed = True
+
+        if changed:
+            self.update_portfolio_table()
+            self.update_summary_section()
+
     def update_portfolio_table(self):
         """Update the portfolio table with current data"""
         self.portfolio_table.setRowCount(0)
@@ -4,6 +4,17 @@ import pandas as pd
 import openpyxl
 import numpy as np
 import yfinance as yf
+import rate_limiter
+from rate_limiter import PRIORITY_BACKGROUND, YFINANCE_HOST
+from quote_engine import QuoteEngine
+from quote_cache import QuoteCache
+from history_store import HistoryStore
+from chart_data_cache import ChartDataCache
+from chart_renderers import (aggregate_bars, bar_positions, draw_candlesticks, draw_volume, max_bars_for,
+                             ohlcv_arrays)
+from chart_interaction import ChartInteraction
+from downsampling import SeriesDownsampler, point_budget
+from frame_table_model import FrameTableModel
 from datetime import datetime, timedelta
 
 # Fix matplotlib backend - must be done before importing pyplot
@@ -13,8 +24,8 @@ matplotlib.use('QtAgg')
 import matplotlib.pyplot as plt
 
 # Now import PyQt6 related modules
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QComboBox, QLineEdit, QTableWidget, QTableWidgetItem,
+from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QComboBox, QLineEdit, QTableWidget, QTableWidgetItem, QTableView,
                              QFrame, QHeaderView, QSizePolicy, QFileDialog, QMessageBox,
                              QTabWidget, QScrollArea, QGridLayout, QSplitter, QDateEdit,
                              QCheckBox, QGroupBox, QRadioButton, QSpacerItem, QTextEdit)
@@ -107,6 +118,22 @@ class StockInfoCard(QFrame):
                 self.indicator.setStyleSheet('background-color: #ff1744; border-radius: 4px;')
 
 
+# Milliseconds of typing pause before the preview filter is applied
+FILTER_DELAY_MS = 250
+
+# Rows looked at when sizing the preview columns to their contents
+PREVIEW_SIZING_ROWS = 100
+
+
+def zoom_interval(span_days):
+    """Bar size for a visible span, matching the timeframe defaults of StockChart"""
+    if span_days <= 7:
+        return '5m'
+    if span_days <= 92:
+        return '1h'
+    return '1d'
+
+
 class StockChart(QFrame):
     """Widget for displaying stock charts with enhanced visualization"""
 
@@ -132,7 +159,7 @@ class StockChart(QFrame):
         self.chart_type = QComboBox()
         self.chart_type.addItems(['Line', 'Candlestick'])
         self.chart_type.setCurrentIndex(1)  # Default to candlestick
-        self.chart_type.currentIndexChanged.connect(self.update_chart)
+        self.chart_type.currentIndexChanged.connect(self.render_chart)
 
         # Timeframe selector
         self.timeframe = QComboBox()
@@ -160,28 +187,28 @@ class StockChart(QFrame):
         self.show_ma = QCheckBox("MAs")
         self.show_ma.setChecked(True)
         self.show_ma.setToolTip("Show Moving Averages (5, 10, 50, 100 periods)")
-        self.show_ma.stateChanged.connect(self.update_chart)
+        self.show_ma.stateChanged.connect(self.render_chart)
 
         self.show_volume = QCheckBox("Volume")
         self.show_volume.setChecked(True)
         self.show_volume.setToolTip("Show volume bars")
-        self.show_volume.stateChanged.connect(self.update_chart)
+        self.show_volume.stateChanged.connect(self.render_chart)
 
         self.show_grid = QCheckBox("Grid")
         self.show_grid.setChecked(True)
         self.show_grid.setToolTip("Show grid lines")
-        self.show_grid.stateChanged.connect(self.update_chart)
+        self.show_grid.stateChanged.connect(self.render_chart)
 
         # Theme selector
         theme_label = QLabel("Theme:")
         self.theme_selector = QComboBox()
         self.theme_selector.addItems(['Default', 'Dark', 'Light'])
         self.theme_selector.setCurrentIndex(0)
-        self.theme_selector.currentIndexChanged.connect(self.update_chart)
+        self.theme_selector.currentIndexChanged.connect(self.render_chart)
 
         # Add refresh button
         self.refresh_btn = QPushButton("Refresh")
-        self.refresh_btn.clicked.connect(self.update_chart)
+        self.refresh_btn.clicked.connect(self.reload_chart)
 
         # Add controls to layout
         controls_layout.addWidget(QLabel("Chart Type:"))
@@ -213,6 +240,14 @@ class StockChart(QFrame):
         # Initialize variables
         self.ticker_data = None
         self.ticker_symbol = None
+        # Period of the loaded data (None for a custom range), for the date axis
+        self.chart_period = None
+        self.chart_interval = None
+        # Visible x range after a pan/zoom (None = all of ticker_data)
+        self.chart_xlim = None
+        self.interaction = None
+        # Downsampled lines/volume of ticker_data, reused across presentation toggles
+        self.downsampler = SeriesDownsampler()
 
     def toggle_date_range(self, state):
         """Enable/disable custom date range controls"""
@@ -230,14 +265,23 @@ class StockChart(QFrame):
         self.update_chart()
 
     def update_chart(self):
-        """Update the chart with current ticker and settings"""
+        """Load the data for the current ticker and range, then draw it"""
+        self.load_chart_data()
+
+    def reload_chart(self):
+        """Refresh button: ask for bars newer than the cached ones"""
+        self.load_chart_data(refresh=True)
+
+    def load_chart_data(self, refresh=False):
+        """
+        Fetch the selected range through the chart data cache. Only changes
+        of ticker or range come here; presentation toggles call render_chart()
+        and redraw self.ticker_data.
+        """
         if not self.ticker_symbol:
             return
 
         try:
-            # Clear the figure
-            self.figure.clear()
-
             # Get timeframe
             if self.use_custom_dates.isChecked():
                 start_date = self.start_date.date().toPyDate()
@@ -290,25 +334,95 @@ class StockChart(QFrame):
             else:
                 interval = '1d'  # Daily for longer timeframes
 
-            # Fetch data using yfinance
-            ticker = yf.Ticker(self.ticker_symbol)
+            # Cached frames, else the local history store (only missing bars are downloaded)
+            cache = ChartDataCache.get_instance()
 
             if period:
-                data = ticker.history(period=period, interval=interval)
+                data = cache.get(self.ticker_symbol, interval, period=period, refresh=refresh)
             else:
-                data = ticker.history(start=start_date, end=end_date + timedelta(days=1))
+                data = cache.get(self.ticker_symbol, '1d', start=start_date,
+                                 end=end_date + timedelta(days=1), refresh=refresh)
 
-            # Check if data is available
-            if data.empty:
-                ax = self.figure.add_subplot(111)
-                ax.text(0.5, 0.5, "No data available for the selected timeframe",
-                        horizontalalignment='center', verticalalignment='center',
-                        transform=ax.transAxes, fontsize=12)
-                self.canvas.draw()
-                return
-
-            # Store data for reference
+            # Store data for reference (shared with the cache: never modified)
             self.ticker_data = data
+            self.downsampler.clear()
+            self.chart_period = period
+            self.chart_interval = interval if period else '1d'
+            self.chart_xlim = None
+
+        except Exception as e:
+            self.ticker_data = None
+            self.show_chart_message(f"Error loading chart: {str(e)}")
+            print(f"Chart error: {str(e)}")
+            return
+
+        self.render_chart()
+
+    def show_chart_message(self, message):
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        ax.text(0.5, 0.5, message,
+                horizontalalignment='center', verticalalignment='center',
+                transform=ax.transAxes, fontsize=12)
+        self.canvas.draw()
+
+    def on_chart_view_changed(self, xmin, xmax):
+        """
+        After a pan/zoom settles: switch to the bar size that suits the
+        visible span (finer when zoomed in) and load bars for the window if
+        the current ones do not cover it, then re-render for that window.
+        """
+        self.chart_xlim = (xmin, xmax)
+        interval = zoom_interval(xmax - xmin)
+        x = bar_positions(self.ticker_data.index)
+        covered = x[0] <= xmin and x[-1] >= xmax
+
+        if interval != self.chart_interval or not covered:
+            # Load a window either side too, so the next pans stay inside it
+            span = xmax - xmin
+            start = mdates.num2date(xmin - span).date()
+            end = mdates.num2date(xmax + span).date() + timedelta(days=1)
+            try:
+                data = ChartDataCache.get_instance().get(self.ticker_symbol, interval, start=start, end=end)
+            except Exception as e:
+                print(f"Chart error: {str(e)}")
+                data = None
+            # Yahoo keeps little intraday history; keep the current bars when
+            # the new ones do not reach into the visible window
+            if data is not None and not data.empty:
+                x_new = bar_positions(data.index)
+                if np.searchsorted(x_new, xmax, side='right') <= np.searchsorted(x_new, xmin, side='left'):
+                    data = None
+            if data is not None and not data.empty:
+                self.ticker_data = data
+                self.downsampler.clear()
+                self.chart_interval = interval
+
+        self.render_chart()
+
+    def on_chart_view_reset(self):
+        """Double-click: back to the selected timeframe"""
+        self.load_chart_data()
+
+    def render_chart(self):
+        """Draw self.ticker_data with the current chart type, theme and indicators"""
+        if not self.ticker_symbol:
+            return
+
+        full = self.ticker_data
+        period = self.chart_period
+
+        # Check if data is available
+        if full is None or full.empty:
+            self.show_chart_message("No data available for the selected timeframe")
+            return
+
+        try:
+            # Clear the figure
+            if self.interaction is not None:
+                self.interaction.disconnect()
+                self.interaction = None
+            self.figure.clear()
 
             # Apply chart theme
             theme = self.theme_selector.currentText()
@@ -343,17 +457,37 @@ class StockChart(QFrame):
                 volume_alpha = 0.3
                 ma_colors = ['red', 'blue', 'green', 'purple']  # Original colors
 
-            # Calculate Moving Averages if needed
+            # Calculate Moving Averages if needed (kept apart from the cached frame)
+            moving_averages = {}
             if self.show_ma.isChecked():
                 # Only calculate MAs that make sense for the timeframe
-                if len(data) >= 5:
-                    data['MA5'] = data['Close'].rolling(window=5).mean()
-                if len(data) >= 10:
-                    data['MA10'] = data['Close'].rolling(window=10).mean()
-                if len(data) >= 50:
-                    data['MA50'] = data['Close'].rolling(window=50).mean()
-                if len(data) >= 100:
-                    data['MA100'] = data['Close'].rolling(window=100).mean()
+                for window in (5, 10, 50, 100):
+                    if len(full) >= window:
+                        moving_averages[f'MA{window}'] = full['Close'].rolling(window=window).mean()
+
+            # After a pan/zoom only the visible bars, plus one window either
+            # side to pan into, are drawn
+            lo, hi = 0, len(full)
+            visible_lo, visible_hi = lo, hi
+            if self.chart_xlim is not None:
+                xmin, xmax = self.chart_xlim
+                span = xmax - xmin
+                x_all = bar_positions(full.index)
+                visible_lo = int(np.searchsorted(x_all, xmin, side='left'))
+                visible_hi = int(np.searchsorted(x_all, xmax, side='right'))
+                lo = int(np.searchsorted(x_all, xmin - span, side='left'))
+                hi = int(np.searchsorted(x_all, xmax + span, side='right'))
+            if hi <= lo:
+                # Panned past the data: draw all of it
+                lo, hi = 0, len(full)
+            data = full.iloc[lo:hi]
+            visible = full.iloc[visible_lo:visible_hi] if visible_hi > visible_lo else data
+            moving_averages = {name: values.iloc[lo:hi] for name, values in moving_averages.items()}
+            # Plain date numbers rather than datetimes: with no unit conversion
+            # on the axes, collections redraw fast enough to pan with blitting
+            positions = bar_positions(data.index)
+            # Share of the drawn bars that is visible, to size the point budgets
+            overscan = len(data) / max(len(visible), 1)
 
             # Setup main plot area
             # Define dimensions - main chart takes more space, volume takes less
@@ -368,31 +502,39 @@ class StockChart(QFrame):
             # Get chart type
             chart_type = self.chart_type.currentText()
 
+            # Lines are downsampled (LTTB) to a few points per pixel of the axes
+            line_points = point_budget(ax, overscan)
+
+            def line(name, values):
+                return self.downsampler.line((name, lo, hi), positions, values.to_numpy(), line_points)
+
             # Create chart based on type
             if chart_type == 'Line':
                 # Create a line chart with enhanced appearance
-                ax.plot(data.index, data['Close'], linewidth=2, color=text_color, label='Close')
+                ax.plot(*line('Close', data['Close']), linewidth=2, color=text_color, label='Close')
 
                 # Add Moving Averages to line chart if enabled
                 if self.show_ma.isChecked():
                     for i, ma in enumerate(['MA5', 'MA10', 'MA50', 'MA100']):
-                        if ma in data.columns:
-                            ax.plot(data.index, data[ma], linewidth=1.5,
+                        if ma in moving_averages:
+                            ax.plot(*line(ma, moving_averages[ma]), linewidth=1.5,
                                     color=ma_colors[i],
                                     label=ma,
                                     alpha=0.8)
 
                 # Add volume if enabled
                 if self.show_volume.isChecked() and volume_ax:
+                    x, _, _, _, close, volume = ohlcv_arrays(data)
                     # Color volume bars based on price movement
-                    volume_colors = np.where(
-                        data['Close'] >= data['Close'].shift(1),
-                        volume_up_color,
-                        volume_down_color
-                    )
-
-                    # Plot volume with colors
-                    volume_ax.bar(data.index, data['Volume'], color=volume_colors, alpha=volume_alpha, width=0.8)
+                    rising = np.concatenate(([False], close[1:] >= close[:-1]))
+                    volume_colors = np.where(rising, volume_up_color, volume_down_color)
+
+                    # Keep the lowest and highest bar per few pixels, so spikes survive
+                    keep = self.downsampler.envelope(('Volume', lo, hi), volume,
+                                                     int(max_bars_for(volume_ax) * overscan))
+
+                    # Plot volume with colors (one collection for all bars)
+                    draw_volume(volume_ax, x[keep], volume[keep], volume_colors[keep], volume_alpha)
                     volume_ax.set_ylabel('Volume', color=text_color)
                     volume_ax.tick_params(colors=text_color)
 
@@ -405,37 +547,20 @@ class StockChart(QFrame):
                         volume_ax.set_axisbelow(True)  # Put grid behind the bars
 
             elif chart_type == 'Candlestick':
-                # Create an enhanced candlestick chart
-                # Use wider bodies and thinner wicks for better visualization
-                width_body = 0.8
-                width_wick = 0.2
-
-                # Separate up and down days
-                up = data[data.Close >= data.Open]
-                down = data[data.Close < data.Open]
-
-                # Plot up candles with enhanced appearance
-                ax.bar(up.index, up.Close - up.Open, width_body, bottom=up.Open,
-                       color=up_color, alpha=1, zorder=3, edgecolor='black', linewidth=0.5)
-
-                # Plot down candles with enhanced appearance
-                ax.bar(down.index, down.Open - down.Close, width_body, bottom=down.Close,
-                       color=down_color, alpha=1, zorder=3, edgecolor='black', linewidth=0.5)
-
-                # Add wicks (high-low lines) with better appearance
-                for i, (idx, row) in enumerate(data.iterrows()):
-                    # Plot high wick
-                    ax.plot([idx, idx], [max(row.Open, row.Close), row.High],
-                            color='black', linewidth=1, alpha=0.8, zorder=4)
-                    # Plot low wick
-                    ax.plot([idx, idx], [min(row.Open, row.Close), row.Low],
-                            color='black', linewidth=1, alpha=0.8, zorder=4)
+                # Create an enhanced candlestick chart: bodies and wicks are one
+                # collection each; with more bars than the axes can show,
+                # neighbouring bars are merged first
+                max_bars = int(max_bars_for(ax) * overscan)
+                bars = aggregate_bars(*ohlcv_arrays(data), max_bars=max_bars)
+                x, open_, high, low, close, volume = bars
+
+                draw_candlesticks(ax, x, open_, high, low, close, up_color, down_color)
 
                 # Add Moving Averages to candlestick chart if enabled
                 if self.show_ma.isChecked():
                     for i, ma in enumerate(['MA5', 'MA10', 'MA50', 'MA100']):
-                        if ma in data.columns:
-                            ax.plot(data.index, data[ma], linewidth=1.5,
+                        if ma in moving_averages:
+                            ax.plot(*line(ma, moving_averages[ma]), linewidth=1.5,
                                     color=ma_colors[i],
                                     label=ma,
                                     alpha=0.8,
@@ -444,15 +569,11 @@ class StockChart(QFrame):
                 # Add volume if enabled
                 if self.show_volume.isChecked() and volume_ax:
                     # Color volume bars to match candle colors
-                    volume_colors = np.where(
-                        data['Close'] >= data['Open'],
-                        volume_up_color,
-                        volume_down_color
-                    )
+                    volume_colors = np.where(close >= open_, volume_up_color, volume_down_color)
 
                     # Plot volume with enhanced appearance
-                    volume_ax.bar(data.index, data['Volume'], color=volume_colors,
-                                  alpha=volume_alpha, width=0.8, edgecolor='black', linewidth=0.2)
+                    draw_volume(volume_ax, x, volume, volume_colors, volume_alpha,
+                                edge_color='black', edge_width=0.2)
                     volume_ax.set_ylabel('Volume', color=text_color)
                     volume_ax.tick_params(colors=text_color)
 
@@ -486,8 +607,11 @@ class StockChart(QFrame):
             if volume_ax:
                 volume_ax.tick_params(colors=text_color)
 
-            # Format dates on x-axis based on timeframe
-            if period in ['1d', '5d']:
+            # Format dates on x-axis based on timeframe (or the zoomed span)
+            if self.chart_xlim is not None:
+                span = self.chart_xlim[1] - self.chart_xlim[0]
+                formatter = mdates.DateFormatter('%d %b %H:%M' if span <= 7 else '%d %b' if span <= 200 else '%b %Y')
+            elif period in ['1d', '5d']:
                 formatter = mdates.DateFormatter('%H:%M')
             elif period in ['1mo', '3mo', '6mo']:
                 formatter = mdates.DateFormatter('%d %b')
@@ -512,25 +636,29 @@ class StockChart(QFrame):
                     ax.xaxis.set_major_locator(plt.MaxNLocator(10))
 
             # Add price padding to y-axis (5% above highest and below lowest)
-            y_range = data['High'].max() - data['Low'].min()
+            y_range = visible['High'].max() - visible['Low'].min()
             y_padding = y_range * 0.05
-            ax.set_ylim(data['Low'].min() - y_padding, data['High'].max() + y_padding)
+            ax.set_ylim(visible['Low'].min() - y_padding, visible['High'].max() + y_padding)
+            if self.chart_xlim is not None:
+                ax.set_xlim(*self.chart_xlim)
 
             # Adjust layout to prevent cutting off labels
             self.figure.tight_layout()
 
+            # Crosshair, tooltip, drag-to-pan and wheel zoom (blitted)
+            self.interaction = ChartInteraction(self.canvas, ax, volume_ax, self.on_chart_view_changed,
+                                                self.on_chart_view_reset, text_color)
+            if chart_type == 'Candlestick':
+                self.interaction.set_bars(*bars)
+            else:
+                self.interaction.set_bars(*ohlcv_arrays(data))
+
             # Draw the canvas
             self.canvas.draw()
 
         except Exception as e:
             # Show error on chart
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, f"Error loading chart: {str(e)}",
-                    horizontalalignment='center', verticalalignment='center',
-                    transform=ax.transAxes, fontsize=12)
-            self.canvas.draw()
-
+            self.show_chart_message(f"Error drawing chart: {str(e)}")
             print(f"Chart error: {str(e)}")
 
 
@@ -769,7 +897,11 @@ class HistoricalDataWidget(QFrame):
         filter_label = QLabel("Filter:")
         self.filter_input = QLineEdit()
         self.filter_input.setPlaceholderText("Filter data (e.g., date, price range)")
-        self.filter_input.textChanged.connect(self.apply_filter)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_input.textChanged.connect(self.filter_timer.start)
 
         # Row limit
         limit_label = QLabel("Max Rows:")
@@ -786,14 +918,18 @@ class HistoricalDataWidget(QFrame):
 
         layout.addLayout(controls_layout)
 
-        # Data table
-        self.preview_table = QTableWidget()
+        # Data table (a model over the fetched frame; cells are formatted as they are shown)
+        self.preview_model = FrameTableModel(self)
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
         self.preview_table.setAlternatingRowColors(True)
-        self.preview_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.preview_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.preview_table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
+        self.preview_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.preview_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.preview_table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        # Size columns from the first rows only; a preview can have a million
+        self.preview_table.horizontalHeader().setResizeContentsPrecision(PREVIEW_SIZING_ROWS)
         self.preview_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #f0f0f0;
             }
@@ -804,11 +940,11 @@ class HistoricalDataWidget(QFrame):
                 border: none;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
                 border-bottom: 1px solid #f0f0f0;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e3f2fd;
                 color: black;
             }
@@ -952,8 +1088,7 @@ class HistoricalDataWidget(QFrame):
         """Set the ticker symbol and reset the UI"""
         self.ticker_symbol = ticker_symbol
         self.historical_data = None
-        self.preview_table.setRowCount(0)
-        self.preview_table.setColumnCount(0)
+        self.preview_model.clear()
         self.preview_status.setText(f"Ticker set to {ticker_symbol}. Use Preview or Download to fetch data.")
         self.data_stats.setText("")
         self.analysis_results.clear()
@@ -1006,14 +1141,15 @@ class HistoricalDataWidget(QFrame):
             }
             interval = interval_map[interval_text]
 
-            # Fetch data
-            ticker = yf.Ticker(self.ticker_symbol)
+            # Fetch data through the local history store
+            store = HistoryStore.get_instance()
+            adjusted = self.adjust_checkbox.isChecked()
 
             if period:
-                data = ticker.history(period=period, interval=interval, auto_adjust=self.adjust_checkbox.isChecked())
+                data = store.get_frame(self.ticker_symbol, interval, period=period, adjusted=adjusted)
             else:
-                data = ticker.history(start=start_date, end=end_date + timedelta(days=1),
-                                      interval=interval, auto_adjust=self.adjust_checkbox.isChecked())
+                data = store.get_frame(self.ticker_symbol, interval, start=start_date,
+                                       end=end_date + timedelta(days=1), adjusted=adjusted)
 
             # Check if data is available
             if data.empty:
@@ -1053,94 +1189,44 @@ class HistoricalDataWidget(QFrame):
 
     def populate_preview_table(self, data):
         """Populate the preview table with data"""
-        # Clear the table
-        self.preview_table.setRowCount(0)
-        self.preview_table.setColumnCount(0)
-
         if data.empty:
+            self.preview_model.clear()
             self.preview_status.setText("No data available")
             return
 
         # Get row limit
         limit_text = self.limit_selector.currentText()
-        if limit_text == 'All':
-            limit = len(data)
-        else:
-            limit = min(int(limit_text), len(data))
+        limit = None if limit_text == 'All' else int(limit_text)
 
-        # Apply filter if needed
-        filter_text = self.filter_input.text().strip().lower()
-        if filter_text:
+        # Apply filter if needed: a boolean mask over the frame, nothing is copied
+        mask = None
+        filter_text = self.filter_input.text()
+        if filter_text.strip():
             try:
-                # Try to filter based on date or price
-                filtered_data = data
-
-                # Check if it's a date filter (YYYY-MM-DD)
-                if filter_text.count('-') == 2:
-                    filtered_data = data[data.index.strftime('%Y-%m-%d').str.contains(filter_text)]
-                # Check if it's a price range filter (e.g., >100, <50, 100-200)
-                elif '>' in filter_text:
-                    value = float(filter_text.replace('>', '').strip())
-                    filtered_data = data[data['Close'] > value]
-                elif '<' in filter_text:
-                    value = float(filter_text.replace('<', '').strip())
-                    filtered_data = data[data['Close'] < value]
-                elif '-' in filter_text and filter_text.count('-') == 1:
-                    min_val, max_val = map(float, filter_text.split('-'))
-                    filtered_data = data[(data['Close'] >= min_val) & (data['Close'] <= max_val)]
-                else:
-                    # Generic filter on any column that might contain the text
-                    filtered_data = data[
-                        data.astype(str).apply(lambda x: x.str.lower().str.contains(filter_text)).any(axis=1)]
-
-                data = filtered_data
-
+                mask = self.preview_model.filter_mask(data, filter_text)
             except Exception as e:
                 print(f"Filter error: {str(e)}")
                 # If filter fails, use original data
-                pass
-
-        # Limit rows after filtering
-        limited_data = data.head(limit)
-
-        # Set up table columns
-        columns = ['Date'] + list(data.columns)
-        self.preview_table.setColumnCount(len(columns))
-        self.preview_table.setHorizontalHeaderLabels(columns)
-
-        # Add data rows
-        self.preview_table.setRowCount(len(limited_data))
-
-        for i, (idx, row) in enumerate(limited_data.iterrows()):
-            # Add date from index
-            date_item = QTableWidgetItem(idx.strftime('%Y-%m-%d %H:%M:%S'))
-            self.preview_table.setItem(i, 0, date_item)
-
-            # Add other columns
-            for j, col in enumerate(data.columns):
-                value = row[col]
-                if isinstance(value, (int, float)):
-                    # Format numbers
-                    if 'Volume' in col:
-                        text = f"{value:,.0f}"
-                    else:
-                        text = f"{value:.2f}"
-                else:
-                    text = str(value)
-
-                item = QTableWidgetItem(text)
-                self.preview_table.setItem(i, j + 1, item)
+                mask = None
 
-        # Resize columns to content
+        self.preview_model.set_frame(data, mask, limit)
         self.preview_table.resizeColumnsToContents()
 
         # Update status
-        self.preview_status.setText(f"Showing {len(limited_data)} of {len(data)} rows")
+        matched = self.preview_model.matched
+        self.preview_status.setText(f"Showing {self.preview_model.rowCount()} of {matched} rows")
 
-        # Update stats
-        stats_text = f"Date Range: {data.index.min().strftime('%Y-%m-%d')} to {data.index.max().strftime('%Y-%m-%d')}"
+        # Update stats (over every matching row, not only the shown ones)
+        if matched == 0:
+            self.data_stats.setText("")
+            return
+        dates = data.index if mask is None else data.index[mask]
+        stats_text = f"Date Range: {dates.min().strftime('%Y-%m-%d')} to {dates.max().strftime('%Y-%m-%d')}"
         if 'Close' in data.columns:
-            stats_text += f" | Price Range: {data['Close'].min():.2f} - {data['Close'].max():.2f}"
+            close = data['Close'].to_numpy(dtype=np.float64)
+            if mask is not None:
+                close = close[mask]
+            stats_text += f" | Price Range: {np.nanmin(close):.2f} - {np.nanmax(close):.2f}"
         self.data_stats.setText(stats_text)
 
     def apply_filter(self):
@@ -1148,34 +1234,29 @@ class HistoricalDataWidget(QFrame):
         if self.historical_data is not None:
             self.populate_preview_table(self.historical_data)
 
+    def selected_preview_rows(self):
+        """Selected rows as a sorted array, read from the selection ranges rather than per index"""
+        selection = self.preview_table.selectionModel().selection()
+        if selection.isEmpty():
+            return np.arange(0)
+        return np.unique(np.concatenate([np.arange(r.top(), r.bottom() + 1) for r in selection]))
+
     def copy_selected_data(self):
         """Copy selected rows to clipboard"""
-        selected_rows = self.preview_table.selectionModel().selectedRows()
-        if not selected_rows:
+        rows = self.selected_preview_rows()
+        if len(rows) == 0:
             return
 
-        # Build CSV data
-        columns = [self.preview_table.horizontalHeaderItem(i).text() for i in range(self.preview_table.columnCount())]
-        rows = []
-
-        # Add header
-        rows.append(",".join(columns))
-
-        # Add selected rows
-        for row_idx in sorted([index.row() for index in selected_rows]):
-            row_data = []
-            for col_idx in range(self.preview_table.columnCount()):
-                item = self.preview_table.item(row_idx, col_idx)
-                row_data.append(item.text() if item else "")
-            rows.append(",".join(row_data))
+        # CSV with a header, formatted column by column from the frame
+        text = self.preview_model.csv_text(rows)
 
         # Copy to clipboard
-        QApplication.clipboard().setText("\n".join(rows))
-        self.preview_status.setText(f"Copied {len(selected_rows)} rows to clipboard")
+        QApplication.clipboard().setText(text)
+        self.preview_status.setText(f"Copied {len(rows)} rows to clipboard")
 
     def export_preview_data(self):
         """Export current preview data to file"""
-        if self.historical_data is None or self.preview_table.rowCount() == 0:
+        if self.historical_data is None or self.preview_model.rowCount() == 0:
             return
 
         # Ask user for save location
@@ -1188,20 +1269,8 @@ class HistoricalDataWidget(QFrame):
             return
 
         try:
-            # Get data from preview table
-            columns = [self.preview_table.horizontalHeaderItem(i).text() for i in
-                       range(self.preview_table.columnCount())]
-            data = []
-
-            for row_idx in range(self.preview_table.rowCount()):
-                row_data = {}
-                for col_idx, col_name in enumerate(columns):
-                    item = self.preview_table.item(row_idx, col_idx)
-                    row_data[col_name] = item.text() if item else ""
-                data.append(row_data)
-
-            # Convert to DataFrame
-            df = pd.DataFrame(data)
+            # The shown rows, as they appear in the table
+            df = self.preview_model.text_frame()
 
             # Save based on file extension
             if filename.endswith('.csv'):
@@ -1608,9 +1677,11 @@ class StockReportsPage(QWidget):
         super().__init__(parent)
         self.init_ui()
 
-        # Set a timer for auto-refresh
+        # Price cards follow the shared quote cache; the timer only asks the
+        # quote engine, which skips the network while the cached quote is fresh
+        QuoteCache.get_instance().quote_updated.connect(self.on_quote_updated)
         self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.refresh_current_stock)
+        self.refresh_timer.timeout.connect(self.refresh_current_quote)
         self.refresh_timer.start(60000)  # Refresh every minute
 
     def init_ui(self):
@@ -1892,6 +1963,7 @@ class StockReportsPage(QWidget):
                 ticker_symbol = search_text
 
             # Try to fetch basic info to validate the symbol
+            rate_limiter.acquire(YFINANCE_HOST)
             ticker = yf.Ticker(ticker_symbol)
             info = ticker.info
 
@@ -1900,6 +1972,7 @@ class StockReportsPage(QWidget):
                 # Try Mumbai exchange if NSE failed
                 if ticker_symbol.endswith('.NS'):
                     ticker_symbol = ticker_symbol.replace('.NS', '.BO')
+                    rate_limiter.acquire(YFINANCE_HOST)
                     ticker = yf.Ticker(ticker_symbol)
                     info = ticker.info
 
@@ -2080,6 +2153,29 @@ class StockReportsPage(QWidget):
         # Update the table
         self.statistics_table.update_data(stats_data)
 
+    def refresh_current_quote(self):
+        """Timer refresh of the price cards through the shared quote engine/cache"""
+        if not self.current_ticker:
+            return
+
+        for quote in QuoteEngine.get_instance().request([self.current_ticker], PRIORITY_BACKGROUND):
+            self.on_quote_updated(quote)
+
+    def on_quote_updated(self, quote):
+        """Update the quick info cards when a newer quote for the displayed stock arrives"""
+        if quote.symbol != self.current_ticker:
+            return
+
+        self.price_card.update_value(f"₹{quote.current_price:,.2f}")
+        self.prev_close_card.update_value(f"₹{quote.prev_close:,.2f}")
+        self.open_card.update_value(f"₹{quote.open:,.2f}")
+        self.day_range_card.update_value(f"₹{quote.low:,.2f} - ₹{quote.high:,.2f}")
+        self.volume_card.update_value(f"{quote.volume:,}")
+        self.change_card.update_value(f"₹{quote.price_change:,.2f}", quote.price_change, quote.percent_change)
+
+        updated_time = datetime.fromtimestamp(quote.fetched_at).strftime("%Y-%m-%d %H:%M:%S")
+        self.last_updated.setText(f"Last Updated: {updated_time}")
+
     def refresh_current_stock(self):
         """Refresh data for the currently displayed stock"""
         if not self.current_ticker:
@@ -2089,6 +2185,7 @@ class StockReportsPage(QWidget):
             self.status_bar.setText(f"Refreshing data for {self.current_ticker}...")
 
             # Fetch fresh data
+            rate_limiter.acquire(YFINANCE_HOST)
             ticker = yf.Ticker(self.current_ticker)
             info = ticker.info
 
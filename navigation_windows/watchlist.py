@@ -4,10 +4,13 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
                              QMessageBox, QStatusBar, QSizePolicy, QScrollArea)
 from PyQt6.QtCore import pyqtSignal, Qt, QTimer
 from PyQt6.QtGui import QFont, QColor
-import requests
 import yfinance as yf
 from datetime import datetime
 from database import DatabaseConnection
+from quote_engine import QuoteEngine
+from quote_cache import QuoteCache
+import rate_limiter
+from rate_limiter import PRIORITY_BACKGROUND, PRIORITY_NORMAL, YFINANCE_HOST
 import mysql.connector
 from mysql.connector import Error
 
@@ -120,6 +123,15 @@ class WatchlistWindow(BaseNavigationWindow):
             }
         """)
 
+        # Quotes come from the shared engine via the shared quote cache; market
+        # caps rarely change so they are looked up once per symbol
+        self.pending_symbols = set()
+        self.market_caps = {}
+        self.quote_engine = QuoteEngine.get_instance()
+        self.quote_cache = QuoteCache.get_instance()
+        self.quote_cache.quote_updated.connect(self.on_quote_ready)
+        self.quote_engine.quote_failed.connect(self.on_quote_failed)
+
         self.refresh_timer = QTimer(self)
         self.refresh_timer.timeout.connect(self.auto_refresh_data)
         self.refresh_timer.start(60000)  # Refresh every minute
@@ -483,110 +495,70 @@ class WatchlistWindow(BaseNavigationWindow):
         if show_message:
             self.statusBar.showMessage('Refreshing watchlist data...')
 
-        # Process stocks one by one to avoid rate limiting
-        self.current_stock_index = 0
-        self.process_next_stock()
+        # All stocks are fetched concurrently by the quote engine; timer
+        # refreshes yield to requests the user is waiting on
+        symbols = [row[0] for row in self.watchlist_data]
+        self.pending_symbols.update(symbols)
+        cached = self.quote_engine.request(symbols, PRIORITY_NORMAL if show_message else PRIORITY_BACKGROUND)
+
+        # Quotes still fresh in the cache (e.g. loaded by the dashboard) show immediately
+        for quote in cached:
+            self.on_quote_ready(quote)
+
+    def on_quote_ready(self, quote):
+        """Update the watchlist row for a quote from the shared cache"""
+        for row_index, row in enumerate(self.watchlist_data):
+            if row[0] == quote.symbol:
+                break
+        else:
+            return  # Not in this watchlist
+
+        price_change = quote.price_change
+        percent_change = quote.percent_change
+
+        # Format values
+        price_str = f"₹{quote.current_price:.2f}"
+        change_str = f"{'+' if price_change >= 0 else ''}{price_change:.2f}"
+        percent_str = f"{'+' if percent_change >= 0 else ''}{percent_change:.2f}%"
+        volume_str = f"{quote.volume:,}"
+
+        # Update watchlist data
+        self.watchlist_data[row_index] = [
+            quote.symbol,
+            price_str,
+            change_str,
+            percent_str,
+            volume_str,
+            self.get_market_cap(quote.symbol),
+            ''
+        ]
+
+        self.update_watchlist_table()
+        self.mark_quote_done(quote.symbol)
+
+    def on_quote_failed(self, symbol, error_tuple):
+        """Keep the placeholder row for a symbol the engine could not fetch"""
+        if symbol in self.pending_symbols:
+            print(f"Error fetching data for {symbol}: {error_tuple[0]}")
+            self.mark_quote_done(symbol)
+
+    def mark_quote_done(self, symbol):
+        """Finish the refresh once every requested symbol has been answered"""
+        if symbol not in self.pending_symbols:
+            return
+        self.pending_symbols.discard(symbol)
 
-    def process_next_stock(self):
-        """Process one stock at a time and schedule the next"""
-        # Base case: all stocks processed
-        if self.current_stock_index >= len(self.watchlist_data):
+        if not self.pending_symbols:
             self.update_top_performers()
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.last_update_label.setText(f'Last Updated: {current_time}')
             self.statusBar.showMessage('Watchlist updated successfully')
-            return
-
-        # Get current stock and fetch data
-        symbol = self.watchlist_data[self.current_stock_index][0]
-        self.statusBar.showMessage(f'Updating {symbol} ({self.current_stock_index + 1}/{len(self.watchlist_data)})')
-        self.fetch_stock_data(symbol, self.current_stock_index)
-
-        # Schedule next stock with delay
-        self.current_stock_index += 1
-        QTimer.singleShot(1000, self.process_next_stock)
 
     def fetch_stock_data(self, symbol, row_index=None):
-        """Fetch data for a specific stock with improved accuracy"""
-        try:
-            # If row_index is None, find it
-            if row_index is None:
-                for i, row in enumerate(self.watchlist_data):
-                    if row[0] == symbol:
-                        row_index = i
-                        break
-                if row_index is None:
-                    return  # Stock not found
-
-            # Debug message
-            print(f"Fetching data for {symbol}...")
-
-            # Try a more direct approach with Yahoo Finance API
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=2d"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            response = requests.get(url, headers=headers)
-            data = response.json()
-
-            if 'chart' in data and 'result' in data['chart'] and data['chart']['result']:
-                result = data['chart']['result'][0]
-                meta = result['meta']
-                quote = result['indicators']['quote'][0]
-
-                # Debug data structure
-                print(f"Got data for {symbol}: {meta}")
-
-                # Current data
-                current_price = meta.get('regularMarketPrice', 0)
-                prev_close = meta.get('chartPreviousClose', 0)
-
-                # If we don't have previous close, try to get it from the time series
-                if prev_close == 0 and len(quote['close']) > 1:
-                    prev_close = quote['close'][-2]
-
-                # Calculate changes
-                price_change = current_price - prev_close
-                percent_change = (price_change / prev_close) * 100 if prev_close else 0
-
-                # Get volume
-                volume = meta.get('regularMarketVolume', 0)
-
-                # Format values
-                price_str = f"₹{current_price:.2f}"
-                change_str = f"{'+' if price_change >= 0 else ''}{price_change:.2f}"
-                percent_str = f"{'+' if percent_change >= 0 else ''}{percent_change:.2f}%"
-                volume_str = f"{volume:,}"
-
-                # Get market cap
-                market_cap = self.get_market_cap(symbol)
-
-                # Debug output
-                print(f"{symbol} Price: {price_str}, Change: {change_str}, %Change: {percent_str}")
-
-                # Update watchlist data
-                self.watchlist_data[row_index] = [
-                    symbol,
-                    price_str,
-                    change_str,
-                    percent_str,
-                    volume_str,
-                    market_cap,
-                    ''
-                ]
-
-                # Update table display
-                self.update_watchlist_table()
-                return True
-
-            else:
-                print(f"No data available for {symbol}")
-                return False
-
-        except Exception as e:
-            print(f"Error fetching data for {symbol}: {str(e)}")
-            return False
+        """Request fresh data for a specific stock; the row is updated in on_quote_ready"""
+        self.pending_symbols.add(symbol)
+        for quote in self.quote_engine.request([symbol]):
+            self.on_quote_ready(quote)
 
     def load_watchlist_from_db(self):
         """Load user's watchlist from database"""
@@ -651,21 +623,28 @@ class WatchlistWindow(BaseNavigationWindow):
         self.fetch_real_data()
 
     def get_market_cap(self, symbol):
-        """Get market cap for a stock using yfinance"""
+        """Get market cap for a stock using yfinance (cached per symbol)"""
+        if symbol in self.market_caps:
+            return self.market_caps[symbol]
+
         try:
+            rate_limiter.acquire(YFINANCE_HOST)
             stock = yf.Ticker(symbol)
             info = stock.info
             market_cap = info.get('marketCap', 0)
 
             # Format market cap
             if market_cap >= 10_000_000_000:  # Crores
-                return f"{market_cap / 10_000_000:.2f}L Cr"
+                formatted = f"{market_cap / 10_000_000:.2f}L Cr"
             elif market_cap >= 100_000_000:  # Crores
-                return f"{market_cap / 10_000_000:.2f} Cr"
+                formatted = f"{market_cap / 10_000_000:.2f} Cr"
             elif market_cap >= 10_000_000:  # Lakhs
-                return f"{market_cap / 100_000:.2f}L"
+                formatted = f"{market_cap / 100_000:.2f}L"
             else:
-                return f"{market_cap:,}"
+                formatted = f"{market_cap:,}"
+
+            self.market_caps[symbol] = formatted
+            return formatted
 
         except Exception as e:
             print(f"Error getting market cap for {symbol}: {str(e)}")
@@ -0,0 +1,72 @@
+# quote_cache.py
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Quotes younger than this are served from memory instead of the network.
+# Slightly below the 60s window refresh timers so a timer tick always refreshes.
+DEFAULT_TTL = 55
+
+
+class QuoteCache(QObject):
+    """
+    Process-wide cache of the latest Quote per symbol.
+    Windows subscribe to quote_updated instead of polling the network;
+    the signal fires (on the GUI thread) every time a newer quote is stored.
+    """
+    quote_updated = pyqtSignal(object)
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every window reads the same quotes"""
+        if cls._instance is None:
+            cls._instance = QuoteCache()
+        return cls._instance
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        super().__init__()
+        self.ttl = ttl
+        self._quotes = {}
+        self._lock = threading.Lock()
+
+    def put(self, quote):
+        """Store a quote and notify subscribers; older quotes never replace newer ones"""
+        with self._lock:
+            current = self._quotes.get(quote.symbol)
+            if current is not None and current.fetched_at > quote.fetched_at:
+                return
+            self._quotes[quote.symbol] = quote
+        self.quote_updated.emit(quote)
+
+    def get(self, symbol, max_age=None):
+        """Return the cached quote if it is fresh enough, otherwise None"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            quote = self._quotes.get(symbol)
+        if quote is not None and time.time() - quote.fetched_at <= max_age:
+            return quote
+        return None
+
+    def peek(self, symbol):
+        """Return the cached quote regardless of age (None if never fetched)"""
+        with self._lock:
+            return self._quotes.get(symbol)
+
+    def is_fresh(self, symbol, max_age=None):
+        return self.get(symbol, max_age) is not None
+
+    def last_updated(self, symbol):
+        """Timestamp of the cached quote for symbol, or None"""
+        quote = self.peek(symbol)
+        return quote.fetched_at if quote is not None else None
+
+    def invalidate(self, symbol=None):
+        """Drop one symbol (or everything) so the next request hits the network"""
+        with self._lock:
+            if symbol is None:
+                self._quotes.clear()
+            else:
+                self._quotes.pop(symbol, None)
@@ -0,0 +1,205 @@
+# quote_engine.py
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+import rate_limiter
+from quote_cache import QuoteCache
+from rate_limiter import PRIORITY_NORMAL, PRIORITY_BACKGROUND
+
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=2d"
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Number of quotes fetched in parallel (also the size of the HTTP connection pool)
+MAX_CONCURRENT_FETCHES = 8
+REQUEST_TIMEOUT = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+
+@dataclass
+class Quote:
+    """Latest daily quote for one symbol"""
+    symbol: str
+    current_price: float
+    prev_close: float
+    open: float
+    high: float
+    low: float
+    volume: int
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def price_change(self):
+        return self.current_price - self.prev_close
+
+    @property
+    def percent_change(self):
+        return (self.price_change / self.prev_close) * 100 if self.prev_close else 0
+
+
+def get_session():
+    """Return the process-wide pooled HTTP session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(REQUEST_HEADERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENT_FETCHES)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def parse_chart_response(symbol, data):
+    """Build a Quote from a Yahoo v8 chart response"""
+    if not ('chart' in data and 'result' in data['chart'] and data['chart']['result']):
+        raise ValueError(f"No data available for {symbol}")
+
+    result = data['chart']['result'][0]
+    meta = result['meta']
+    quote = result['indicators']['quote'][0]
+
+    current_price = meta.get('regularMarketPrice') or 0
+    prev_close = meta.get('chartPreviousClose') or 0
+
+    # If we don't have previous close, try to get it from the time series
+    closes = quote.get('close') or []
+    if not prev_close and len(closes) > 1 and closes[-2] is not None:
+        prev_close = closes[-2]
+
+    # Open price with fallbacks: quote series, previous close, current price
+    open_price = meta.get('regularMarketOpen') or 0
+    if not open_price:
+        valid_opens = [o for o in (quote.get('open') or []) if o is not None and o > 0]
+        if valid_opens:
+            open_price = valid_opens[-1]  # Use the most recent valid open
+    if not open_price:
+        open_price = prev_close or current_price
+
+    return Quote(
+        symbol=symbol,
+        current_price=float(current_price),
+        prev_close=float(prev_close),
+        open=float(open_price),
+        high=float(meta.get('regularMarketDayHigh') or current_price),
+        low=float(meta.get('regularMarketDayLow') or current_price),
+        volume=int(meta.get('regularMarketVolume') or 0)
+    )
+
+
+def fetch_quote(symbol, priority=PRIORITY_NORMAL):
+    """Fetch one quote synchronously - call this from a worker thread, not the GUI thread"""
+    url = YAHOO_CHART_URL.format(symbol=symbol)
+    rate_limiter.acquire_for_url(url, priority)
+    response = get_session().get(url, timeout=REQUEST_TIMEOUT)
+    return parse_chart_response(symbol, response.json())
+
+
+class QuoteFetchJob(QRunnable):
+    """Fetches one symbol on the engine's thread pool and reports back to the engine"""
+
+    def __init__(self, engine, symbol, max_retries, priority=PRIORITY_NORMAL):
+        super().__init__()
+        self.engine = engine
+        self.symbol = symbol
+        self.max_retries = max_retries
+        self.priority = priority
+
+    @pyqtSlot()
+    def run(self):
+        retry_count = 0
+        while True:
+            try:
+                quote = fetch_quote(self.symbol, self.priority)
+                self.engine._job_finished(self.symbol, quote=quote)
+                return
+            except Exception as e:
+                retry_count += 1
+                if retry_count > self.max_retries:
+                    print(f"Error fetching {self.symbol}: {str(e)}")
+                    self.engine._job_finished(self.symbol, error=(str(e), traceback.format_exc()))
+                    return
+                # Wait before retrying - increase backoff time with each retry
+                time.sleep(1 * retry_count)
+
+
+class QuoteEngine(QObject):
+    """
+    Fetches quotes concurrently off the GUI thread and broadcasts them to every window.
+    Every fetched quote is stored in the shared QuoteCache (whose quote_updated
+    signal windows subscribe to) and also emitted through quote_ready;
+    failures are reported through quote_failed.
+    """
+    quote_ready = pyqtSignal(object)
+    quote_failed = pyqtSignal(str, tuple)
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every window shares one pool and one HTTP session"""
+        if cls._instance is None:
+            cls._instance = QuoteEngine()
+        return cls._instance
+
+    def __init__(self, max_workers=MAX_CONCURRENT_FETCHES, max_retries=2):
+        super().__init__()
+        self.max_retries = max_retries
+        self.threadpool = QThreadPool()
+        self.threadpool.setMaxThreadCount(max_workers)
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self.cache = QuoteCache.get_instance()
+
+    def request(self, symbols, priority=PRIORITY_NORMAL, force=False):
+        """
+        Queue symbols for fetching; symbols already in flight are not fetched twice.
+        Lower priority values (e.g. PRIORITY_VISIBLE) are sent upstream first.
+        Symbols with a fresh cached quote are not fetched unless force is set;
+        their cached quotes are returned so the caller can show them right away.
+        """
+        cached = []
+        for symbol in symbols:
+            quote = None if force else self.cache.get(symbol)
+            if quote is not None:
+                cached.append(quote)
+                continue
+            with self._lock:
+                if symbol in self._in_flight:
+                    continue
+                self._in_flight.add(symbol)
+            # QThreadPool runs higher numbers first, the rate limiter lower numbers
+            job = QuoteFetchJob(self, symbol, self.max_retries, priority)
+            self.threadpool.start(job, PRIORITY_BACKGROUND - priority)
+        return cached
+
+    def get_quote(self, symbol, priority=PRIORITY_NORMAL):
+        """Blocking lookup: the cached quote if fresh, otherwise fetch and cache it"""
+        quote = self.cache.get(symbol)
+        if quote is None:
+            quote = fetch_quote(symbol, priority)
+            self.cache.put(quote)
+        return quote
+
+    def is_pending(self, symbol):
+        with self._lock:
+            return symbol in self._in_flight
+
+    def _job_finished(self, symbol, quote=None, error=None):
+        """Called from worker threads; signals are queued to the GUI thread"""
+        with self._lock:
+            self._in_flight.discard(symbol)
+        if quote is not None:
+            self.cache.put(quote)
+            self.quote_ready.emit(quote)
+        else:
+            self.quote_failed.emit(symbol, error)
@@ -0,0 +1,188 @@
+# quote_writer.py
+import atexit
+import threading
+import time
+
+# Flush at least this often (seconds) while quotes are waiting
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# Flush early once this many symbols are waiting
+DEFAULT_BATCH_SIZE = 500
+
+# Symbols held before push() starts waiting for the writer to catch up
+DEFAULT_MAX_PENDING = 2000
+
+# Longest push() waits for room before giving up on a quote
+DEFAULT_PUSH_TIMEOUT = 1.0
+
+
+class QuoteWriter:
+    """
+    Write-behind persistence for quotes. push() only records the latest
+    quote per symbol; a background thread saves everything waiting as one
+    multi-row upsert of the stock table (one commit) plus one bulk append
+    to stock_ticks, per interval or batch.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every window feeds the same writer"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = QuoteWriter()
+            return cls._instance
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, batch_size=DEFAULT_BATCH_SIZE,
+                 max_pending=DEFAULT_MAX_PENDING, push_timeout=DEFAULT_PUSH_TIMEOUT, db=None):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.push_timeout = push_timeout
+        self._db = db
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+        self._stats = {
+            'pushed': 0,
+            'merged': 0,
+            'dropped': 0,
+            'batches': 0,
+            'rows_written': 0,
+            'failed_batches': 0,
+            'write_seconds': 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="quote-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _get_db(self):
+        if self._db is None:
+            from database import DatabaseConnection
+            self._db = DatabaseConnection()
+        return self._db
+
+    def push(self, quote):
+        """
+        Queue a quote for saving; replaces any unsaved quote for its symbol.
+        When the writer is too far behind this waits up to push_timeout and
+        returns False if the quote could not be queued.
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            self._stats['pushed'] += 1
+            if quote.symbol in self._pending:
+                self._stats['merged'] += 1
+                self._pending[quote.symbol] = quote
+                return True
+
+            deadline = time.monotonic() + self.push_timeout
+            while len(self._pending) >= self.max_pending:
+                self._flush_requested = True
+                self._condition.notify_all()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    self._stats['dropped'] += 1
+                    print(f"Quote writer is behind, not saving {quote.symbol}")
+                    return False
+                self._condition.wait(remaining)
+
+            self._pending[quote.symbol] = quote
+            if len(self._pending) >= self.batch_size:
+                self._flush_requested = True
+                self._condition.notify_all()
+            return True
+
+    def flush(self, wait=True, timeout=None):
+        """
+        Write everything queued so far. With wait=False the writer is only
+        woken up; otherwise returns False if it did not finish in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            if not wait:
+                return True
+            while (self._pending or self._writing) and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return not self._pending
+
+    def close(self, timeout=10):
+        """Flush what is queued and stop the writer thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("Quote writer did not finish saving before shutdown")
+
+    def stats(self):
+        """Counters since creation, plus how many quotes are waiting"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # Wait for the interval, a full batch, an explicit flush or shutdown
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._flush_requested or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = list(self._pending.values())
+                self._pending = {}
+                self._flush_requested = False
+                self._writing = bool(batch)
+                closed = self._closed
+                # Room was freed for any push() waiting on back-pressure
+                self._condition.notify_all()
+
+            if batch:
+                self._write(batch)
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+            if closed:
+                with self._condition:
+                    if not self._pending:
+                        return
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        rows = [(quote.symbol, quote.current_price, quote.open, quote.high, quote.low,
+                 quote.volume, quote.percent_change) for quote in batch]
+        ticks = [(quote.symbol, quote.fetched_at, quote.current_price, quote.volume) for quote in batch]
+        try:
+            db = self._get_db()
+            saved = db.save_stock_data_many(rows)
+            # Keep the history too, for charts and intraday indicators
+            saved = db.save_ticks_many(ticks) and saved
+        except Exception as e:
+            print(f"Error saving stock data to database: {e}")
+            saved = False
+
+        with self._condition:
+            self._stats['batches'] += 1
+            self._stats['write_seconds'] += time.perf_counter() - started
+            if saved:
+                self._stats['rows_written'] += len(rows)
+            else:
+                self._stats['failed_batches'] += 1
@@ -0,0 +1,128 @@
+# rate_limiter.py
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+
+# Request priorities - lower values are served first
+PRIORITY_VISIBLE = 0     # Rows the user is looking at right now
+PRIORITY_NORMAL = 1      # Everything else the user asked for
+PRIORITY_BACKGROUND = 2  # Periodic refreshes nobody is waiting on
+
+# Host used by yfinance for history/info/download calls
+YFINANCE_HOST = 'query2.finance.yahoo.com'
+
+# Sustained requests per second and burst size for each host
+HOST_LIMITS = {
+    'query1.finance.yahoo.com': (4.0, 8),
+    'query2.finance.yahoo.com': (2.0, 4),
+}
+DEFAULT_LIMIT = (2.0, 4)
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Token bucket with a priority queue of waiting threads.
+    Tokens refill at `rate` per second up to `burst`; a waiting thread only
+    takes a token when no higher priority (or older) request is waiting.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def configure(self, rate, burst):
+        """Change the limits; waiting threads pick up the new rate"""
+        with self._cond:
+            self._refill()
+            self.rate = float(rate)
+            self.burst = float(burst)
+            self.tokens = min(self.tokens, self.burst)
+            self._cond.notify_all()
+
+    def acquire(self, priority=PRIORITY_NORMAL, timeout=None):
+        """
+        Block until a token is available for this request.
+        Returns False if the timeout expired first.
+        """
+        entry = (priority, next(self._counter))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry and self.tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= 1
+                        # Let the next waiter re-check the bucket
+                        self._cond.notify_all()
+                        return True
+
+                    # Sleep until the next token is due (or until someone else is served)
+                    wait = (1 - self.tokens) / self.rate if self.tokens < 1 else None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._waiters.remove(entry)
+                            heapq.heapify(self._waiters)
+                            self._cond.notify_all()
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def queued(self):
+        """Number of requests waiting for a token"""
+        with self._cond:
+            return len(self._waiters)
+
+
+def get_bucket(host):
+    """Return the shared bucket for a host, creating it from HOST_LIMITS"""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            bucket = TokenBucket(rate, burst)
+            _buckets[host] = bucket
+        return bucket
+
+
+def configure(host, rate, burst):
+    """Set the sustained rate (requests/second) and burst for a host"""
+    with _buckets_lock:
+        HOST_LIMITS[host] = (rate, burst)
+        bucket = _buckets.get(host)
+    if bucket is not None:
+        bucket.configure(rate, burst)
+
+
+def acquire(host, priority=PRIORITY_NORMAL, timeout=None):
+    """Wait for permission to send one request to host"""
+    return get_bucket(host).acquire(priority, timeout)
+
+
+def acquire_for_url(url, priority=PRIORITY_NORMAL, timeout=None):
+    """Wait for permission to request url"""
+    return acquire(urlparse(url).netloc, priority, timeout)
@@ -0,0 +1,213 @@
+# sqlite_manager.py
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from storage_backend import QueryResult
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get('STOCKMARKET_SQLITE_PATH',
+                              os.path.join(BASE_DIR, 'stock_data', 'stockmarket.sqlite3'))
+SCHEMA_PATH = os.path.join(BASE_DIR, 'mysql', 'saras_sqlite.sql')
+
+# Milliseconds a writer waits for another connection's write lock
+BUSY_TIMEOUT_MS = 5000
+
+# Compiled statements kept per connection (sqlite3's prepared statement cache)
+STATEMENT_CACHE_SIZE = 256
+
+# MySQL constructs used by database.py and their SQLite equivalents
+_TRANSLATIONS = [
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bNOW\(\)', re.I), "datetime('now', 'localtime')"),
+    (re.compile(r'\bINSERT\s+IGNORE\b', re.I), 'INSERT OR IGNORE'),
+    (re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.I), 'ON CONFLICT DO UPDATE SET'),
+    (re.compile(r'\bVALUES\((\w+)\)', re.I), r'excluded.\1'),
+    (re.compile(r'\bFROM_UNIXTIME\(([^()]*)\)', re.I),
+     r"strftime('%Y-%m-%d %H:%M:%f', \1, 'unixepoch', 'localtime')"),
+    # julianday arithmetic is off by microseconds (18:01:00 came out as
+    # ...59.9999964, one bar early once truncated): round to the
+    # milliseconds DATETIME(3) stores
+    (re.compile(r'\bUNIX_TIMESTAMP\(([^()]*)\)', re.I),
+     r"ROUND((julianday(\1, 'utc') - 2440587.5) * 86400.0, 3)"),
+]
+
+
+def translate(query):
+    """Rewrite a MySQL-dialect statement from database.py for SQLite"""
+    for pattern, replacement in _TRANSLATIONS:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+def _error_text(e):
+    # Callers look for MySQL's wording to detect duplicates
+    if isinstance(e, sqlite3.IntegrityError) and 'UNIQUE' in str(e):
+        return f"Duplicate entry ({e})"
+    return str(e)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteManager:
+    """
+    Embedded drop-in for DatabaseManager. One connection per thread on a
+    WAL-mode file, so readers never block the writer; statements written
+    for MySQL are translated once and then reused from sqlite3's cache.
+    """
+    dialect = 'sqlite'
+    supports_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, path=DEFAULT_PATH):
+        """Singleton so every window shares the same file settings"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = SQLiteManager(path)
+            return cls._instance
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._translated = {}
+        self._metrics = {
+            'queries': 0,
+            'bulk_rows': 0,
+            'errors': 0,
+            'connections_created': 0,
+            'query_seconds': 0.0,
+        }
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self.connect()
+        with open(SCHEMA_PATH, encoding='utf-8') as f:
+            connection.executescript(f.read())
+        print(f"✅ SQLite database ready: {path}")
+
+    def connect(self):
+        """This thread's connection, opened and configured on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection
+
+        # isolation_level=None: transactions are begun explicitly in run()
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                     isolation_level=None, check_same_thread=False,
+                                     cached_statements=STATEMENT_CACHE_SIZE)
+        connection.row_factory = _dict_row
+        connection.execute("PRAGMA journal_mode = WAL")
+        # WAL + NORMAL only syncs at checkpoints: safe against app crashes,
+        # a power cut can lose the last transactions
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+        self._local.connection = connection
+        with self._lock:
+            self._connections.append(connection)
+            self._metrics['connections_created'] += 1
+        return connection
+
+    def _translate(self, query):
+        translated = self._translated.get(query)
+        if translated is None:
+            translated = translate(query)
+            with self._lock:
+                self._translated[query] = translated
+        return translated
+
+    def run(self, query, params=None, commit=False, fetch=None):
+        """Same contract as DatabaseManager.run()"""
+        started = time.perf_counter()
+        connection = self.connect()
+        try:
+            if commit:
+                connection.execute("BEGIN IMMEDIATE")
+            cursor = connection.execute(self._translate(query), tuple(params or ()))
+            rows = []
+            if fetch == 'one':
+                row = cursor.fetchone()
+                rows = [row] if row is not None else []
+            elif fetch == 'all':
+                rows = cursor.fetchall()
+            if commit:
+                connection.execute("COMMIT")
+            result = QueryResult(True, None, rows, cursor.rowcount, cursor.lastrowid)
+            cursor.close()
+            return result
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            with self._lock:
+                self._metrics['errors'] += 1
+            print(f"❌ Query error: {e}")
+            return QueryResult(False, _error_text(e))
+        finally:
+            with self._lock:
+                self._metrics['queries'] += 1
+                self._metrics['query_seconds'] += time.perf_counter() - started
+
+    def run_many(self, query, rows, commit=True):
+        """
+        Bulk form of run() for a single-row statement: one executemany of
+        the prepared statement, committed as one transaction.
+        """
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return QueryResult(True)
+        started = time.perf_counter()
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            cursor = connection.executemany(self._translate(query), rows)
+            connection.execute("COMMIT")
+            result = QueryResult(True, None, [], cursor.rowcount, cursor.lastrowid)
+            cursor.close()
+            with self._lock:
+                self._metrics['bulk_rows'] += len(rows)
+            return result
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            with self._lock:
+                self._metrics['errors'] += 1
+            print(f"❌ Query error: {e}")
+            return QueryResult(False, _error_text(e))
+        finally:
+            with self._lock:
+                self._metrics['queries'] += 1
+                self._metrics['query_seconds'] += time.perf_counter() - started
+
+    def execute_query(self, query, params=None, commit=False):
+        """Execute a statement that returns no rows; returns (success, error)"""
+        result = self.run(query, params, commit=commit)
+        return result.success, result.error
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['open_connections'] = len(self._connections)
+        return metrics
+
+    def close(self):
+        """Checkpoint the WAL and close every thread's connection"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                connection.close()
+            except sqlite3.Error as e:
+                print(f"❌ Error closing connection: {e}")
+        self._local = threading.local()
+        print("Database connection closed")
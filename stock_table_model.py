@@ -0,0 +1,216 @@
+# stock_table_model.py
+import numpy as np
+from PyQt6.QtCore import (Qt, QAbstractTableModel, QModelIndex, QEvent, QPoint,
+                          QRect, QSize, pyqtSignal)
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QStyle, QStyledItemDelegate
+
+# Numeric columns kept per row, in table order after the symbol
+FIELDS = ('open', 'current_price', 'high', 'low', 'volume', 'percent_change')
+HEADERS = ['Stock', 'Open', 'Close', 'High', 'Low', 'Volume', '% Change', 'Actions']
+VOLUME_COLUMN = 5
+CHANGE_COLUMN = 6
+ACTIONS_COLUMN = 7
+
+
+class StockTableModel(QAbstractTableModel):
+    """
+    Dashboard stock table: one row per symbol backed by NumPy columns, with
+    a symbol -> row index. Quote updates only signal the cells that changed.
+    """
+
+    def __init__(self, parent=None, capacity=64):
+        super().__init__(parent)
+        self.symbols = []
+        self.rows = {}
+        self.values = np.full((capacity, len(FIELDS)), np.nan)
+
+    # --- Qt model interface -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.symbols)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return self.symbols[row]
+            if col == ACTIONS_COLUMN:
+                return "Add"
+            return self.format_value(self.values[row, col - 1], col)
+
+        if role == Qt.ItemDataRole.ForegroundRole and col == CHANGE_COLUMN:
+            change = self.values[row, col - 1]
+            if change > 0:
+                return QColor(Qt.GlobalColor.green)
+            if change < 0:
+                return QColor(Qt.GlobalColor.red)
+            return QColor(Qt.GlobalColor.black)
+
+        if role == Qt.ItemDataRole.UserRole and col != ACTIONS_COLUMN:
+            # Raw number for sorting/export; the symbol for column 0
+            return self.symbols[row] if col == 0 else float(self.values[row, col - 1])
+
+        return None
+
+    @staticmethod
+    def format_value(value, col):
+        if np.isnan(value):
+            return "--"
+        if col == VOLUME_COLUMN:
+            return f"{int(value):,}"
+        if col == CHANGE_COLUMN:
+            return f"{'+' if value >= 0 else ''}{value:.2f}%"
+        return f"₹{value:.2f}"
+
+    # --- Rows ---------------------------------------------------------------
+
+    def row_of(self, symbol):
+        """Row index for symbol, or -1"""
+        return self.rows.get(symbol, -1)
+
+    def _grow(self, needed):
+        if needed > len(self.values):
+            grown = np.full((max(needed, 2 * len(self.values)), len(FIELDS)), np.nan)
+            grown[:len(self.symbols)] = self.values[:len(self.symbols)]
+            self.values = grown
+
+    def _reindex(self, start=0):
+        for row in range(start, len(self.symbols)):
+            self.rows[self.symbols[row]] = row
+
+    def find_or_create_row(self, symbol):
+        """Row for symbol, appending a placeholder row if it is new"""
+        row = self.rows.get(symbol)
+        if row is not None:
+            return row
+        row = len(self.symbols)
+        self._grow(row + 1)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.symbols.append(symbol)
+        self.values[row] = np.nan
+        self.rows[symbol] = row
+        self.endInsertRows()
+        return row
+
+    def move_row_to_top(self, symbol):
+        """Move (or insert) the row for symbol to the top, keeping its values"""
+        row = self.rows.get(symbol)
+        if row == 0:
+            return 0
+        if row is None:
+            count = len(self.symbols)
+            self._grow(count + 1)
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self.values[1:count + 1] = self.values[:count].copy()
+            self.values[0] = np.nan
+            self.symbols.insert(0, symbol)
+            self._reindex()
+            self.endInsertRows()
+            return 0
+
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), 0)
+        moved = self.values[row].copy()
+        self.values[1:row + 1] = self.values[:row].copy()
+        self.values[0] = moved
+        self.symbols.insert(0, self.symbols.pop(row))
+        self._reindex(0)
+        self.endMoveRows()
+        return 0
+
+    def remove_symbol(self, symbol):
+        row = self.rows.pop(symbol, None)
+        if row is None:
+            return
+        count = len(self.symbols)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.values[row:count - 1] = self.values[row + 1:count].copy()
+        self.values[count - 1] = np.nan
+        del self.symbols[row]
+        self._reindex(row)
+        self.endRemoveRows()
+
+    def update_quote(self, quote, row=None):
+        """Store a quote's numbers; only the changed cells are repainted"""
+        if row is None:
+            row = self.find_or_create_row(quote.symbol)
+        new_values = np.array([getattr(quote, field) for field in FIELDS], dtype=float)
+        old_values = self.values[row]
+        changed = np.flatnonzero(~((new_values == old_values) |
+                                   (np.isnan(new_values) & np.isnan(old_values))))
+        if len(changed) == 0:
+            return row
+        self.values[row] = new_values
+        # Columns are offset by one for the symbol column
+        first, last = int(changed[0]) + 1, int(changed[-1]) + 1
+        self.dataChanged.emit(self.index(row, first), self.index(row, last),
+                              [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ForegroundRole])
+        return row
+
+    def row_text(self, row):
+        """Formatted cells of a row, as shown (without the Actions column)"""
+        return [self.symbols[row]] + [self.format_value(self.values[row, i], i + 1)
+                                      for i in range(len(FIELDS))]
+
+    def export_rows(self):
+        """
+        Rows as shown, from a copy of the current values: quotes keep
+        arriving while an export thread formats them
+        """
+        symbols = list(self.symbols)
+        values = self.values[:len(symbols)].copy()
+        return ([symbol] + [self.format_value(values[row, i], i + 1) for i in range(len(FIELDS))]
+                for row, symbol in enumerate(symbols))
+
+
+class AddButtonDelegate(QStyledItemDelegate):
+    """
+    Paints the green "Add" button in the Actions column instead of creating
+    a widget per row; clicked carries the row and where to open the menu.
+    """
+    clicked = pyqtSignal(int, QPoint)
+
+    BUTTON_COLOR = QColor('#4CAF50')
+    HOVER_COLOR = QColor('#45a049')
+
+    def button_rect(self, rect):
+        return QRect(rect.x() + 6, rect.y() + 4, rect.width() - 12, rect.height() - 8)
+
+    def paint(self, painter, option, index):
+        rect = self.button_rect(option.rect)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.HOVER_COLOR if hovered else self.BUTTON_COLOR)
+        painter.drawRoundedRect(rect, 3, 3)
+        painter.setPen(QColor('white'))
+        font = option.font
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(70, 32)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self.button_rect(option.rect).contains(event.position().toPoint())):
+            view = self.parent()
+            global_pos = view.viewport().mapToGlobal(self.button_rect(option.rect).bottomLeft())
+            self.clicked.emit(index.row(), global_pos)
+            return True
+        return False
@@ -0,0 +1,75 @@
+# storage_backend.py
+#
+# Which database the app talks to. Both backends expose the same manager
+# interface (run, run_many, execute_query, metrics, close) and accept the
+# MySQL dialect used throughout database.py:
+#   mysql  - DatabaseManager, the MySQL server from mysql/saras.sql (default)
+#   sqlite - SQLiteManager, a local file for single-user installs and for
+#            running the DB benchmarks without any service
+# Select with the STOCKMARKET_DB_BACKEND environment variable.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND = os.environ.get('STOCKMARKET_DB_BACKEND', 'mysql').lower()
+
+
+class QueryResult:
+    """Outcome of a manager's run(): success flag, error text and the rows read"""
+
+    def __init__(self, success, error=None, rows=None, rowcount=0, lastrowid=None):
+        self.success = success
+        self.error = error
+        self.rows = rows if rows is not None else []
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+
+    @property
+    def row(self):
+        """First row, or None"""
+        return self.rows[0] if self.rows else None
+
+    def __iter__(self):
+        # Allows `success, error = manager.run(...)` like execute_query
+        return iter((self.success, self.error))
+
+
+def values_group(query):
+    """(start, end) of the first parenthesized group after VALUES in an INSERT"""
+    upper = query.upper()
+    start = upper.find('(', upper.find('VALUES'))
+    depth = 0
+    for i in range(start, len(query)):
+        if query[i] == '(':
+            depth += 1
+        elif query[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return start, i + 1
+    raise ValueError("INSERT statement has no VALUES group")
+
+
+_deferred = None
+_deferred_lock = threading.Lock()
+
+
+def run_deferred(query, params=None, manager=None):
+    """
+    Run a write nobody waits for (e.g. a last_login stamp) on a background
+    thread, in order. Pending writes still run at interpreter exit.
+    """
+    global _deferred
+    with _deferred_lock:
+        if _deferred is None:
+            _deferred = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-deferred')
+    manager = manager or get_database_manager()
+    return _deferred.submit(manager.run, query, params, True)
+
+
+def get_database_manager():
+    """Shared manager of the configured backend"""
+    if BACKEND == 'sqlite':
+        from sqlite_manager import SQLiteManager
+        return SQLiteManager.get_instance()
+    from database_manager import DatabaseManager
+    return DatabaseManager.get_instance()
@@ -0,0 +1,222 @@
+# streaming_export.py
+#
+# Table exports that never hold the whole table. Rows come from a generator
+# (a keyset-paged query or a table model) and go straight to the file a
+# chunk at a time, on a background thread:
+#   .xlsx   - openpyxl write-only workbook (rows are streamed to disk)
+#   .csv    - plain CSV
+#   .csv.gz - gzip-compressed CSV
+# The file is written under a temporary name and only renamed into place
+# when the export completes, so a cancelled or failed export leaves nothing.
+import csv
+import gzip
+import os
+import threading
+import time
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Filter string for QFileDialog.getSaveFileName
+EXPORT_FILTERS = "Excel Files (*.xlsx);;CSV Files (*.csv);;Compressed CSV (*.csv.gz);;All Files (*)"
+
+# Rows read from the database per query
+DEFAULT_BATCH_SIZE = 5000
+
+# Progress is reported at most this often (seconds)
+PROGRESS_INTERVAL = 0.25
+
+# Rows per worksheet, header included (Excel's limit); longer exports continue on a new sheet
+XLSX_MAX_ROWS = 1048576
+
+
+def export_path(path, selected_filter=""):
+    """Add the extension of the chosen file type if the name has none"""
+    lower = path.lower()
+    if lower.endswith(('.xlsx', '.csv', '.csv.gz')):
+        return path
+    if "Compressed" in selected_filter:
+        return path + '.csv.gz'
+    if "CSV" in selected_filter:
+        return path + '.csv'
+    return path + '.xlsx'
+
+
+def cell_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+class CsvSink:
+    def __init__(self, path, headers, compress=False):
+        if compress:
+            self._file = gzip.open(path, 'wt', newline='', encoding='utf-8')
+        else:
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write(self, rows):
+        self._writer.writerows([cell_value(value) for value in row] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxSink:
+    def __init__(self, path, headers):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.headers = list(headers)
+        # Write-only: rows are serialized as they are appended, not kept as cells
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self._sheets += 1
+        title = "Sheet1" if self._sheets == 1 else f"Sheet{self._sheets}"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.append(self.headers)
+        self._sheet_rows = 1
+
+    def write(self, rows):
+        for row in rows:
+            if self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append([cell_value(value) for value in row])
+            self._sheet_rows += 1
+
+    def close(self):
+        self._workbook.save(self.path)
+
+
+def open_sink(path, headers):
+    lower = path.lower()
+    if lower.endswith('.csv.gz'):
+        return CsvSink(path, headers, compress=True)
+    if lower.endswith('.csv'):
+        return CsvSink(path, headers)
+    return XlsxSink(path, headers)
+
+
+def table_rows(manager, table, fields, key, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Every row of a table as value lists, read in key order one batch per
+    query (keyset pagination, so late batches cost the same as early ones)
+    """
+    columns = ", ".join(fields)
+    after = None
+    while True:
+        if after is None:
+            query = f"SELECT {columns} FROM {table} ORDER BY {key} LIMIT %s"
+            params = (batch_size,)
+        else:
+            query = f"SELECT {columns} FROM {table} WHERE {key} > %s ORDER BY {key} LIMIT %s"
+            params = (after, batch_size)
+        result = manager.run(query, params, fetch='all')
+        if not result.success:
+            raise RuntimeError(f"Error reading {table}: {result.error}")
+        rows = result.rows
+        if not rows:
+            return
+        yield from ([row[field] for field in fields] for row in rows)
+        if len(rows) < batch_size:
+            return
+        after = rows[-1][key]
+
+
+class ExportJob(QObject):
+    """
+    Writes rows to a file on a background thread. Signals are emitted
+    from that thread and delivered on the GUI thread.
+    """
+    progress = pyqtSignal(int)                  # rows written so far
+    finished = pyqtSignal(str, int, bool, str)  # path, rows, cancelled, error ("" on success)
+
+    def __init__(self, path, headers, rows, chunk_size=DEFAULT_BATCH_SIZE):
+        super().__init__()
+        self.path = path
+        self.headers = list(headers)
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.written = 0
+        self.cancelled = False
+        self.done = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="table-export", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop after the current chunk and delete the partial file"""
+        self.cancelled = True
+
+    def is_running(self):
+        return self._thread is not None and not self.done
+
+    def _run(self):
+        started = time.perf_counter()
+        error = ""
+        temp_path = self._temp_path()
+        sink = None
+        try:
+            sink = open_sink(temp_path, self.headers)
+            last_progress = 0.0
+            chunk = []
+            for row in self.rows:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    if self.cancelled:
+                        break
+                    sink.write(chunk)
+                    self.written += len(chunk)
+                    chunk = []
+                    now = time.perf_counter()
+                    if now - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = now
+                        self.progress.emit(self.written)
+            if chunk and not self.cancelled:
+                sink.write(chunk)
+                self.written += len(chunk)
+            sink.close()
+            sink = None
+            if not self.cancelled:
+                os.replace(temp_path, self.path)
+        except Exception as e:
+            error = str(e)
+            print(f"Error exporting to {self.path}: {error}")
+        finally:
+            if sink is not None:
+                try:
+                    sink.close()
+                except Exception:
+                    pass
+            if (self.cancelled or error) and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        if not error and not self.cancelled:
+            print(f"Exported {self.written} rows to {self.path} in {time.perf_counter() - started:.2f}s")
+        self.done = True
+        self.progress.emit(self.written)
+        self.finished.emit(self.path, self.written, self.cancelled, error)
+
+    def _temp_path(self):
+        # Same directory (so the final rename is atomic) and same extension (picks the format)
+        directory, name = os.path.split(self.path)
+        return os.path.join(directory, f".{name}.partial-{os.getpid()}-{id(self)}.{self._extension()}")
+
+    def _extension(self):
+        lower = self.path.lower()
+        if lower.endswith('.csv.gz'):
+            return 'csv.gz'
+        if lower.endswith('.csv'):
+            return 'csv'
+        return 'xlsx'
@@ -0,0 +1,246 @@
+# tick_maintenance.py
+#
+# Housekeeping for the stock_ticks / stock_bars time series (see
+# mysql/saras.sql). Run it once a day, or leave it running with --loop:
+#   - adds daily partitions a few days ahead of time,
+#   - downsamples recent ticks into OHLCV bars,
+#   - drops partitions older than the retention period.
+import argparse
+import re
+import time
+from datetime import date, datetime, timedelta
+
+from storage_backend import get_database_manager
+
+# Days of raw ticks / bars kept; older daily partitions are dropped
+TICK_RETENTION_DAYS = 7
+BAR_RETENTION_DAYS = 365
+
+# Daily partitions created ahead of time
+PARTITION_DAYS_AHEAD = 3
+
+# Bar sizes built from ticks, in seconds
+BAR_INTERVALS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600}
+
+# How far back each run re-aggregates (late ticks within this are picked up)
+DOWNSAMPLE_LOOKBACK = timedelta(hours=2)
+
+PARTITION_NAME = re.compile(r'^p_(\d{8})$')
+
+
+# SQLite (before 3.44) has no ordered GROUP_CONCAT, so the first/last tick
+# of each bucket come from window functions instead
+SQLITE_DOWNSAMPLE = """
+INSERT INTO stock_bars
+    (symbol, bar_interval, ts, open_price, high_price, low_price, close_price, volume, tick_count)
+SELECT symbol, %s, bucket, open_price, high_price, low_price, close_price, volume, tick_count
+FROM (
+    SELECT symbol, bucket, MIN(first_price) AS open_price, MAX(price) AS high_price,
+           MIN(price) AS low_price, MIN(last_price) AS close_price,
+           MAX(MAX(volume) - COALESCE(LAG(MAX(volume)) OVER (PARTITION BY symbol, date(bucket)
+                                                             ORDER BY bucket), 0), 0) AS volume,
+           COUNT(*) AS tick_count
+    FROM (
+        SELECT symbol, price, volume, bucket,
+               FIRST_VALUE(price) OVER w AS first_price,
+               LAST_VALUE(price) OVER w AS last_price
+        FROM (
+            SELECT symbol, ts, price, volume,
+                   strftime('%Y-%m-%d %H:%M:%f', CAST(UNIX_TIMESTAMP(ts) AS INTEGER) / %s * %s,
+                            'unixepoch', 'localtime') AS bucket
+            FROM stock_ticks
+            WHERE ts >= %s AND ts < %s
+        )
+        WINDOW w AS (PARTITION BY symbol, bucket ORDER BY ts
+                     ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+    )
+    GROUP BY symbol, bucket
+)
+WHERE bucket >= %s
+ON DUPLICATE KEY UPDATE
+    open_price = VALUES(open_price),
+    high_price = VALUES(high_price),
+    low_price = VALUES(low_price),
+    close_price = VALUES(close_price),
+    volume = VALUES(volume),
+    tick_count = VALUES(tick_count)
+"""
+
+
+def partition_name(day):
+    return f"p_{day:%Y%m%d}"
+
+
+class TickMaintenance:
+    """Partition management, downsampling and retention for the tick tables"""
+
+    def __init__(self, manager=None, tick_retention_days=TICK_RETENTION_DAYS,
+                 bar_retention_days=BAR_RETENTION_DAYS, bar_intervals=None,
+                 days_ahead=PARTITION_DAYS_AHEAD):
+        self.manager = manager or get_database_manager()
+        self.retention = {'stock_ticks': tick_retention_days, 'stock_bars': bar_retention_days}
+        self.bar_intervals = dict(bar_intervals or BAR_INTERVALS)
+        self.days_ahead = days_ahead
+
+    def partition_days(self, table):
+        """Days that already have their own partition (p_future excluded)"""
+        query = """
+        SELECT PARTITION_NAME AS name FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        """
+        result = self.manager.run(query, (table,), fetch='all')
+        if not result.success:
+            print(f"❌ Error reading partitions of {table}: {result.error}")
+            return None
+        days = []
+        for row in result.rows:
+            match = PARTITION_NAME.match(row['name'])
+            if match:
+                days.append(datetime.strptime(match.group(1), '%Y%m%d').date())
+        return sorted(days)
+
+    @property
+    def partitioned(self):
+        # The SQLite schema has no partitions; retention deletes rows instead
+        return getattr(self.manager, 'dialect', 'mysql') == 'mysql'
+
+    def ensure_partitions(self, table, today=None):
+        """Split p_future so every day up to days_ahead has a partition"""
+        if not self.partitioned:
+            return True
+        today = today or date.today()
+        existing = self.partition_days(table)
+        if existing is None:
+            return False
+        start = existing[-1] + timedelta(days=1) if existing else today
+        wanted = [start + timedelta(days=i)
+                  for i in range((today + timedelta(days=self.days_ahead) - start).days + 1)]
+        if not wanted:
+            return True
+
+        partitions = ", ".join(
+            f"PARTITION {partition_name(day)} VALUES LESS THAN ('{day + timedelta(days=1):%Y-%m-%d}')"
+            for day in wanted)
+        query = f"""
+        ALTER TABLE {table} REORGANIZE PARTITION p_future INTO (
+            {partitions},
+            PARTITION p_future VALUES LESS THAN (MAXVALUE)
+        )
+        """
+        success, error = self.manager.execute_query(query)
+        if not success:
+            print(f"❌ Error adding partitions to {table}: {error}")
+            return False
+        print(f"Added {len(wanted)} partitions to {table} (up to {wanted[-1]})")
+        return True
+
+    def drop_expired(self, table, today=None):
+        """Drop daily partitions older than the table's retention"""
+        today = today or date.today()
+        cutoff = today - timedelta(days=self.retention[table])
+        if not self.partitioned:
+            result = self.manager.run(f"DELETE FROM {table} WHERE ts < %s", (f"{cutoff:%Y-%m-%d}",), commit=True)
+            if not result.success:
+                print(f"❌ Error expiring rows of {table}: {result.error}")
+                return False
+            return True
+
+        existing = self.partition_days(table)
+        if existing is None:
+            return False
+        expired = [day for day in existing if day < cutoff]
+        if not expired:
+            return True
+        query = f"ALTER TABLE {table} DROP PARTITION {', '.join(partition_name(d) for d in expired)}"
+        success, error = self.manager.execute_query(query)
+        if not success:
+            print(f"❌ Error dropping partitions of {table}: {error}")
+            return False
+        print(f"Dropped {len(expired)} expired partitions of {table}")
+        return True
+
+    def downsample(self, interval, seconds, since, until):
+        """
+        Aggregate ticks in [since, until) into bars of the given size.
+        Open/close are the first/last tick of the bucket. Tick volume is the
+        day's cumulative volume, so a bar's volume is its last value minus
+        the previous bar's of the same day (the whole value for the day's
+        first bar); ticks from the start of the day are read so every bar
+        in the window has its predecessor. Re-running over the same range
+        overwrites the bars.
+        """
+        query = """
+        INSERT INTO stock_bars
+            (symbol, bar_interval, ts, open_price, high_price, low_price, close_price, volume, tick_count)
+        SELECT symbol, %s, bucket, open_price, high_price, low_price, close_price, volume, tick_count
+        FROM (
+            SELECT symbol, bucket, open_price, high_price, low_price, close_price, tick_count,
+                   GREATEST(last_volume - COALESCE(LAG(last_volume) OVER (PARTITION BY symbol, DATE(bucket)
+                                                                          ORDER BY bucket), 0), 0) AS volume
+            FROM (
+                SELECT symbol, bucket,
+                       SUBSTRING_INDEX(GROUP_CONCAT(price ORDER BY ts), ',', 1) AS open_price,
+                       MAX(price) AS high_price, MIN(price) AS low_price,
+                       SUBSTRING_INDEX(GROUP_CONCAT(price ORDER BY ts DESC), ',', 1) AS close_price,
+                       MAX(volume) AS last_volume,
+                       COUNT(*) AS tick_count
+                FROM (
+                    SELECT symbol, ts, price, volume,
+                           FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(ts) / %s) * %s) AS bucket
+                    FROM stock_ticks
+                    WHERE ts >= %s AND ts < %s
+                ) t
+                GROUP BY symbol, bucket
+            ) b
+        ) bars
+        -- Bars before the window were only read as predecessors
+        WHERE bucket >= %s
+        ON DUPLICATE KEY UPDATE
+            open_price = VALUES(open_price),
+            high_price = VALUES(high_price),
+            low_price = VALUES(low_price),
+            close_price = VALUES(close_price),
+            volume = VALUES(volume),
+            tick_count = VALUES(tick_count)
+        """
+        if not self.partitioned:
+            query = SQLITE_DOWNSAMPLE
+        # Align the window to whole bars so a partial first bucket never overwrites a full one
+        since_epoch = int(since.timestamp()) // seconds * seconds
+        since = datetime.fromtimestamp(since_epoch)
+        day_start = datetime.combine(since.date(), datetime.min.time())
+        params = (interval, seconds, seconds, f"{day_start:%Y-%m-%d %H:%M:%S}",
+                  f"{until:%Y-%m-%d %H:%M:%S.%f}", f"{since:%Y-%m-%d %H:%M:%S}")
+        result = self.manager.run(query, params, commit=True)
+        if not result.success:
+            print(f"❌ Error downsampling {interval} bars: {result.error}")
+            return False
+        return True
+
+    def run(self, now=None):
+        """One maintenance pass over both tables"""
+        now = now or datetime.now()
+        started = time.perf_counter()
+        for table in ('stock_ticks', 'stock_bars'):
+            self.ensure_partitions(table, now.date())
+        for interval, seconds in self.bar_intervals.items():
+            self.downsample(interval, seconds, now - DOWNSAMPLE_LOOKBACK, now)
+        for table in ('stock_ticks', 'stock_bars'):
+            self.drop_expired(table, now.date())
+        print(f"Tick maintenance finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Partition, downsample and expire stock ticks")
+    parser.add_argument('--tick-days', type=int, default=TICK_RETENTION_DAYS, help="days of ticks to keep")
+    parser.add_argument('--bar-days', type=int, default=BAR_RETENTION_DAYS, help="days of bars to keep")
+    parser.add_argument('--loop', type=int, default=0, metavar='SECONDS',
+                        help="repeat every SECONDS instead of running once")
+    args = parser.parse_args()
+
+    maintenance = TickMaintenance(tick_retention_days=args.tick_days, bar_retention_days=args.bar_days)
+    while True:
+        maintenance.run()
+        if not args.loop:
+            break
+        time.sleep(args.loop)
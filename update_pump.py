@@ -0,0 +1,63 @@
+# update_pump.py
+from PyQt6.QtCore import QObject, QTimer
+
+# Default number of UI flushes per second
+DEFAULT_RATE_HZ = 20
+
+
+class UpdatePump(QObject):
+    """
+    Buffers updates keyed by symbol and hands them to `apply` in one batch
+    at most `rate_hz` times per second. Only the latest value per key is
+    kept; superseded values are counted as merged.
+    """
+
+    def __init__(self, apply, rate_hz=DEFAULT_RATE_HZ, parent=None):
+        super().__init__(parent)
+        self.apply = apply
+        self.pending = {}
+        self.received = 0
+        self.merged = 0
+        self.applied = 0
+        self.flushes = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.set_rate(rate_hz)
+
+    def set_rate(self, rate_hz):
+        """Change how many times per second buffered updates are applied"""
+        self.rate_hz = max(1, rate_hz)
+        self.timer.setInterval(int(1000 / self.rate_hz))
+
+    def push(self, key, value):
+        """Queue an update; replaces any update for key not applied yet"""
+        self.received += 1
+        if key in self.pending:
+            self.merged += 1
+        self.pending[key] = value
+        # The first update of a frame starts the timer, later ones ride along
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Apply everything buffered now"""
+        self.timer.stop()
+        if not self.pending:
+            return
+        batch = list(self.pending.values())
+        self.pending = {}
+        self.flushes += 1
+        self.applied += len(batch)
+        self.apply(batch)
+
+    def stats(self):
+        """Counters since creation: received, merged (dropped), applied, flushes"""
+        return {
+            'received': self.received,
+            'merged': self.merged,
+            'applied': self.applied,
+            'flushes': self.flushes,
+            'pending': len(self.pending),
+        }
@@ -0,0 +1,113 @@
+# user_data_cache.py
+import threading
+import time
+
+# Cached lists older than this are reloaded on the next read. Writes made
+# through DatabaseConnection update the cache immediately; the TTL only
+# bounds how long changes made elsewhere (admin tools, another machine)
+# can go unnoticed.
+DEFAULT_TTL = 300
+
+WATCHLIST = 'watchlist'
+PORTFOLIO = 'portfolio'
+ANALYTICS = 'analytics_preferences'
+
+
+class UserDataCache:
+    """
+    Process-wide read-through cache of per-user rows (watchlist, portfolio,
+    analytics preferences), keyed by (kind, user_id).
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """Singleton so every window and DatabaseConnection share the cache"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = UserDataCache()
+            return cls._instance
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'invalidations': 0,
+            'patches': 0,
+            'load_seconds': 0.0,
+        }
+
+    def get(self, kind, user_id, loader, refresh=False):
+        """
+        Rows for (kind, user_id); on a miss or a stale entry loader() is
+        called and its rows cached. loader returns None on failure, which
+        is passed through as [] without being cached.
+        """
+        key = (kind, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not refresh:
+                rows, loaded_at = entry
+                if time.monotonic() - loaded_at <= self.ttl:
+                    self._metrics['hits'] += 1
+                    return [dict(row) for row in rows]
+                self._metrics['stale'] += 1
+            else:
+                self._metrics['misses'] += 1
+
+        started = time.perf_counter()
+        rows = loader()
+        with self._lock:
+            self._metrics['load_seconds'] += time.perf_counter() - started
+            if rows is None:
+                return []
+            self._entries[key] = ([dict(row) for row in rows], time.monotonic())
+        return [dict(row) for row in rows]
+
+    def find(self, kind, user_id, field, value):
+        """A cached row whose field equals value, or None (never loads)"""
+        with self._lock:
+            entry = self._entries.get((kind, user_id))
+            if entry is None:
+                return None
+            for row in entry[0]:
+                if row.get(field) == value:
+                    return dict(row)
+        return None
+
+    def remove_rows(self, kind, user_id, field, value):
+        """Patch a cached list after a delete instead of reloading it"""
+        with self._lock:
+            entry = self._entries.get((kind, user_id))
+            if entry is None:
+                return
+            rows, loaded_at = entry
+            self._entries[(kind, user_id)] = ([row for row in rows if row.get(field) != value], loaded_at)
+            self._metrics['patches'] += 1
+
+    def invalidate(self, kind=None, user_id=None):
+        """Forget one list, every list of a user/kind, or everything"""
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (kind is None or key[0] == kind) and (user_id is None or key[1] == user_id)]
+            for key in keys:
+                del self._entries[key]
+            self._metrics['invalidations'] += len(keys)
+
+    def metrics(self):
+        """Hit/miss/staleness counters plus the age of the oldest cached list"""
+        now = time.monotonic()
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._entries)
+            ages = [now - loaded_at for rows, loaded_at in self._entries.values()]
+        reads = metrics['hits'] + metrics['misses'] + metrics['stale']
+        metrics['hit_rate'] = metrics['hits'] / reads if reads else 0.0
+        metrics['oldest_entry_seconds'] = max(ages) if ages else 0.0
+        return metrics